@@ -0,0 +1,40 @@
+"""Add reserve_puzzles table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Pool of pre-generated puzzles for practice, fallbacks and instant refreshes
+    op.create_table(
+        'reserve_puzzles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('grid', sa.Text(), nullable=False),
+        sa.Column('solution', sa.Text(), nullable=False),
+        sa.Column('clues_across', sa.Text(), nullable=False),
+        sa.Column('clues_down', sa.Text(), nullable=False),
+        sa.Column('difficulty', sa.String(20), default='medium'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_reserve_puzzles_id', 'reserve_puzzles', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reserve_puzzles_id', table_name='reserve_puzzles')
+    op.drop_table('reserve_puzzles')
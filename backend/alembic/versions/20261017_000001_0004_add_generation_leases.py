@@ -0,0 +1,39 @@
+"""Add generation_leases table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:01.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Heartbeated generation lock leases (used where advisory locks aren't)
+    op.create_table(
+        'generation_leases',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('lock_key', sa.String(64), nullable=False),
+        sa.Column('holder', sa.String(100), nullable=False),
+        sa.Column('acquired_at', sa.DateTime(), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_generation_leases_id', 'generation_leases', ['id'], unique=False)
+    op.create_index('ix_generation_leases_lock_key', 'generation_leases', ['lock_key'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_generation_leases_lock_key', table_name='generation_leases')
+    op.drop_index('ix_generation_leases_id', table_name='generation_leases')
+    op.drop_table('generation_leases')
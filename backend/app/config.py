@@ -1,7 +1,7 @@
 """Application configuration using pydantic-settings."""
 
 from functools import lru_cache
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -39,6 +39,66 @@ class Settings(BaseSettings):
     jwt_access_token_expire_minutes: int = 30
     jwt_refresh_token_expire_days: int = 7
 
+    # Dictionary table: word list loaded when it is empty (empty = none), and
+    # whether to download the public word list instead (off: no network at startup)
+    dictionary_path: str = ""
+    dictionary_auto_download: bool = False
+
+    # Puzzle generation
+    # Where the generator's word list comes from: "builtin" (curated lists in
+    # puzzle_templates) or "database" (the dictionary_words table)
+    lexicon_source: Literal["builtin", "database"] = "builtin"
+    # Database lexicon filters: minimum frequency score and the most frequent
+    # N words kept per length (0 = all)
+    lexicon_min_frequency: int = 0
+    lexicon_max_words_per_length: int = 0
+    # Compiled lexicon file (manage.py build-lexicon) memory-mapped instead of
+    # building the lexicon in every process; takes precedence over lexicon_source
+    lexicon_file: str = ""
+    # Processes used to generate a week's puzzles: 1 = in-process, 0 = one per CPU
+    puzzle_generation_workers: int = 1
+    # Wall-clock limit in seconds for generating a week (empty = no limit)
+    puzzle_generation_budget_seconds: Optional[float] = None
+    # Attempts raced per day in worker processes (0 or 1 = retry sequentially)
+    puzzle_generation_portfolio: int = 0
+    # Weeks after the current one kept generated ahead of time, and how often
+    # the in-app look-ahead scheduler checks them (0 = only once, on boot)
+    puzzle_lookahead_weeks: int = 2
+    puzzle_scheduler_interval_seconds: float = 3600
+    # Reserve pool of pre-generated puzzles (practice, fallbacks, instant
+    # refreshes): size kept, puzzles generated per replenish run, and how often
+    # the pool is checked (target 0 = no background replenishing)
+    reserve_pool_target: int = 21
+    reserve_pool_batch: int = 7
+    reserve_replenish_interval_seconds: float = 300
+    # Practice puzzles the replenisher stocks from the pool (0 = none)
+    practice_puzzle_limit: int = 50
+    # How long after a failed or short week generation it is tried again
+    puzzle_generation_retry_seconds: float = 900
+    # Retry-After sent with 503s while a week's puzzles are being generated
+    puzzle_generation_retry_after_seconds: int = 30
+    # How long a process trusts that the current week is fully generated
+    # before checking the database again
+    puzzle_cache_ready_ttl_seconds: float = 300
+    # Lock held across workers while a week is generated: "auto" picks a
+    # PostgreSQL advisory lock or a SQLite lease row by database; "file" uses
+    # flock under generation_lock_dir (single host, e.g. tests)
+    generation_lock_backend: Literal["auto", "advisory", "sqlite", "file"] = "auto"
+    generation_lock_dir: str = ".generation_locks"
+    # Lease heartbeat interval, and how old a heartbeat may get before the
+    # lease is considered abandoned and taken over
+    generation_heartbeat_seconds: float = 5
+    generation_lock_stale_seconds: float = 30
+    # How long background jobs and manage.py wait for another worker's
+    # generation of the same week to finish
+    generation_lock_wait_seconds: float = 300
+    # Disk cache of solved fills (empty = disabled) and its size limit
+    fill_cache_dir: str = ".fill_cache"
+    fill_cache_max_mb: int = 64
+    # Processes parsing the clue TSV when there is no clue index
+    # (1 = in-process, 0 = one per CPU)
+    clue_load_workers: int = 1
+
     # Server
     host: str = "0.0.0.0"
     port: int = 8000
@@ -95,6 +95,31 @@ def run_migrations():
         );
         CREATE INDEX IF NOT EXISTS ix_leaderboard_date ON daily_leaderboard_entries(puzzle_date);
         CREATE INDEX IF NOT EXISTS ix_leaderboard_date_time ON daily_leaderboard_entries(puzzle_date, time_ms);
+        """,
+        # Create reserve_puzzles table (pre-generated puzzle pool)
+        """
+        CREATE TABLE IF NOT EXISTS reserve_puzzles (
+            id SERIAL PRIMARY KEY,
+            size INTEGER NOT NULL,
+            grid TEXT NOT NULL,
+            solution TEXT NOT NULL,
+            clues_across TEXT NOT NULL,
+            clues_down TEXT NOT NULL,
+            difficulty VARCHAR(20) DEFAULT 'medium',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_reserve_puzzles_id ON reserve_puzzles(id);
+        """,
+        # Create generation_leases table (generation lock when advisory locks are off)
+        """
+        CREATE TABLE IF NOT EXISTS generation_leases (
+            id SERIAL PRIMARY KEY,
+            lock_key VARCHAR(64) NOT NULL UNIQUE,
+            holder VARCHAR(100) NOT NULL,
+            acquired_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE INDEX IF NOT EXISTS ix_generation_leases_lock_key ON generation_leases(lock_key);
         """
     ]
 
@@ -111,13 +136,22 @@ def run_migrations():
 
 
 def ensure_puzzles_ready():
-    """Ensure puzzle cache is populated (runs in background thread)."""
+    """
+    Keep puzzles generated ahead of time (runs in background thread).
+
+    Clears outdated puzzle data once, then runs the look-ahead scheduler,
+    which generates the current and upcoming weeks and re-checks them
+    periodically. Returns the scheduler so shutdown can stop it.
+    """
     import threading
     import time
 
+    from app.database import SessionLocal
+    from app.services.puzzle_scheduler import LookaheadScheduler
+
+    scheduler = LookaheadScheduler(SessionLocal, in_subprocess=True)
+
     def _generate():
-        from app.database import SessionLocal
-        from app.services.puzzle_cache import ensure_weekly_cache, get_current_week_key
         from app.models.puzzle import Puzzle
         from app.models.cache_meta import PuzzleCacheMeta
 
@@ -126,8 +160,6 @@ def ensure_puzzles_ready():
 
         db = SessionLocal()
         try:
-            week_key = get_current_week_key()
-
             # One-time migration: Clear old puzzles that don't have real clues
             old_puzzle = db.query(Puzzle).filter(
                 Puzzle.clues_across.like('%Garden bloom%')
@@ -139,27 +171,41 @@ def ensure_puzzles_ready():
                 db.query(PuzzleCacheMeta).delete()
                 db.commit()
                 logger.info("Cleared old puzzle data")
-
-            # Check if puzzles already exist
-            existing = db.query(Puzzle).filter(Puzzle.week_key == week_key).count()
-            if existing >= 7:
-                logger.info(f"Puzzles already exist for {week_key} ({existing} puzzles)")
-                return
-
-            logger.info(f"Background: Generating puzzles for {week_key}...")
-            ensure_weekly_cache(db)
-            logger.info("Background: Puzzle cache ready!")
         except Exception as e:
-            logger.error(f"Background: Error generating puzzles: {e}")
+            logger.error(f"Background: Error clearing old puzzles: {e}")
             import traceback
             traceback.print_exc()
         finally:
             db.close()
 
-    # Run in background thread (NOT daemon, so it completes even if main thread is idle)
+        logger.info("Background: Starting look-ahead puzzle generation...")
+        scheduler.run()
+
+    # Run in background thread (NOT daemon, so a pass completes even if the
+    # main thread is idle; shutdown stops it between passes)
     thread = threading.Thread(target=_generate, daemon=False)
     thread.start()
     logger.info("Started background puzzle generation thread")
+    return scheduler
+
+
+def start_reserve_replenisher():
+    """
+    Keep the reserve puzzle pool topped up (background thread).
+
+    Every web worker starts one; they take turns through the generation
+    lock (see ReserveReplenisher.run_once).
+    """
+    if settings.reserve_pool_target <= 0:
+        return None
+
+    from app.database import SessionLocal
+    from app.services.reserve_pool import ReserveReplenisher
+
+    replenisher = ReserveReplenisher(SessionLocal)
+    replenisher.start()
+    logger.info("Started reserve pool replenisher")
+    return replenisher
 
 
 @asynccontextmanager
@@ -169,9 +215,15 @@ async def lifespan(app: FastAPI):
     init_db()
     logger.info("Database initialized")
     run_migrations()
-    ensure_puzzles_ready()
+    scheduler = ensure_puzzles_ready()
+    replenisher = start_reserve_replenisher()
     yield
     logger.info("Shutting down application...")
+    scheduler.stop()
+    if replenisher is not None:
+        replenisher.stop()
+    from app.services.puzzle_templates import shutdown_generation_pool
+    shutdown_generation_pool(wait=False)
 
 
 app = FastAPI(
@@ -4,8 +4,9 @@ from app.models.user import User
 from app.models.puzzle import Puzzle
 from app.models.solve import Solve
 from app.models.friend import FriendRequest, Friendship
-from app.models.cache_meta import DictionaryWord, PuzzleCacheMeta
+from app.models.cache_meta import DictionaryWord, GenerationLease, PuzzleCacheMeta
 from app.models.leaderboard_entry import DailyLeaderboardEntry
+from app.models.reserve_puzzle import ReservePuzzle
 
 __all__ = [
     "User",
@@ -15,5 +16,7 @@ __all__ = [
     "Friendship",
     "DictionaryWord",
     "PuzzleCacheMeta",
+    "GenerationLease",
     "DailyLeaderboardEntry",
+    "ReservePuzzle",
 ]
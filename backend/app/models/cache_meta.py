@@ -34,3 +34,15 @@ class PuzzleCacheMeta(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     error_message = Column(String(500), nullable=True)
+
+
+class GenerationLease(Base):
+    """Generation lock lease for databases without advisory locks (SQLite)."""
+
+    __tablename__ = "generation_leases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    lock_key = Column(String(64), nullable=False, unique=True, index=True)
+    holder = Column(String(100), nullable=False)  # host:pid:token of the holder
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    heartbeat_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,24 @@
+"""Reserve pool of pre-generated puzzles."""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Text
+
+from app.database import Base
+
+
+class ReservePuzzle(Base):
+    """A generated, not yet used puzzle kept for practice and fallbacks."""
+
+    __tablename__ = "reserve_puzzles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    size = Column(Integer, nullable=False)
+    grid = Column(Text, nullable=False)  # JSON string of grid layout (with blocks marked)
+    solution = Column(Text, nullable=False)  # JSON string of solution
+    clues_across = Column(Text, nullable=False)  # JSON string of across clues
+    clues_down = Column(Text, nullable=False)  # JSON string of down clues
+    difficulty = Column(String(20), default="medium")
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ReservePuzzle(id={self.id}, size={self.size}x{self.size})>"
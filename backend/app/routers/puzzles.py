@@ -12,7 +12,8 @@ from app.schemas.puzzle import PuzzlePlay, PuzzleCreate, PuzzleResponse
 from app.schemas.solve import SolveCreate, SolveResult
 from app.services.puzzle_service import PuzzleService
 from app.services.stats_service import StatsService
-from app.services.puzzle_cache import ensure_weekly_cache
+from app.config import get_settings
+from app.services.puzzle_cache import check_weekly_cache
 from app.utils.auth import get_current_user, get_current_user_optional
 from app.models.user import User
 
@@ -39,35 +40,37 @@ def list_all_puzzles(db: Session = Depends(get_db)):
     ]
 
 
-@router.post("/refresh")
+@router.post("/refresh", status_code=status.HTTP_202_ACCEPTED)
 def refresh_puzzles(db: Session = Depends(get_db)):
-    """Force refresh puzzles for current week. Hit this endpoint to regenerate."""
-    from app.models.puzzle import Puzzle
-    from app.models.cache_meta import PuzzleCacheMeta
-    from app.services.puzzle_cache import get_current_week_key, ensure_weekly_cache
+    """
+    Force refresh puzzles for current week. Regeneration runs in the background.
+
+    The current puzzles keep being served until the new week is swapped in.
+    """
+    from app.services.puzzle_cache import (
+        clear_week_readiness,
+        fill_week_from_reserve,
+        get_current_week_key,
+        start_weekly_generation,
+    )
 
     week_key = get_current_week_key()
-
-    # Delete existing puzzles and cache meta for this week
-    deleted_puzzles = db.query(Puzzle).filter(Puzzle.week_key == week_key).delete()
-    deleted_meta = db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == week_key).delete()
-    db.commit()
-
-    # Regenerate
-    ensure_weekly_cache(db)
-
-    # Get new puzzles
-    puzzles = db.query(Puzzle).filter(Puzzle.week_key == week_key).order_by(Puzzle.scheduled_date).all()
+    clear_week_readiness(week_key)
+
+    # Swap in a week from the reserve pool, or regenerate in the background
+    # (GET /puzzles/all lists the new puzzles once it is done)
+    if fill_week_from_reserve(db, week_key):
+        return {
+            "success": True,
+            "week_key": week_key,
+            "status": "done",
+        }
+    start_weekly_generation(week_key, db.get_bind(), force=True)
 
     return {
         "success": True,
         "week_key": week_key,
-        "deleted_puzzles": deleted_puzzles,
-        "new_puzzles": len(puzzles),
-        "puzzles": [
-            {"id": p.id, "date": str(p.scheduled_date), "title": p.title}
-            for p in puzzles
-        ]
+        "status": "generating",
     }
 
 
@@ -77,13 +80,20 @@ def get_today_puzzle(
     current_user: Optional[User] = Depends(get_current_user_optional),
 ):
     """Get today's puzzle (playable version without solution)."""
-    # Ensure weekly cache is populated (auto-generates if missing)
-    ensure_weekly_cache(db)
+    # Starts background generation if the week's cache is missing
+    week_ready = check_weekly_cache(db)
 
     puzzle_service = PuzzleService(db)
     puzzle = puzzle_service.get_today_puzzle()
 
     if not puzzle:
+        if not week_ready:
+            retry_after = get_settings().puzzle_generation_retry_after_seconds
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Today's puzzle is being generated",
+                headers={"Retry-After": str(retry_after)},
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="No puzzle available for today",
@@ -139,7 +149,11 @@ def get_practice_puzzle(
     exclude: Optional[int] = None,
     db: Session = Depends(get_db),
 ):
-    """Get a random puzzle for practice mode (not recorded on leaderboard)."""
+    """Get a random puzzle for practice mode (not recorded on leaderboard).
+
+    Practice puzzles stocked from the reserve pool (see
+    ReserveReplenisher) are among the candidates; this never writes.
+    """
     puzzle_service = PuzzleService(db)
 
     # If no exclude specified, exclude today's puzzle
@@ -169,6 +183,14 @@ def get_practice_puzzle(
     )
 
 
+@router.get("/reserve/metrics")
+def get_reserve_metrics(db: Session = Depends(get_db)):
+    """Reserve pool depth and replenish rate (admin/monitoring endpoint)."""
+    from app.services.reserve_pool import reserve_metrics
+
+    return reserve_metrics(db)
+
+
 @router.get("/{puzzle_id}", response_model=PuzzlePlay)
 def get_puzzle(
     puzzle_id: int,
@@ -3,26 +3,146 @@
 import os
 import random
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from functools import lru_cache
 from collections import defaultdict
-from typing import Optional
+from typing import Iterable, Optional
+
+from app.config import get_settings
+from app.services.clue_store import ClueStore, ClueStoreBuilder
 
 logger = logging.getLogger(__name__)
 
-# Path to clues file
+# Path to clues file, and the compiled index built from it
+# (python manage.py build-clue-index)
 DATA_DIR = Path(__file__).parent.parent.parent / "data"
 CLUES_FILE = DATA_DIR / "clues.tsv"
+CLUE_INDEX_FILE = DATA_DIR / "clues.idx"
+
+# Bytes of TSV parsed per task by parse_clues_file_parallel
+CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def clues_file_source(path: Path) -> str:
+    """Fingerprint of a clue TSV, recorded in indexes built from it."""
+    stat = path.stat()
+    return f"tsv:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _add_clue_lines(builder: ClueStoreBuilder, lines: Iterable[str]) -> None:
+    """Add the usable rows of clue TSV lines to ``builder``."""
+    rows = 0
+    for line in lines:
+        rows += 1
+        parts = line.strip().split('\t', 4)
+        if len(parts) >= 4:
+            # Format: pubid, year, answer, clue
+            answer = parts[2].upper().strip()
+            clue = parts[3].strip()
+
+            # Only keep words 3-5 letters (for mini crosswords)
+            # and valid clues
+            if 3 <= len(answer) <= 5 and clue and answer.isalpha():
+                builder.add(answer, clue)
+    builder.rows += rows
+
+
+def parse_clues_file(path: Path) -> ClueStoreBuilder:
+    """Read a clue TSV (pubid, year, answer, clue) into a ClueStoreBuilder."""
+    builder = ClueStoreBuilder()
+    start = time.perf_counter()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        # Skip header
+        next(f, None)
+        _add_clue_lines(builder, f)
+    _log_throughput(builder, time.perf_counter() - start, workers=1)
+    return builder
+
+
+def clue_chunk_ranges(path: Path, chunk_bytes: int = CHUNK_BYTES) -> list[tuple[int, int]]:
+    """Byte ranges covering the rows after the header, split at line starts."""
+    ranges = []
+    with open(path, 'rb') as f:
+        f.readline()  # header
+        start = f.tell()
+        size = os.fstat(f.fileno()).st_size
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            if f.tell() < size:
+                # Finish the line the boundary fell into
+                f.readline()
+            end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def _parse_clue_chunk(args: tuple[str, int, int]) -> tuple:
+    """Process-pool job: parse one byte range into ClueStoreBuilder.parts()."""
+    path, start, end = args
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8', errors='ignore')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    builder = ClueStoreBuilder()
+    _add_clue_lines(builder, lines)
+    return builder.parts()
+
+
+def parse_clues_file_parallel(
+    path: Path,
+    workers: int = 0,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> ClueStoreBuilder:
+    """
+    parse_clues_file across a process pool (``workers`` 0 = one per CPU).
+
+    The file is cut into ``chunk_bytes`` ranges on line boundaries, each
+    parsed in a worker; the partial results are merged in file order, so
+    the store is the same as from parse_clues_file.
+    """
+    workers = workers if workers > 0 else (os.cpu_count() or 1)
+    start = time.perf_counter()
+    builder = ClueStoreBuilder()
+    jobs = [(str(path), a, b) for a, b in clue_chunk_ranges(path, chunk_bytes)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs) or 1)) as executor:
+        # map() yields the chunks' results in file order
+        for parts in executor.map(_parse_clue_chunk, jobs):
+            builder.merge(parts)
+    _log_throughput(builder, time.perf_counter() - start, workers)
+    return builder
+
+
+def load_clues_file(path: Path, workers: int = 1) -> ClueStoreBuilder:
+    """Parse a clue TSV, in ``workers`` processes unless it is 1 (0 = one per CPU)."""
+    if workers == 1:
+        return parse_clues_file(path)
+    return parse_clues_file_parallel(path, workers)
+
+
+def _log_throughput(builder: ClueStoreBuilder, seconds: float, workers: int) -> None:
+    rate = builder.rows / seconds if seconds else 0
+    logger.info(
+        f"Parsed {builder.rows} clue rows ({builder.count} kept) in {seconds:.2f}s "
+        f"with {workers} process(es): {rate:,.0f} rows/sec"
+    )
 
 
 class ClueDatabase:
-    """Database of crossword clues indexed by answer word."""
+    """Database of crossword clues indexed by answer word (see ClueStore)."""
 
     _instance: Optional["ClueDatabase"] = None
 
     def __init__(self):
-        self.clues: dict[str, list[str]] = defaultdict(list)
+        self.clues: ClueStore = ClueStore.empty()
         self.loaded = False
+        # Filled by load(): answers per length, and the totals stats() reports
+        self.words_by_length: dict[int, tuple[str, ...]] = {}
+        self._stats = {"total_words": 0, "total_clues": 0, "by_length": {}}
 
     @classmethod
     def get_instance(cls) -> "ClueDatabase":
@@ -32,10 +152,21 @@ class ClueDatabase:
         return cls._instance
 
     def load(self) -> bool:
-        """Load clues from TSV file. Returns True if successful."""
+        """
+        Load clues. Returns True if successful.
+
+        Maps the compiled clue index when there is one that is up to date
+        with the TSV; otherwise parses the TSV.
+        """
         if self.loaded:
             return True
 
+        store = self._open_index()
+        if store is not None:
+            self._set_store(store)
+            logger.info(f"Mapped clue index {CLUE_INDEX_FILE} ({len(store)} words)")
+            return True
+
         if not CLUES_FILE.exists():
             logger.warning(f"Clues file not found: {CLUES_FILE}")
             return False
@@ -43,43 +174,59 @@ class ClueDatabase:
         logger.info(f"Loading clues from {CLUES_FILE}...")
 
         try:
-            count = 0
-            with open(CLUES_FILE, 'r', encoding='utf-8', errors='ignore') as f:
-                # Skip header
-                next(f, None)
-
-                for line in f:
-                    parts = line.strip().split('\t')
-                    if len(parts) >= 4:
-                        # Format: pubid, year, answer, clue
-                        answer = parts[2].upper().strip()
-                        clue = parts[3].strip()
-
-                        # Only keep words 3-5 letters (for mini crosswords)
-                        # and valid clues
-                        if 3 <= len(answer) <= 5 and clue and answer.isalpha():
-                            self.clues[answer].append(clue)
-                            count += 1
-
-            self.loaded = True
-            logger.info(f"Loaded {count} clues for {len(self.clues)} unique words")
+            builder = load_clues_file(CLUES_FILE, get_settings().clue_load_workers)
+            self._set_store(builder.build())
+            logger.info(
+                f"Loaded {builder.count} clues ({self.clues.distinct_clues} distinct) "
+                f"for {len(self.clues)} unique words"
+            )
             return True
 
         except Exception as e:
             logger.error(f"Error loading clues: {e}")
             return False
 
-    def get_clue(self, word: str) -> Optional[str]:
-        """Get a random clue for a word."""
+    def _set_store(self, store: ClueStore) -> None:
+        """Use ``store`` and precompute the per-length index and stats."""
+        by_length = defaultdict(list)
+        for word in store:
+            by_length[len(word)].append(word)
+
+        self.clues = store
+        self.words_by_length = {length: tuple(words) for length, words in by_length.items()}
+        self._stats = {
+            "total_words": len(store),
+            "total_clues": store.total_clues,
+            "by_length": {length: len(words) for length, words in by_length.items()},
+        }
+        self.loaded = True
+
+    def _open_index(self) -> Optional[ClueStore]:
+        """The compiled clue index, or None if missing, stale or unreadable."""
+        from app.services.clue_index import load_clue_index, read_clue_index_source
+
+        if not CLUE_INDEX_FILE.exists():
+            return None
+        try:
+            source = read_clue_index_source(CLUE_INDEX_FILE)
+            if CLUES_FILE.exists() and source != clues_file_source(CLUES_FILE):
+                logger.warning(
+                    f"Clue index {CLUE_INDEX_FILE} is older than {CLUES_FILE}; "
+                    "rebuild it with `python manage.py build-clue-index`"
+                )
+                return None
+            return load_clue_index(CLUE_INDEX_FILE)
+        except Exception as e:
+            logger.error(f"Error opening clue index: {e}")
+            return None
+
+    def get_clue(self, word: str, rng: Optional[random.Random] = None) -> Optional[str]:
+        """Get a random clue for a word, drawn from ``rng`` if given."""
         if not self.loaded:
             self.load()
 
         word = word.upper().strip()
-        clues = self.clues.get(word, [])
-
-        if clues:
-            return random.choice(clues)
-        return None
+        return self.clues.choice(word, rng or random)
 
     def get_all_clues(self, word: str) -> list[str]:
         """Get all clues for a word."""
@@ -87,7 +234,7 @@ class ClueDatabase:
             self.load()
 
         word = word.upper().strip()
-        return self.clues.get(word, [])
+        return self.clues.clues(word)
 
     def has_clue(self, word: str) -> bool:
         """Check if we have a clue for this word."""
@@ -97,27 +244,19 @@ class ClueDatabase:
         word = word.upper().strip()
         return word in self.clues
 
-    def get_words_with_clues(self, length: int) -> list[str]:
-        """Get all words of a specific length that have clues."""
+    def get_words_with_clues(self, length: int) -> tuple[str, ...]:
+        """Get all words of a specific length that have clues (sorted)."""
         if not self.loaded:
             self.load()
 
-        return [word for word in self.clues.keys() if len(word) == length]
+        return self.words_by_length.get(length, ())
 
     def stats(self) -> dict:
         """Get statistics about the clue database."""
         if not self.loaded:
             self.load()
 
-        by_length = defaultdict(int)
-        for word in self.clues.keys():
-            by_length[len(word)] += 1
-
-        return {
-            "total_words": len(self.clues),
-            "total_clues": sum(len(c) for c in self.clues.values()),
-            "by_length": dict(by_length),
-        }
+        return {**self._stats, "by_length": dict(self._stats["by_length"])}
 
 
 @lru_cache(maxsize=1)
@@ -128,9 +267,9 @@ def get_clue_database() -> ClueDatabase:
     return db
 
 
-def get_clue_for_word(word: str) -> Optional[str]:
+def get_clue_for_word(word: str, rng: Optional[random.Random] = None) -> Optional[str]:
     """Convenience function to get a clue for a word."""
-    return get_clue_database().get_clue(word)
+    return get_clue_database().get_clue(word, rng)
 
 
 def generate_fallback_clue(word: str) -> str:
@@ -0,0 +1,162 @@
+"""Compiled, memory-mapped clue index files.
+
+A clue index holds a ClueStore's buffers in a file that is used straight
+from an ``mmap``: opening it costs O(1) whatever the corpus size, workers
+opening the same file share its pages, and clues are read from disk only
+when looked up, so the corpus doesn't have to fit in each worker's memory.
+
+    header        magic, byte order, answer count, clue count, distinct
+                  clue count, answer bytes, clue bytes, metadata size
+    metadata      JSON: the source the index was built from
+    answer_offs   uint32 per answer + 1: answer i is answers[offs[i]:offs[i + 1]]
+    answers       the sorted answers, UTF-8, back to back
+    answer_starts uint32 per answer + 1 (see ClueStore)
+    clue_ids      uint32 per clue
+    clue_offsets  uint64 per distinct clue + 1
+    clue_blob     the distinct clue texts, UTF-8
+
+Sections are 8-byte aligned. Build files with
+``python manage.py build-clue-index``.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Optional
+
+from app.services.clue_store import ClueStore
+
+MAGIC = b"MXCLUE01"
+
+# magic, byte order, answers, clues, distinct clues, answer bytes, clue bytes, metadata size
+_HEADER = struct.Struct("<8s8sIIIQQI")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class MappedAnswers(Sequence):
+    """Sorted answers read from a mapping."""
+
+    __slots__ = ("_data", "_offsets")
+
+    def __init__(self, data: memoryview, offsets: memoryview):
+        self._data = data
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return str(self._data[self._offsets[i]:self._offsets[i + 1]], "utf-8")
+
+    def __iter__(self):
+        # One copy of the block instead of a bounds-checked lookup per answer
+        data, offsets = bytes(self._data), self._offsets
+        for i in range(len(offsets) - 1):
+            yield data[offsets[i]:offsets[i + 1]].decode("utf-8")
+
+    def __contains__(self, answer) -> bool:
+        i = bisect_left(self, answer)
+        return i < len(self) and self[i] == answer
+
+
+def write_clue_index(store: ClueStore, path: str, source: str = "") -> int:
+    """Write ``store`` to a clue index file (atomically). Returns its size in bytes."""
+    answers = [answer.encode("utf-8") for answer in store.answers]
+    answer_offsets = array("I", [0])
+    for answer in answers:
+        answer_offsets.append(answer_offsets[-1] + len(answer))
+
+    sections = [
+        answer_offsets,
+        b"".join(answers),
+        array("I", store.answer_starts),
+        array("I", store.clue_ids),
+        array("Q", store.clue_offsets),
+        bytes(store.clue_blob),
+    ]
+    meta = json.dumps({"source": source}).encode()
+
+    out = bytearray(_HEADER.pack(
+        MAGIC, sys.byteorder.encode("ascii"), len(store.answers), store.total_clues,
+        store.distinct_clues, len(sections[1]), len(sections[5]), len(meta),
+    ))
+    out += meta
+    for section in sections:
+        out += bytes(_align(len(out)) - len(out))
+        out += section.tobytes() if isinstance(section, array) else section
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(out)
+
+
+def read_clue_index_source(path: str) -> Optional[str]:
+    """The source recorded in a clue index, without mapping the whole file."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or header[:8] != MAGIC:
+            return None
+        meta_size = _HEADER.unpack(header)[-1]
+        return json.loads(f.read(meta_size))["source"]
+
+
+def load_clue_index(path: str) -> ClueStore:
+    """Open a clue index as a ClueStore backed by a shared mapping."""
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, byteorder, answer_count, clue_count, distinct, answer_bytes, clue_bytes, meta_size = (
+        _HEADER.unpack_from(data, 0)
+    )
+    if magic != MAGIC:
+        data.close()
+        raise ValueError(f"{path} is not a clue index file")
+    byteorder = byteorder.rstrip(b"\0").decode("ascii")
+    if byteorder != sys.byteorder:
+        data.close()
+        raise ValueError(f"{path} was built on a {byteorder}-endian machine; rebuild it")
+
+    view = memoryview(data)
+    offset = _HEADER.size + meta_size
+
+    def section(size: int, fmt: Optional[str] = None):
+        nonlocal offset
+        offset = _align(offset)
+        start, offset = offset, offset + size
+        return view[start:offset].cast(fmt) if fmt else start
+
+    answer_offsets = section(4 * (answer_count + 1), "I")
+    answers_start = section(answer_bytes)
+    answer_starts = section(4 * (answer_count + 1), "I")
+    clue_ids = section(4 * clue_count, "I")
+    clue_offsets = section(8 * (distinct + 1), "Q")
+    blob_start = section(clue_bytes)
+
+    answers = MappedAnswers(view[answers_start:answers_start + answer_bytes], answer_offsets)
+    return ClueStore(
+        answers, answer_starts, clue_ids, clue_offsets,
+        view[blob_start:blob_start + clue_bytes],
+    )
@@ -0,0 +1,150 @@
+"""Compact store of crossword clues by answer.
+
+A clue corpus kept as a dict of lists of str costs a few Python objects per
+clue, which for multi-million-row TSVs means gigabytes per worker. A
+ClueStore keeps the same data in a handful of flat buffers:
+
+    answers        sorted answer words (looked up by binary search)
+    answer_starts  answer i's clues are clue_ids[answer_starts[i]:answer_starts[i + 1]]
+    clue_ids       indexes of distinct clue texts, in file order per answer
+    clue_offsets   text j is clue_blob[clue_offsets[j]:clue_offsets[j + 1]]
+    clue_blob      the distinct clue texts, UTF-8 encoded back to back
+
+Identical clue texts are stored once and decoded only when returned.
+"""
+
+import random
+from array import array
+from bisect import bisect_left
+from typing import Iterator, Optional, Sequence
+
+
+class ClueStore:
+    """Read-only clues per answer, packed into flat buffers."""
+
+    __slots__ = ("answers", "answer_starts", "clue_ids", "clue_offsets", "clue_blob")
+
+    def __init__(
+        self,
+        answers: Sequence[str],
+        answer_starts: Sequence[int],
+        clue_ids: Sequence[int],
+        clue_offsets: Sequence[int],
+        clue_blob: bytes,
+    ):
+        self.answers = answers
+        self.answer_starts = answer_starts
+        self.clue_ids = clue_ids
+        self.clue_offsets = clue_offsets
+        self.clue_blob = clue_blob
+
+    @classmethod
+    def empty(cls) -> "ClueStore":
+        return cls((), array("I", [0]), array("I"), array("Q", [0]), b"")
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.answers)
+
+    def __contains__(self, answer: str) -> bool:
+        return self.find(answer) is not None
+
+    @property
+    def total_clues(self) -> int:
+        return len(self.clue_ids)
+
+    @property
+    def distinct_clues(self) -> int:
+        return len(self.clue_offsets) - 1
+
+    def find(self, answer: str) -> Optional[int]:
+        """Position of ``answer`` in ``answers``, or None."""
+        i = bisect_left(self.answers, answer)
+        if i < len(self.answers) and self.answers[i] == answer:
+            return i
+        return None
+
+    def _text(self, clue_id: int) -> str:
+        offsets = self.clue_offsets
+        return bytes(self.clue_blob[offsets[clue_id]:offsets[clue_id + 1]]).decode("utf-8")
+
+    def _ids(self, answer: str) -> Sequence[int]:
+        i = self.find(answer)
+        if i is None:
+            return ()
+        return self.clue_ids[self.answer_starts[i]:self.answer_starts[i + 1]]
+
+    def clue_count(self, answer: str) -> int:
+        """Number of clues for ``answer`` (repeats included)."""
+        return len(self._ids(answer))
+
+    def clues(self, answer: str) -> list[str]:
+        """All clues for ``answer``, in file order."""
+        return [self._text(clue_id) for clue_id in self._ids(answer)]
+
+    def choice(self, answer: str, rng=random) -> Optional[str]:
+        """
+        A random clue for ``answer``, decoding only that one.
+
+        Draws exactly like ``rng.choice(self.clues(answer))``, so seeded
+        puzzles get the same clues as from a plain list.
+        """
+        ids = self._ids(answer)
+        if not len(ids):
+            return None
+        return self._text(ids[rng.choice(range(len(ids)))])
+
+
+class ClueStoreBuilder:
+    """Collects (answer, clue) pairs and packs them into a ClueStore."""
+
+    def __init__(self):
+        self._text_ids: dict[str, int] = {}
+        self._blob = bytearray()
+        self._offsets = array("Q", [0])
+        self._by_answer: dict[str, array] = {}
+        self.count = 0  # clues added
+        self.rows = 0  # input rows read, kept by the parser for reporting
+
+    def _intern(self, clue: str) -> int:
+        clue_id = self._text_ids.get(clue)
+        if clue_id is None:
+            clue_id = self._text_ids[clue] = len(self._text_ids)
+            self._blob += clue.encode("utf-8")
+            self._offsets.append(len(self._blob))
+        return clue_id
+
+    def add(self, answer: str, clue: str) -> None:
+        clue_id = self._intern(clue)
+        ids = self._by_answer.get(answer)
+        if ids is None:
+            ids = self._by_answer[answer] = array("I")
+        ids.append(clue_id)
+        self.count += 1
+
+    def parts(self) -> tuple[list[str], dict[str, array], int, int]:
+        """Picklable contents (texts, ids per answer, count, rows) for merge()."""
+        return list(self._text_ids), self._by_answer, self.count, self.rows
+
+    def merge(self, parts: tuple[list[str], dict[str, array], int, int]) -> None:
+        """Append another builder's parts(), as if its pairs were added here."""
+        texts, by_answer, count, rows = parts
+        remap = [self._intern(text) for text in texts]
+        for answer, ids in by_answer.items():
+            target = self._by_answer.get(answer)
+            if target is None:
+                target = self._by_answer[answer] = array("I")
+            target.extend(array("I", [remap[i] for i in ids]))
+        self.count += count
+        self.rows += rows
+
+    def build(self) -> ClueStore:
+        answers = tuple(sorted(self._by_answer))
+        answer_starts = array("I", [0])
+        clue_ids = array("I")
+        for answer in answers:
+            clue_ids.extend(self._by_answer[answer])
+            answer_starts.append(len(clue_ids))
+        return ClueStore(answers, answer_starts, clue_ids, self._offsets, bytes(self._blob))
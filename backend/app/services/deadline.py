@@ -0,0 +1,83 @@
+"""Wall-clock budgets for puzzle generation.
+
+A Deadline is created once per generation run and handed down to every step
+(pattern retries, fills, validation), so the run as a whole finishes within
+its budget. Times come from time.monotonic(), which is system-wide on Linux
+and macOS, so a Deadline stays meaningful when pickled to a process pool
+worker on the same machine.
+"""
+
+import math
+import time
+from contextlib import contextmanager
+from typing import Optional, Union
+
+
+class Deadline:
+    """A time budget in seconds (None = unlimited) and where it went."""
+
+    __slots__ = ("budget", "started_at", "expires_at", "phases")
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.budget = seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + seconds if seconds is not None else math.inf
+        # Seconds spent per named phase (see phase())
+        self.phases: dict[str, float] = {}
+
+    @classmethod
+    def coerce(cls, deadline: Union["Deadline", float, None]) -> "Deadline":
+        """Accept a Deadline, a budget in seconds from now, or None (unlimited)."""
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def __repr__(self) -> str:
+        return f"<Deadline(budget={self.budget}, remaining={self.remaining():.3f})>"
+
+    @property
+    def unlimited(self) -> bool:
+        return self.expires_at == math.inf
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def share(self, parts: int) -> "Deadline":
+        """A sub-budget of 1/parts of the remaining time.
+
+        Time charged to the share's phases is recorded on this Deadline too,
+        so a run can hand each step a fair slice and still report the total.
+        """
+        child = Deadline.__new__(Deadline)
+        child.started_at = now = time.monotonic()
+        if self.unlimited:
+            child.budget, child.expires_at = None, math.inf
+        else:
+            child.budget = max(0.0, self.expires_at - now) / max(1, parts)
+            child.expires_at = now + child.budget
+        child.phases = self.phases
+        return child
+
+    @contextmanager
+    def phase(self, name: str):
+        """Charge the time spent in the block to ``name``."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.monotonic() - start
+
+    def report(self) -> dict:
+        """How the budget was spent so far."""
+        return {
+            "budget_s": self.budget,
+            "elapsed_s": round(self.elapsed(), 4),
+            "expired": self.expired(),
+            "phases_s": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+        }
@@ -0,0 +1,200 @@
+"""Bulk loading of word lists into the dictionary_words table.
+
+Word lists are streamed line by line - one word per line, optionally
+followed by whitespace and an integer frequency score - so memory stays
+bounded by the batch size however large the file is. Words already in the
+table are skipped by the database itself (ON CONFLICT DO NOTHING), which is
+also what deduplicates across batches. On PostgreSQL the rows are streamed
+with COPY into a temporary table and merged with a single INSERT ... SELECT.
+"""
+
+import io
+import logging
+import sys
+import time
+from contextlib import nullcontext
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.cache_meta import DictionaryWord
+
+logger = logging.getLogger(__name__)
+
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 7
+
+# Rows per executemany round trip
+BATCH_SIZE = 5000
+
+
+def parse_word_lines(
+    lines: Iterable[str],
+    min_length: int = MIN_WORD_LENGTH,
+    max_length: int = MAX_WORD_LENGTH,
+) -> Iterator[tuple[str, int]]:
+    """Yield (WORD, frequency) for every usable line of a word list."""
+    for line in lines:
+        parts = line.split()
+        if not parts:
+            continue
+        word = parts[0].upper()
+        if not (word.isalpha() and word.isascii() and min_length <= len(word) <= max_length):
+            continue
+        frequency = 0
+        if len(parts) > 1:
+            try:
+                frequency = int(parts[1])
+            except ValueError:
+                pass
+        yield word, frequency
+
+
+def _insert_batches(db: Session, rows: Iterator[tuple[str, int]], batch_size: int) -> int:
+    """Insert rows with executemany, skipping words already present."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        dialect_insert = None
+
+    table = DictionaryWord.__table__
+    if dialect_insert is not None:
+        statement = dialect_insert(table).on_conflict_do_nothing(index_elements=["word"])
+    else:
+        statement = insert(table)
+
+    accepted = 0
+    batch: dict[str, int] = {}
+
+    def flush():
+        words = batch
+        if dialect_insert is None:
+            # No portable upsert: drop the words that already exist first
+            existing = set(db.execute(
+                select(DictionaryWord.word).where(DictionaryWord.word.in_(list(words)))
+            ).scalars())
+            words = {w: f for w, f in words.items() if w not in existing}
+        if words:
+            db.execute(statement, [
+                {"word": w, "length": len(w), "frequency": f} for w, f in words.items()
+            ])
+
+    for word, frequency in rows:
+        accepted += 1
+        batch.setdefault(word, frequency)
+        if len(batch) >= batch_size:
+            flush()
+            batch = {}
+    if batch:
+        flush()
+    return accepted
+
+
+class _CopyStream(io.RawIOBase):
+    """File-like view of rows as COPY text, produced on demand."""
+
+    def __init__(self, rows: Iterator[tuple[str, int]]):
+        self._rows = rows
+        self._buffer = b""
+        self.count = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self.count += 1
+            line = f"{row[0]}\t{len(row[0])}\t{row[1]}\n".encode()
+            chunks.append(line)
+            length += len(line)
+        data = b"".join(chunks)
+        if size < 0:
+            self._buffer = b""
+            return data
+        self._buffer = data[size:]
+        return data[:size]
+
+
+def _copy_postgres(db: Session, rows: Iterator[tuple[str, int]]) -> int:
+    """Stream rows with COPY into a temp table, then merge them in one statement."""
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE dictionary_words_load "
+            "(word varchar(50), length integer, frequency integer) ON COMMIT DROP"
+        )
+        stream = _CopyStream(rows)
+        cursor.copy_expert(
+            "COPY dictionary_words_load (word, length, frequency) FROM STDIN", stream
+        )
+        cursor.execute(
+            "INSERT INTO dictionary_words (word, length, frequency, created_at) "
+            "SELECT DISTINCT ON (word) word, length, frequency, now() AT TIME ZONE 'utc' "
+            "FROM dictionary_words_load ORDER BY word "
+            "ON CONFLICT (word) DO NOTHING"
+        )
+        return stream.count
+    finally:
+        cursor.close()
+
+
+def load_dictionary(
+    db: Session,
+    lines: Iterable[str],
+    batch_size: int = BATCH_SIZE,
+    min_length: int = MIN_WORD_LENGTH,
+    max_length: int = MAX_WORD_LENGTH,
+) -> dict:
+    """
+    Bulk-load a word list into the dictionary table.
+
+    Returns counts of the words accepted from the input and actually
+    inserted (new words), and how long the load took.
+    """
+    start = time.perf_counter()
+    before = db.scalar(select(func.count(DictionaryWord.id)))
+    rows = parse_word_lines(lines, min_length, max_length)
+
+    try:
+        if db.get_bind().dialect.name == "postgresql":
+            accepted = _copy_postgres(db, rows)
+        else:
+            accepted = _insert_batches(db, rows, batch_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    inserted = db.scalar(select(func.count(DictionaryWord.id))) - before
+    seconds = time.perf_counter() - start
+    logger.info(f"Loaded {inserted} new words ({accepted} accepted) in {seconds:.2f}s")
+    return {"accepted": accepted, "inserted": inserted, "seconds": seconds}
+
+
+def load_dictionary_file(db: Session, path: str, **kwargs) -> dict:
+    """Load a word list file, or standard input when ``path`` is ``-``."""
+    if path == "-":
+        context = nullcontext(sys.stdin)
+    else:
+        context = open(path, encoding="utf-8", errors="replace")
+    with context as source:
+        return load_dictionary(db, source, **kwargs)
+
+
+def download_dictionary(db: Session, url: str, timeout: Optional[float] = 30) -> dict:
+    """Stream a word list from ``url`` into the dictionary table."""
+    import urllib.request
+
+    logger.info(f"Downloading word list from {url}")
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        lines = io.TextIOWrapper(response, encoding="utf-8", errors="replace")
+        return load_dictionary(db, lines)
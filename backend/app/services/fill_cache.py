@@ -0,0 +1,192 @@
+"""Content-addressed disk cache of solved fills.
+
+A fill is fully determined by the pattern, the lexicon version, the seed and
+the fill engine version, so the solved grid can be stored under a hash of
+those four values and reused whenever the same puzzle is generated again
+(weekly refreshes, test runs, ``manage.py test --seed``).
+
+Entries are small JSON files spread over 256 subdirectories. Reads refresh
+an entry's mtime, and the cache is pruned oldest-mtime-first whenever it
+grows past its size limit, so it behaves as an LRU bounded in bytes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from app.services.fill_engine import ENGINE_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Pruning stops once the cache is below this share of its limit, so a full
+# cache isn't rescanned on every single write
+PRUNE_TARGET = 0.8
+
+
+def fill_cache_key(
+    pattern: list[list[str]],
+    lexicon_version: str,
+    seed: int,
+    engine_version: int = ENGINE_VERSION,
+) -> str:
+    """Hash of everything that determines a fill."""
+    payload = json.dumps(
+        {
+            "pattern": ["".join(row) for row in pattern],
+            "lexicon": lexicon_version,
+            "seed": seed,
+            "engine": engine_version,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class FillCache:
+    """Size-bounded directory of solved grids keyed by fill_cache_key."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None  # Scanned lazily on first write
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """(mtime, size, path) for every entry."""
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for path in self.directory.glob("*/*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue  # Removed by another process
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def get(self, key: str) -> Optional[list[list[str]]]:
+        """The cached solution for a key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # Mark as recently used
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry["solution"]
+
+    def put(self, key: str, solution: list[list[str]], **meta) -> None:
+        """Store a solution. Failures to write are logged, never raised."""
+        path = self._path(key)
+        data = json.dumps({
+            "key": key,
+            "solution": solution,
+            "created_at": datetime.utcnow().isoformat(),
+            **meta,
+        }).encode()
+
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial entry
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                replaced = path.stat().st_size  # Overwriting an entry
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write fill cache entry {key[:12]}: {e}")
+            return
+        finally:
+            # Only still there if the write or the rename failed
+            if tmp is not None and os.path.exists(tmp):
+                os.unlink(tmp)
+
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            else:
+                self._size += len(data) - replaced
+            over_limit = self._size > self.max_bytes
+
+        if over_limit:
+            self.prune(int(self.max_bytes * PRUNE_TARGET))
+
+    def prune(self, max_bytes: int = None) -> int:
+        """Evict least recently used entries until the cache fits in max_bytes."""
+        if max_bytes is None:
+            max_bytes = self.max_bytes
+
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in entries:
+                if total <= max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+            self._size = total
+
+        if removed:
+            logger.info(f"Pruned {removed} fill cache entries")
+        return removed
+
+    def clear(self) -> int:
+        """Remove every entry."""
+        return self.prune(0)
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "directory": str(self.directory),
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+_fill_cache: Optional[FillCache] = None
+_fill_cache_lock = threading.Lock()
+
+
+def get_fill_cache() -> Optional[FillCache]:
+    """The process-wide fill cache, or None if it is disabled in settings."""
+    global _fill_cache
+
+    from app.config import get_settings
+
+    settings = get_settings()
+    if not settings.fill_cache_dir:
+        return None
+
+    with _fill_cache_lock:
+        if _fill_cache is None:
+            _fill_cache = FillCache(
+                settings.fill_cache_dir,
+                settings.fill_cache_max_mb * 1024 * 1024,
+            )
+        return _fill_cache
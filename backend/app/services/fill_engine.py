@@ -0,0 +1,490 @@
+"""Constraint-propagation fill engine for crossword patterns.
+
+Each word slot keeps a domain - the set of words still possible for it, held
+in whatever form its index uses (a bitset for WordIndex, a boolean array for
+the NumPy backend) - that is narrowed incrementally as words are placed. After every placement the
+crossing slots are pruned (forward checking) and, in "ac3" mode, the pruning
+is propagated arc by arc until every remaining word has a supporting letter
+in each crossing slot. Domain changes are recorded on a trail so backtracking
+only has to pop the trail instead of recomputing candidates from the grid.
+
+Every domain reduction also records which placed slots caused it. When a slot
+runs out of words the search jumps straight back to the most recent of those
+culprits (conflict-directed backjumping) instead of retrying the slots in
+between, and the dead residual problem is remembered as a nogood keyed by its
+crossing-letter signature so it is never searched again. Subtrees in which
+some slot's candidates were cut to ``max_candidates`` were not fully
+explored, so their failures are not recorded.
+
+The search is bounded by a backtrack count and, optionally, a wall-clock
+Deadline that is checked every few nodes; when it passes the solver unwinds
+and keeps the most complete partial fill it reached.
+"""
+
+import logging
+import math
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional, Sequence, Union
+
+from app.services.deadline import Deadline
+from app.services.lexicon import WordIndex
+from app.services.patterns import CompiledSlot, link_slots
+
+logger = logging.getLogger(__name__)
+
+# "none" recomputes candidates from the grid at every node (the original
+# behaviour), "forward" prunes only the slots crossing the new word, and
+# "ac3" propagates until all crossings are arc-consistent.
+PROPAGATION_MODES = ("none", "forward", "ac3")
+
+# Returned by the search in place of a conflict set when the grid is full
+SOLVED = -1
+
+# Search calls between deadline checks; reading the clock on every node
+# would cost more than the propagation it guards
+CLOCK_CHECK_INTERVAL = 32
+
+# Part of the fill cache key (see app.services.fill_cache). Bump it whenever
+# a change to the search can change which fill a given seed produces.
+ENGINE_VERSION = 2
+
+
+@dataclass
+class FillStats:
+    """Search counters for a single fill."""
+
+    nodes: int = 0  # Words placed (search tree nodes visited)
+    candidates: int = 0  # Candidate words offered at search nodes
+    backtracks: int = 0  # Placements undone after their subtree failed
+    wipeouts: int = 0  # Propagations that emptied some slot's domain
+    revisions: int = 0  # Arc revisions performed
+    pruned: int = 0  # Revisions that removed at least one word
+    backjumps: int = 0  # Levels skipped by conflict-directed backjumping
+    nogoods: int = 0  # Dead residual problems recorded
+    nogood_hits: int = 0  # Subtrees skipped because they were known dead
+    timeouts: int = 0  # Fills stopped by their deadline
+    elapsed_ms: float = 0.0  # Wall-clock time spent in solve()
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class FillSolver:
+    """Backtracking search with incremental per-slot domains.
+
+    Conflict sets are slot bitmasks (bit i = slot i), which keeps the
+    bookkeeping to a few integer ORs per domain change. ``slots`` are the
+    CompiledSlots of a compiled pattern; plain slot dicts are linked on the fly.
+    """
+
+    def __init__(
+        self,
+        pattern: list[list[str]],
+        slots: Sequence,
+        indexes: dict[int, WordIndex],
+        propagation: str = "ac3",
+        max_attempts: Optional[int] = 50000,
+        max_candidates: int = 500,
+        max_nogoods: int = 100000,
+        backjumping: bool = True,
+        stats: Optional[FillStats] = None,
+        rng: Optional[random.Random] = None,
+        deadline: Union[Deadline, float, None] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+    ):
+        if propagation not in PROPAGATION_MODES:
+            raise ValueError(f"Unknown propagation mode: {propagation}")
+
+        self.solution = [row[:] for row in pattern]
+        if slots and not isinstance(slots[0], CompiledSlot):
+            slots = link_slots(slots)
+        self.slots = slots
+        self.indexes = indexes
+        self.propagation = propagation
+        self.max_attempts = max_attempts
+        self.max_candidates = max_candidates
+        self.max_nogoods = max_nogoods
+        self.backjumping = backjumping
+        self.stats = stats if stats is not None else FillStats()
+        # A private RNG keeps concurrent fills reproducible
+        self.rng = rng if rng is not None else random.Random()
+        # Stats may be shared across fills, so the limit is relative
+        self._backtrack_limit = (
+            self.stats.backtracks + max_attempts if max_attempts is not None else math.inf
+        )
+        self.deadline = Deadline.coerce(deadline)
+        # Polled with the deadline; lets another thread or process cancel us
+        self.should_stop = should_stop
+        self._clock_countdown = CLOCK_CHECK_INTERVAL
+        # exhausted: stopped early for any reason; timed_out: by the
+        # deadline; cancelled: by should_stop
+        self.exhausted = False
+        self.timed_out = False
+        self.cancelled = False
+        # Most complete partial fill seen, for callers that run out of time
+        self.best_depth = 0
+        self.best_solution: Optional[list[list[str]]] = None
+
+        n = len(slots)
+        self.slot_index: list[Optional[WordIndex]] = [
+            indexes.get(slot.length) for slot in slots
+        ]
+        self.assigned: list[Optional[int]] = [None] * n
+        self.assigned_mask = 0
+        # Used words per length, as a domain of that length's index
+        self.used_masks: dict[int, Any] = {
+            index.length: index.empty for index in self.slot_index if index is not None
+        }
+
+        # Crossing maps come precompiled with the slots (see
+        # app.services.patterns): crossings[i] holds (pos_in_i, j, pos_in_j)
+        # for every slot j crossing i. Same-length slots share a word list,
+        # so a placed word must be removed from their domains to keep every
+        # answer unique.
+        self.crossings = [slot.crossings for slot in slots]
+        self.crossing_mask = [slot.crossing_mask for slot in slots]
+        self.same_length = [slot.same_length for slot in slots]
+
+        # Domains are opaque values of the slot's index (see WordIndex)
+        self.domains: list[Any] = [None] * n
+        # culprits[i]: placed slots responsible for narrowing slot i's domain
+        self.culprits: list[int] = [0] * n
+        self.trail: list[tuple[int, int, int]] = []
+        self.nogoods: set[tuple] = set()
+        self._wipeout_conflict = 0
+        # Search nodes whose candidates were cut to max_candidates so far
+        self._truncations = 0
+
+    # -- domain bookkeeping ---------------------------------------------------
+
+    def _set_domain(self, i: int, mask: int, reason: int) -> None:
+        self.trail.append((i, self.domains[i], self.culprits[i]))
+        self.domains[i] = mask
+        self.culprits[i] |= reason
+
+    def _undo(self, mark: int) -> None:
+        trail = self.trail
+        domains = self.domains
+        culprits = self.culprits
+        while len(trail) > mark:
+            i, old_domain, old_culprits = trail.pop()
+            domains[i] = old_domain
+            culprits[i] = old_culprits
+
+    def _current_pattern(self, i: int) -> list[Optional[str]]:
+        pattern = []
+        for r, c in self.slots[i].cells:
+            cell = self.solution[r][c]
+            # Empty cells are "." and black squares "#"
+            pattern.append(cell if cell.isalpha() else None)
+        return pattern
+
+    def _live_domain(self, i: int) -> int:
+        """Domain of an unassigned slot, recomputed if not maintained."""
+        if self.propagation != "none":
+            return self.domains[i]
+        index = self.slot_index[i]
+        if index is None:
+            return 0
+        return index.match(self._current_pattern(i)) & ~self.used_masks[index.length]
+
+    def _explain(self, i: int) -> int:
+        """Placed slots that account for slot i's current domain."""
+        if self.propagation != "none":
+            return self.culprits[i]
+        same_length = 0
+        for j in self.same_length[i]:
+            same_length |= 1 << j
+        return (self.crossing_mask[i] | same_length) & self.assigned_mask
+
+    # -- propagation ----------------------------------------------------------
+
+    def _revise(self, x: int, px: int, y: int, py: int) -> bool:
+        """Drop words from x whose letter at px has no support in y at py.
+
+        Returns False if x's domain is wiped out.
+        """
+        self.stats.revisions += 1
+        index_x = self.slot_index[x]
+        index_y = self.slot_index[y]
+        letters = index_y.letters_in(self.domains[y], py)
+        allowed = index_x.letters_mask(px, letters)
+        old = self.domains[x]
+        new = old & allowed
+        if index_x.equal(new, old):
+            return True
+        self.stats.pruned += 1
+        reason = 1 << y if self.assigned[y] is not None else self.culprits[y]
+        self._set_domain(x, new, reason)
+        if index_x.is_empty(new):
+            self._wipeout_conflict = self.culprits[x]
+            return False
+        return True
+
+    def _propagate(self, i: int) -> bool:
+        """Prune the domains of unassigned slots after slot i was filled.
+
+        On a wipeout, returns False and leaves the explanation in
+        ``_wipeout_conflict``.
+        """
+        if self.propagation == "none":
+            return True
+
+        index = self.slot_index[i]
+        word_id = self.assigned[i]
+        for j in self.same_length[i]:
+            if self.assigned[j] is None and index.has_word(self.domains[j], word_id):
+                self._set_domain(j, self.domains[j] & ~index.single(word_id), 1 << i)
+                if index.is_empty(self.domains[j]):
+                    self.stats.wipeouts += 1
+                    self._wipeout_conflict = self.culprits[j]
+                    return False
+
+        if self.propagation == "forward":
+            for p, j, q in self.crossings[i]:
+                if self.assigned[j] is None and not self._revise(j, q, i, p):
+                    self.stats.wipeouts += 1
+                    return False
+            return True
+
+        return self._ac3(
+            [(j, q, i, p) for p, j, q in self.crossings[i] if self.assigned[j] is None]
+        )
+
+    def _ac3(self, arcs: list[tuple[int, int, int, int]]) -> bool:
+        """Revise arcs (x, px, y, py) until no domain changes."""
+        queue = deque(arcs)
+        queued = {(x, y) for x, _, y, _ in arcs}
+        while queue:
+            x, px, y, py = queue.popleft()
+            queued.discard((x, y))
+            old = self.domains[x]
+            if not self._revise(x, px, y, py):
+                self.stats.wipeouts += 1
+                return False
+            # Domains are only ever replaced, never mutated in place
+            if self.domains[x] is not old:
+                for p, z, q in self.crossings[x]:
+                    if z != y and self.assigned[z] is None and (z, x) not in queued:
+                        queue.append((z, q, x, p))
+                        queued.add((z, x))
+        return True
+
+    def _initial_propagation(self) -> bool:
+        for i, index in enumerate(self.slot_index):
+            if index is None:
+                return False
+            self.domains[i] = index.match(self._current_pattern(i))
+            if index.is_empty(self.domains[i]):
+                return False
+        if self.propagation != "ac3":
+            return True
+        consistent = self._ac3([
+            (i, p, j, q)
+            for i in range(len(self.slots))
+            for p, j, q in self.crossings[i]
+        ])
+        # Entry-time pruning is never undone and blames no placement
+        self.trail.clear()
+        self.culprits = [0] * len(self.slots)
+        return consistent
+
+    # -- nogoods --------------------------------------------------------------
+
+    def _signature(self) -> tuple[tuple, int]:
+        """Key and explanation for the residual problem at this node.
+
+        What is left to solve is fully determined by which slots are filled,
+        the letters they put into the open slots' cells, and any used words
+        that would otherwise still fit an open slot. Different words that
+        leave the same crossing letters therefore share a signature.
+        """
+        letters = []
+        blocked_words = []
+        explanation = 0
+        for i, word_id in enumerate(self.assigned):
+            if word_id is not None:
+                continue
+            pattern = self._current_pattern(i)
+            letters.append("".join(letter or "." for letter in pattern))
+            index = self.slot_index[i]
+            blocked = index.match(pattern) & self.used_masks[index.length]
+            blocked_words.append(index.freeze(blocked))
+            explanation |= self.crossing_mask[i]
+            if not index.is_empty(blocked):
+                for j in self.same_length[i]:
+                    word = self.assigned[j]
+                    if word is not None and index.has_word(blocked, word):
+                        explanation |= 1 << j
+        key = (self.assigned_mask, tuple(letters), tuple(blocked_words))
+        return key, explanation & self.assigned_mask
+
+    # -- search ---------------------------------------------------------------
+
+    def _select_slot(self) -> tuple[int, bool]:
+        """Choose the unassigned slot with the fewest candidates (MRV).
+
+        Returns (slot, dead_end); at a dead end the slot has no candidates.
+        """
+        best_slot = -1
+        best_count = None
+        for i, word_id in enumerate(self.assigned):
+            if word_id is not None:
+                continue
+            count = self.slot_index[i].count(self._live_domain(i))
+            if count == 0:
+                return i, True
+            if best_count is None or count < best_count:
+                best_slot, best_count = i, count
+        return best_slot, False
+
+    def _place(self, i: int, word_id: int) -> list[str]:
+        slot = self.slots[i]
+        word = self.slot_index[i].words[word_id]
+        old_values = []
+        for letter, (r, c) in zip(word, slot.cells):
+            old_values.append(self.solution[r][c])
+            self.solution[r][c] = letter
+        self.assigned[i] = word_id
+        self.assigned_mask |= 1 << i
+        depth = self.assigned_mask.bit_count()
+        if depth > self.best_depth:
+            self.best_depth = depth
+            self.best_solution = [row[:] for row in self.solution]
+        index = self.slot_index[i]
+        self.used_masks[index.length] = self.used_masks[index.length] | index.single(word_id)
+        return old_values
+
+    def _unplace(self, i: int, old_values: list[str]) -> None:
+        slot = self.slots[i]
+        for value, (r, c) in zip(old_values, slot.cells):
+            self.solution[r][c] = value
+        index = self.slot_index[i]
+        used = self.used_masks[index.length]
+        self.used_masks[index.length] = used & ~index.single(self.assigned[i])
+        self.assigned[i] = None
+        self.assigned_mask &= ~(1 << i)
+
+    def _out_of_budget(self) -> bool:
+        """Check the backtrack limit, and every few calls the deadline and should_stop."""
+        if self.stats.backtracks >= self._backtrack_limit:
+            self.exhausted = True
+            return True
+        self._clock_countdown -= 1
+        if self._clock_countdown <= 0:
+            self._clock_countdown = CLOCK_CHECK_INTERVAL
+            if self.deadline.expired():
+                self.exhausted = self.timed_out = True
+                return True
+            if self.should_stop is not None and self.should_stop():
+                self.exhausted = self.cancelled = True
+                return True
+        return False
+
+    def _search(self, remaining: int) -> int:
+        """Fill the remaining slots.
+
+        Returns SOLVED, or on failure the conflict set: the placed slots
+        whose words explain why this subtree has no solution.
+        """
+        if remaining == 0:
+            return SOLVED
+        if self._out_of_budget():
+            return self.assigned_mask
+
+        if not self.backjumping:
+            return self._search_node(remaining)
+
+        key, key_explanation = self._signature()
+        if key in self.nogoods:
+            self.stats.nogood_hits += 1
+            return key_explanation
+
+        truncations = self._truncations
+        conflict = self._search_node(remaining)
+
+        # A failure caused by running out of budget, or below a node whose
+        # untried candidates might have succeeded, proves nothing
+        if (
+            conflict != SOLVED
+            and not self.exhausted
+            and self._truncations == truncations
+            and len(self.nogoods) < self.max_nogoods
+        ):
+            self.nogoods.add(key)
+            self.stats.nogoods += 1
+        return conflict
+
+    def _search_node(self, remaining: int) -> int:
+        i, dead_end = self._select_slot()
+        if dead_end:
+            return self._explain(i)
+
+        bit = 1 << i
+        conflict = self._explain(i)
+        index = self.slot_index[i]
+        candidates = index.word_ids(self._live_domain(i))
+        self.rng.shuffle(candidates)
+        if len(candidates) > self.max_candidates:
+            # Untried words could still succeed, so any earlier slot may matter
+            candidates = candidates[:self.max_candidates]
+            conflict |= self.assigned_mask
+            self._truncations += 1
+        self.stats.candidates += len(candidates)
+
+        for word_id in candidates:
+            self.stats.nodes += 1
+            mark = len(self.trail)
+            old_values = self._place(i, word_id)
+            self._set_domain(i, index.single(word_id), 0)
+
+            if self._propagate(i):
+                result = self._search(remaining - 1)
+                if result == SOLVED:
+                    return SOLVED
+            else:
+                result = self._wipeout_conflict
+
+            self.stats.backtracks += 1
+            self._undo(mark)
+            self._unplace(i, old_values)
+
+            if self.exhausted or self._out_of_budget():
+                return self.assigned_mask
+            if self.backjumping and not result & bit:
+                # This slot played no part in the failure; trying its other
+                # words cannot help, so jump back to the culprit.
+                self.stats.backjumps += 1
+                return result
+            conflict |= result & ~bit
+
+        return conflict & ~bit
+
+    def solve(self) -> Optional[list[list[str]]]:
+        """Run the search. Returns the filled grid, or None on failure.
+
+        When the deadline passes, the search stops within a few nodes and
+        returns None with ``timed_out`` set; ``best_solution`` then holds the
+        most complete partial fill it reached (``best_depth`` slots).
+        """
+        start = time.perf_counter()
+        try:
+            if self.deadline.expired():
+                self.exhausted = self.timed_out = True
+                return None
+            if self.should_stop is not None and self.should_stop():
+                self.exhausted = self.cancelled = True
+                return None
+            if not self._initial_propagation():
+                return None
+            if self._search(len(self.slots)) == SOLVED:
+                self.best_depth = len(self.slots)
+                self.best_solution = self.solution
+                return self.solution
+            return None
+        finally:
+            self.stats.timeouts += self.timed_out
+            self.stats.elapsed_ms += (time.perf_counter() - start) * 1000
@@ -0,0 +1,289 @@
+"""Cross-worker locks held while a week's puzzles are generated.
+
+Only one worker - thread or process, on any host sharing the database -
+generates a given week at a time. Backends (GENERATION_LOCK_BACKEND):
+
+    advisory  PostgreSQL session-level advisory lock on a connection the lock
+              keeps open; the server drops it as soon as the holder dies
+    sqlite    a generation_leases row claimed under BEGIN IMMEDIATE and kept
+              alive by heartbeats; a lease whose last heartbeat is older than
+              GENERATION_LOCK_STALE_SECONDS is taken over
+    file      flock on a file under GENERATION_LOCK_DIR (single host, tests)
+
+"auto" picks advisory on PostgreSQL and sqlite otherwise. Waiters block in
+acquire() with a timeout: a release in the same process wakes them at once,
+holders in other processes are polled for with exponential backoff.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, Optional
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.config import get_settings
+from app.models.cache_meta import GenerationLease
+
+logger = logging.getLogger(__name__)
+
+# Waiters' polling interval: first delay and cap (doubling in between)
+POLL_INITIAL_SECONDS = 0.05
+POLL_MAX_SECONDS = 1.0
+
+# Notified whenever a lock of this process is released
+_released = threading.Condition()
+
+# One lock object per (engine, backend): holders are tracked per object
+_locks: dict[tuple[Engine, str], "GenerationLock"] = {}
+_locks_guard = threading.Lock()
+
+
+def _holder_id() -> str:
+    """Identifies one acquisition: host, process and a random token."""
+    return f"{socket.gethostname()[:40]}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+class GenerationLock(ABC):
+    """Exclusive, non-reentrant lock per key (a week key)."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    @abstractmethod
+    def try_acquire(self, key: str) -> bool:
+        """Take the lock if it is free. Returns True if acquired."""
+
+    @abstractmethod
+    def _release(self, key: str) -> None:
+        """Release ``key`` if held, without waking waiters."""
+
+    def heartbeat(self, key: str) -> None:
+        """Tell other workers the holder of ``key`` is still alive."""
+
+    def release(self, key: str) -> None:
+        """Release ``key`` (a no-op if this object doesn't hold it)."""
+        try:
+            self._release(key)
+        finally:
+            with _released:
+                _released.notify_all()
+
+    def acquire(self, key: str, timeout: float = 0) -> bool:
+        """Take the lock, waiting up to ``timeout`` seconds for the holder."""
+        deadline = time.monotonic() + timeout
+        delay = POLL_INITIAL_SECONDS
+        while True:
+            if self.try_acquire(key):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            with _released:
+                _released.wait(min(delay, remaining))
+            delay = min(delay * 2, POLL_MAX_SECONDS)
+
+    @contextmanager
+    def heartbeats(self, key: str, interval: Optional[float] = None) -> Iterator[None]:
+        """Send heartbeats for ``key`` from a background thread inside the block."""
+        if interval is None:
+            interval = get_settings().generation_heartbeat_seconds
+        if interval <= 0 or type(self).heartbeat is GenerationLock.heartbeat:
+            yield
+            return
+
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(interval):
+                try:
+                    self.heartbeat(key)
+                except Exception as e:
+                    logger.warning(f"Heartbeat for {key} failed: {e}")
+
+        thread = threading.Thread(target=beat, name=f"generation-heartbeat-{key}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+
+class AdvisoryLock(GenerationLock):
+    """PostgreSQL advisory lock, held on a dedicated connection."""
+
+    def __init__(self, engine: Engine):
+        super().__init__(engine)
+        self._connections: dict[str, Connection] = {}
+        self._guard = threading.Lock()
+
+    @staticmethod
+    def lock_id(key: str) -> int:
+        """Signed 64-bit advisory lock id for ``key``."""
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def try_acquire(self, key: str) -> bool:
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:id)"), {"id": self.lock_id(key)}
+            ).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        with self._guard:
+            self._connections[key] = conn
+        return True
+
+    def _release(self, key: str) -> None:
+        with self._guard:
+            conn = self._connections.pop(key, None)
+        if conn is None:
+            return
+        try:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": self.lock_id(key)})
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class LeaseLock(GenerationLock):
+    """Heartbeated lease row, claimed under SQLite's BEGIN IMMEDIATE."""
+
+    def __init__(self, engine: Engine, stale_seconds: Optional[float] = None):
+        super().__init__(engine)
+        if stale_seconds is None:
+            stale_seconds = get_settings().generation_lock_stale_seconds
+        self.stale_seconds = stale_seconds
+        self._holders: dict[str, str] = {}
+
+    def try_acquire(self, key: str) -> bool:
+        table = GenerationLease.__table__
+        holder = _holder_id()
+        now = datetime.utcnow()
+
+        with self.engine.connect() as conn:
+            try:
+                if conn.dialect.name == "sqlite":
+                    # Take the write lock up front so check-and-claim is atomic
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    select(table.c.holder, table.c.heartbeat_at).where(table.c.lock_key == key)
+                ).first()
+                if row is not None and row.heartbeat_at > now - timedelta(seconds=self.stale_seconds):
+                    conn.rollback()
+                    return False
+                if row is not None:
+                    logger.warning(f"Taking over stale generation lease for {key} from {row.holder}")
+                    conn.execute(
+                        update(table).where(table.c.lock_key == key)
+                        .values(holder=holder, acquired_at=now, heartbeat_at=now)
+                    )
+                else:
+                    conn.execute(
+                        insert(table)
+                        .values(lock_key=key, holder=holder, acquired_at=now, heartbeat_at=now)
+                    )
+                conn.commit()
+            except (IntegrityError, OperationalError) as e:
+                # Lost a race for the row, or the database stayed busy
+                logger.debug(f"Generation lease for {key} not acquired: {e}")
+                conn.rollback()
+                return False
+
+        self._holders[key] = holder
+        return True
+
+    def heartbeat(self, key: str) -> None:
+        holder = self._holders.get(key)
+        if holder is None:
+            return
+        table = GenerationLease.__table__
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(table)
+                .where(table.c.lock_key == key, table.c.holder == holder)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+        if not result.rowcount:
+            logger.warning(f"Generation lease for {key} was taken over")
+
+    def _release(self, key: str) -> None:
+        holder = self._holders.pop(key, None)
+        if holder is None:
+            return
+        table = GenerationLease.__table__
+        with self.engine.begin() as conn:
+            conn.execute(
+                delete(table).where(table.c.lock_key == key, table.c.holder == holder)
+            )
+
+
+class FileLock(GenerationLock):
+    """flock on one file per key; only excludes workers on the same host."""
+
+    def __init__(self, engine: Engine, directory: Optional[str] = None):
+        super().__init__(engine)
+        self.directory = directory or get_settings().generation_lock_dir
+        self._files: dict[str, int] = {}
+
+    def path(self, key: str) -> str:
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in key)
+        return os.path.join(self.directory, f"{name}.lock")
+
+    def try_acquire(self, key: str) -> bool:
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self.path(key), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        except Exception:
+            os.close(fd)
+            raise
+        self._files[key] = fd
+        return True
+
+    def _release(self, key: str) -> None:
+        fd = self._files.pop(key, None)
+        if fd is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+
+_BACKENDS = {
+    "advisory": AdvisoryLock,
+    "sqlite": LeaseLock,
+    "file": FileLock,
+}
+
+
+def get_generation_lock(engine: Engine) -> GenerationLock:
+    """The configured generation lock for ``engine`` (shared within the process)."""
+    backend = get_settings().generation_lock_backend
+    if backend == "auto":
+        backend = "advisory" if engine.dialect.name == "postgresql" else "sqlite"
+
+    with _locks_guard:
+        lock = _locks.get((engine, backend))
+        if lock is None:
+            lock = _BACKENDS[backend](engine)
+            _locks[(engine, backend)] = lock
+    return lock
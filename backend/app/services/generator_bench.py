@@ -0,0 +1,161 @@
+"""Benchmark harness for the puzzle generator.
+
+Fills every pattern in PATTERNS with N seeds against one or more lexicon
+sizes and summarizes success rate, fill time percentiles and the search
+counters from FillStats. The report is plain JSON, so a run can be stored
+as a baseline and later runs diffed against it (see compare_reports).
+Used by ``manage.py bench-generate`` and tests/test_generator_benchmark.py.
+"""
+
+import math
+import platform
+import random
+import time
+from datetime import datetime
+from typing import Optional, Sequence
+
+from app.services.fill_engine import ENGINE_VERSION, FillSolver, FillStats
+from app.services.lexicon import Lexicon
+
+# Search counters summarized per pattern
+COUNTERS = ("nodes", "backtracks", "candidates")
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def sample_lexicon(lexicon: Lexicon, size: Optional[int], seed: int = 0) -> Lexicon:
+    """A lexicon of about ``size`` words drawn from ``lexicon``.
+
+    Each length keeps its share of the words. None (or a size at least as
+    large as the lexicon) returns the lexicon itself.
+    """
+    total = len(lexicon)
+    if not size or size >= total:
+        return lexicon
+
+    rng = random.Random(seed)
+    words = {
+        length: rng.sample(lexicon.words(length), round(size * len(lexicon.words(length)) / total))
+        for length in lexicon.lengths
+    }
+    return Lexicon(words, clued_words=lexicon.clued_words, source=f"{lexicon.source}:sample{size}")
+
+
+def _summary(values: Sequence[float]) -> dict:
+    return {
+        "mean": sum(values) / len(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+    }
+
+
+def bench_pattern(
+    pattern: list[list[str]],
+    slots: Sequence,
+    lexicon: Lexicon,
+    seeds: int,
+    backend: str = "bitset",
+    propagation: str = "ac3",
+) -> dict:
+    """Fill one pattern with seeds 0..seeds-1 and summarize the runs."""
+    indexes = lexicon.indexes(backend)
+    times_ms = []
+    counters = {name: [] for name in COUNTERS}
+    filled = 0
+
+    for seed in range(seeds):
+        stats = FillStats()
+        solver = FillSolver(
+            pattern, slots, indexes,
+            propagation=propagation, stats=stats, rng=random.Random(seed),
+        )
+        start = time.perf_counter()
+        solution = solver.solve()
+        times_ms.append((time.perf_counter() - start) * 1000)
+        filled += solution is not None
+        for name in COUNTERS:
+            counters[name].append(getattr(stats, name))
+
+    result = {
+        "runs": seeds,
+        "filled": filled,
+        "success_rate": filled / seeds if seeds else 0.0,
+        "fill_ms": _summary(times_ms),
+    }
+    for name, values in counters.items():
+        result[name] = _summary(values)
+    return result
+
+
+def run_benchmark(
+    lexicon: Lexicon,
+    seeds: int = 5,
+    lexicon_sizes: Sequence[Optional[int]] = (None,),
+    pattern_ids: Optional[Sequence[int]] = None,
+    backend: str = "bitset",
+    propagation: str = "ac3",
+) -> dict:
+    """Benchmark every selected pattern (1-based ids) at every lexicon size."""
+    from app.services.puzzle_templates import COMPILED_PATTERNS, PATTERNS
+
+    if pattern_ids is None:
+        pattern_ids = range(1, len(PATTERNS) + 1)
+
+    results = []
+    for size in lexicon_sizes:
+        sample = sample_lexicon(lexicon, size)
+        for pattern_id in pattern_ids:
+            compiled = COMPILED_PATTERNS[pattern_id - 1]
+            row = bench_pattern(
+                PATTERNS[pattern_id - 1], compiled.slots, sample, seeds,
+                backend=backend, propagation=propagation,
+            )
+            results.append({"lexicon_size": len(sample), "pattern": pattern_id, **row})
+
+    return {
+        "created_at": datetime.utcnow().isoformat(),
+        "config": {
+            "seeds": seeds,
+            "backend": backend,
+            "propagation": propagation,
+            "engine_version": ENGINE_VERSION,
+            "lexicon_version": lexicon.version,
+            "python": platform.python_version(),
+        },
+        "results": results,
+    }
+
+
+def compare_reports(current: dict, baseline: dict) -> list[dict]:
+    """Per (lexicon size, pattern) changes from a baseline report.
+
+    Ratios are current / baseline, so > 1 means slower or more search.
+    Rows missing from either report are skipped.
+    """
+    def key(row):
+        return row["lexicon_size"], row["pattern"]
+
+    base_rows = {key(row): row for row in baseline.get("results", [])}
+    changes = []
+    for row in current.get("results", []):
+        base = base_rows.get(key(row))
+        if base is None:
+            continue
+        change = {
+            "lexicon_size": row["lexicon_size"],
+            "pattern": row["pattern"],
+            "success_rate": row["success_rate"] - base["success_rate"],
+        }
+        for metric, stat in (("fill_ms", "p50"), ("fill_ms", "p95"), ("nodes", "mean")):
+            before = base[metric][stat]
+            change[f"{metric}_{stat}"] = row[metric][stat] / before if before else None
+        changes.append(change)
+    return changes
@@ -0,0 +1,278 @@
+"""Positional word index for fast crossword candidate lookup.
+
+Words of a single length are numbered by their position in a sorted tuple.
+For every (position, letter) pair the index keeps a bitset - a Python int
+whose bit ``i`` is set when word ``i`` has that letter at that position - so
+the candidates for a partially filled slot are simply the AND of one bitset
+per fixed letter instead of a scan over the whole word list.
+
+The fill engine treats these bitsets as opaque "domains": it combines them
+with ``&``, ``|`` and ``~`` and goes through the index for everything else
+(``single``, ``count``, ``word_ids``, ...). Any index exposing the same
+methods - such as the NumPy backend in app.services.lexicon_numpy - can be
+used in its place.
+"""
+
+import hashlib
+import threading
+from types import MappingProxyType
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
+
+def bits_from_ids(ids: Iterable[int], size: int) -> int:
+    """Build a bitset with the given bit positions set."""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the positions of set bits in ascending order."""
+    # One pass over the binary representation is much cheaper than
+    # repeatedly isolating the lowest bit of a very large int.
+    digits = bin(mask)[:1:-1]
+    pos = digits.find("1")
+    while pos != -1:
+        yield pos
+        pos = digits.find("1", pos + 1)
+
+
+class WordIndex:
+    """Bitset index over all words of one length."""
+
+    __slots__ = ("length", "words", "ids", "full", "_masks")
+
+    empty = 0
+
+    def __init__(self, length: int, words: Iterable[str]):
+        self.length = length
+        self.words: tuple[str, ...] = tuple(
+            sorted({w.upper() for w in words if len(w) == length})
+        )
+        self.ids: dict[str, int] = {w: i for i, w in enumerate(self.words)}
+        size = len(self.words)
+        self.full = (1 << size) - 1
+
+        positions: list[dict[str, list[int]]] = [{} for _ in range(length)]
+        for i, word in enumerate(self.words):
+            for pos, letter in enumerate(word):
+                positions[pos].setdefault(letter, []).append(i)
+
+        self._masks: list[dict[str, int]] = [
+            {letter: bits_from_ids(ids, size) for letter, ids in by_letter.items()}
+            for by_letter in positions
+        ]
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ids
+
+    def letter_mask(self, pos: int, letter: str) -> int:
+        """Bitset of words with ``letter`` at ``pos``."""
+        return self._masks[pos].get(letter, 0)
+
+    def match(self, pattern: list[Optional[str]]) -> int:
+        """Bitset of words matching a pattern (None = any letter)."""
+        mask = self.full
+        for pos, letter in enumerate(pattern):
+            if letter is not None:
+                mask &= self._masks[pos].get(letter, 0)
+                if not mask:
+                    break
+        return mask
+
+    def letters_in(self, mask: int, pos: int) -> list[str]:
+        """Letters that occur at ``pos`` in at least one word of ``mask``."""
+        return [letter for letter, m in self._masks[pos].items() if m & mask]
+
+    def letters_mask(self, pos: int, letters: Iterable[str]) -> int:
+        """Bitset of words with any of ``letters`` at ``pos``."""
+        masks = self._masks[pos]
+        mask = 0
+        for letter in letters:
+            mask |= masks.get(letter, 0)
+        return mask
+
+    def single(self, word_id: int) -> int:
+        """Domain holding only the given word."""
+        return 1 << word_id
+
+    def count(self, mask: int) -> int:
+        return mask.bit_count()
+
+    def is_empty(self, mask: int) -> bool:
+        return not mask
+
+    def equal(self, a: int, b: int) -> bool:
+        return a == b
+
+    def has_word(self, mask: int, word_id: int) -> bool:
+        return mask >> word_id & 1 == 1
+
+    def word_ids(self, mask: int) -> list[int]:
+        return list(iter_bits(mask))
+
+    def freeze(self, mask: int) -> int:
+        """Hashable form of a domain."""
+        return mask
+
+    def word_bit(self, word: str) -> int:
+        """Single-bit mask for a word, or 0 if it is not indexed."""
+        i = self.ids.get(word)
+        return 0 if i is None else 1 << i
+
+    def words_for(self, mask: int) -> list[str]:
+        """Decode a bitset back into its words (in sorted order)."""
+        words = self.words
+        return [words[i] for i in iter_bits(mask)]
+
+    def candidates(self, pattern: list[Optional[str]], exclude: int = 0) -> list[str]:
+        """Words matching a pattern, minus any words in the ``exclude`` bitset."""
+        return self.words_for(self.match(pattern) & ~exclude)
+
+
+# Candidate engines selectable by name
+CANDIDATE_BACKENDS = ("bitset", "numpy")
+
+
+def build_word_indexes(
+    words_by_length: dict[int, Iterable[str]],
+    backend: str = "bitset",
+) -> dict:
+    """Build one index per word length using the chosen candidate backend."""
+    if backend == "bitset":
+        index_class = WordIndex
+    elif backend == "numpy":
+        from app.services.lexicon_numpy import NumpyWordIndex
+        index_class = NumpyWordIndex
+    else:
+        raise ValueError(f"Unknown candidate backend: {backend}")
+
+    return {
+        length: index_class(length, words)
+        for length, words in words_by_length.items()
+    }
+
+
+class Lexicon:
+    """Immutable, versioned word list shared by every puzzle generator.
+
+    Built once per process (see puzzle_templates.get_lexicon) and never
+    modified afterwards: it owns the sorted per-length word tuples, the set
+    of words that have a real clue, and the positional indexes, which are
+    built lazily per candidate backend on first use.
+
+    A Lexicon can also be opened from a compiled file (see
+    app.services.lexicon_file), in which case ``path`` is set and its words
+    and bitset indexes are read from a shared memory mapping.
+    """
+
+    __slots__ = (
+        "source", "version", "path", "_words", "_word_sets", "_clued", "_indexes", "_lock",
+    )
+
+    def __init__(
+        self,
+        words_by_length: Mapping[int, Iterable[str]],
+        clued_words: Iterable[str] = (),
+        source: str = "builtin",
+    ):
+        words = {
+            length: tuple(sorted({w.upper() for w in group if len(w) == length}))
+            for length, group in sorted(words_by_length.items())
+        }
+        self._words: Mapping[int, tuple[str, ...]] = MappingProxyType(
+            {length: group for length, group in words.items() if group}
+        )
+        self._word_sets: Mapping[int, frozenset[str]] = MappingProxyType(
+            {length: frozenset(group) for length, group in self._words.items()}
+        )
+        self._clued = frozenset(w.upper() for w in clued_words)
+        self._indexes: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.source = source
+        self.path: Optional[str] = None
+
+        digest = hashlib.sha256()
+        for length, group in self._words.items():
+            digest.update(f"{length}:".encode())
+            digest.update("\n".join(group).encode())
+        self.version = digest.hexdigest()[:16]
+
+    @classmethod
+    def prebuilt(
+        cls,
+        words: Mapping[int, Sequence[str]],
+        clued_words: Iterable[str],
+        source: str,
+        version: str,
+        indexes: dict,
+        path: Optional[str] = None,
+    ) -> "Lexicon":
+        """A Lexicon over already sorted, uppercase word sequences.
+
+        Skips sorting and hashing: ``version`` and the prebuilt ``indexes``
+        (per backend) are trusted as given. The word sequences must support
+        ``in`` as they also serve as the membership sets.
+        """
+        lexicon = cls.__new__(cls)
+        lexicon._words = MappingProxyType(dict(words))
+        lexicon._word_sets = lexicon._words
+        lexicon._clued = frozenset(clued_words)
+        lexicon._indexes = dict(indexes)
+        lexicon._lock = threading.Lock()
+        lexicon.source = source
+        lexicon.version = version
+        lexicon.path = path
+        return lexicon
+
+    def __reduce__(self):
+        # Pickle only the words (e.g. for process pool workers); the lock
+        # can't be pickled and the indexes are cheaper to rebuild than to copy.
+        # A file-backed lexicon is reopened from its file instead.
+        if self.path is not None:
+            from app.services.lexicon_file import load_lexicon_file
+            return (load_lexicon_file, (self.path, self.source))
+        return (Lexicon, (dict(self._words), self._clued, self.source))
+
+    def __len__(self) -> int:
+        return sum(len(group) for group in self._words.values())
+
+    def __contains__(self, word: str) -> bool:
+        group = self._word_sets.get(len(word))
+        return group is not None and word in group
+
+    def __repr__(self) -> str:
+        return f"<Lexicon(source={self.source}, version={self.version}, words={len(self)})>"
+
+    @property
+    def lengths(self) -> tuple[int, ...]:
+        return tuple(self._words)
+
+    @property
+    def words_by_length(self) -> Mapping[int, frozenset[str]]:
+        """Read-only word collections per length (for membership checks)."""
+        return self._word_sets
+
+    @property
+    def clued_words(self) -> frozenset[str]:
+        """Words that have a real clue rather than a generic fallback."""
+        return self._clued
+
+    def words(self, length: int) -> Sequence[str]:
+        """Sorted words of one length."""
+        return self._words.get(length, ())
+
+    def indexes(self, backend: str = "bitset") -> dict:
+        """Positional indexes for every length, built once per backend."""
+        indexes = self._indexes.get(backend)
+        if indexes is None:
+            with self._lock:
+                indexes = self._indexes.get(backend)
+                if indexes is None:
+                    indexes = build_word_indexes(self._words, backend=backend)
+                    self._indexes[backend] = indexes
+        return indexes
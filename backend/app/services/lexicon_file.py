@@ -0,0 +1,277 @@
+"""Compiled, memory-mapped lexicon files.
+
+A lexicon file holds everything the generator needs in a layout that can be
+used straight from an ``mmap``, so every worker process that opens the same
+file shares its physical pages and loading it costs O(1):
+
+    header    magic, lexicon version, bucket count, metadata size
+    buckets   (length, word count, words offset, masks offset) per length
+    metadata  JSON: lexicon source and the words that have a real clue
+    words     per length: the sorted words as fixed-width ASCII, no separators
+    masks     per length: for each position and letter A-Z, a little-endian
+              bitset of ceil(count / 8) bytes - the WordIndex masks
+
+Words are read from the mapping on demand (membership is a binary search
+over the fixed-width records); a length's bitset index is materialised from
+its mask block the first time a fill needs it. Build files with
+``python manage.py build-lexicon``.
+
+Only the words stay shared between workers. The fill engine's domains are
+Python ints, which can't alias mapped memory, so materialising a length
+copies its masks into private ints: 26 * length * count / 8 bytes. A
+file of the full dwyl list (about 97k words of 3-7 letters, 2.5 MB) costs
+each worker about 1.8 MB of private RSS once every length has been used,
+and well under 0.5 MB for 5x5 grids. Words that are only read stay in
+the page cache, shared by every process.
+"""
+
+import json
+import mmap
+import os
+import string
+import struct
+import tempfile
+import threading
+from collections.abc import Mapping, Sequence
+from typing import Optional
+
+from app.services.lexicon import Lexicon, WordIndex
+
+MAGIC = b"MXLEX001"
+LETTERS = string.ascii_uppercase
+
+# magic, lexicon version, bucket count, metadata size
+_HEADER = struct.Struct("<8s16sII")
+# word length, word count, words offset, masks offset
+_BUCKET = struct.Struct("<IIQQ")
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class MappedWords(Sequence):
+    """Sorted fixed-width words of one length, read from a mapping."""
+
+    __slots__ = ("_data", "_offset", "length", "_count")
+
+    def __init__(self, data: mmap.mmap, offset: int, length: int, count: int):
+        self._data = data
+        self._offset = offset
+        self.length = length
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        start = self._offset + i * self.length
+        return self._data[start:start + self.length].decode("ascii")
+
+    def __iter__(self):
+        data, length = self._data, self.length
+        block = data[self._offset:self._offset + self._count * length].decode("ascii")
+        for start in range(0, len(block), length):
+            yield block[start:start + length]
+
+    def __contains__(self, word) -> bool:
+        return self.find(word) is not None
+
+    def find(self, word: str) -> Optional[int]:
+        """Position of ``word`` (binary search), or None."""
+        if len(word) != self.length:
+            return None
+        try:
+            target = word.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        data, length, offset = self._data, self.length, self._offset
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offset + mid * length
+            record = data[start:start + length]
+            if record < target:
+                lo = mid + 1
+            elif record > target:
+                hi = mid
+            else:
+                return mid
+        return None
+
+
+class _MappedIds:
+    """The ``ids`` lookup of a MappedWordIndex, without a per-word dict."""
+
+    __slots__ = ("_words",)
+
+    def __init__(self, words: MappedWords):
+        self._words = words
+
+    def __contains__(self, word: str) -> bool:
+        return self._words.find(word) is not None
+
+    def get(self, word: str, default=None):
+        i = self._words.find(word)
+        return default if i is None else i
+
+
+class MappedWordIndex(WordIndex):
+    """
+    WordIndex whose words and letter bitsets come from a lexicon file.
+
+    The words are read from the mapping. The masks are copied into ints
+    when the index is built (see the module docstring for what that costs).
+    """
+
+    __slots__ = ()
+
+    def __init__(self, words: MappedWords, data: mmap.mmap, masks_offset: int):
+        self.length = length = words.length
+        self.words = words
+        self.ids = _MappedIds(words)
+        size = len(words)
+        self.full = (1 << size) - 1
+
+        stride = (size + 7) // 8
+        self._masks = []
+        offset = masks_offset
+        for _ in range(length):
+            by_letter = {}
+            for letter in LETTERS:
+                mask = int.from_bytes(data[offset:offset + stride], "little")
+                if mask:
+                    by_letter[letter] = mask
+                offset += stride
+            self._masks.append(by_letter)
+
+
+class _MappedIndexes(Mapping):
+    """Bitset indexes per length, each built from the file on first access."""
+
+    def __init__(self, data: mmap.mmap, buckets: dict[int, tuple[MappedWords, int]]):
+        self._data = data
+        self._buckets = buckets
+        self._built: dict[int, MappedWordIndex] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, length: int) -> MappedWordIndex:
+        index = self._built.get(length)
+        if index is None:
+            words, masks_offset = self._buckets[length]
+            with self._lock:
+                index = self._built.get(length)
+                if index is None:
+                    index = MappedWordIndex(words, self._data, masks_offset)
+                    self._built[length] = index
+        return index
+
+    def __iter__(self):
+        return iter(self._buckets)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def write_lexicon_file(lexicon: Lexicon, path: str) -> int:
+    """
+    Compile a lexicon into a file at ``path`` (written atomically).
+
+    Words that aren't plain A-Z (such as "HASN'T") can't be stored in the
+    fixed-width records and are dropped, which gives the file's lexicon its
+    own version. Returns the size of the file in bytes.
+    """
+    letters_only = {
+        length: [w for w in lexicon.words(length) if w.isascii() and w.isalpha()]
+        for length in lexicon.lengths
+    }
+    if sum(map(len, letters_only.values())) != len(lexicon):
+        lexicon = Lexicon(letters_only, clued_words=lexicon.clued_words, source=lexicon.source)
+
+    indexes = lexicon.indexes("bitset")
+    meta = json.dumps({
+        "source": lexicon.source,
+        "clued_words": sorted(lexicon.clued_words),
+    }).encode()
+
+    offset = _align(_HEADER.size + _BUCKET.size * len(lexicon.lengths) + len(meta))
+    buckets = []
+    blocks = []
+    for length in lexicon.lengths:
+        words = lexicon.words(length)
+        data = "".join(words)
+        stride = (len(words) + 7) // 8
+        index = indexes[length]
+        masks = b"".join(
+            index.letter_mask(pos, letter).to_bytes(stride, "little")
+            for pos in range(length)
+            for letter in LETTERS
+        )
+        words_offset = offset
+        masks_offset = _align(words_offset + len(data))
+        offset = _align(masks_offset + len(masks))
+        buckets.append((length, len(words), words_offset, masks_offset))
+        blocks.append((words_offset, data.encode("ascii")))
+        blocks.append((masks_offset, masks))
+
+    out = bytearray(offset)
+    _HEADER.pack_into(out, 0, MAGIC, lexicon.version.encode("ascii"), len(buckets), len(meta))
+    for i, bucket in enumerate(buckets):
+        _BUCKET.pack_into(out, _HEADER.size + i * _BUCKET.size, *bucket)
+    meta_offset = _HEADER.size + _BUCKET.size * len(buckets)
+    out[meta_offset:meta_offset + len(meta)] = meta
+    for block_offset, block in blocks:
+        out[block_offset:block_offset + len(block)] = block
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(out)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return len(out)
+
+
+def load_lexicon_file(path: str, source: Optional[str] = None) -> Lexicon:
+    """
+    Open a compiled lexicon file as a Lexicon backed by a shared mapping.
+
+    ``source`` overrides the source recorded in the file (get_lexicon uses
+    the file's fingerprint so it notices when the file is rebuilt).
+    """
+    with open(path, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, count, meta_size = _HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        data.close()
+        raise ValueError(f"{path} is not a compiled lexicon file")
+
+    buckets: dict[int, tuple[MappedWords, int]] = {}
+    for i in range(count):
+        length, size, words_offset, masks_offset = _BUCKET.unpack_from(
+            data, _HEADER.size + i * _BUCKET.size
+        )
+        buckets[length] = (MappedWords(data, words_offset, length, size), masks_offset)
+
+    meta_offset = _HEADER.size + _BUCKET.size * count
+    meta = json.loads(data[meta_offset:meta_offset + meta_size])
+
+    return Lexicon.prebuilt(
+        words={length: words for length, (words, _) in buckets.items()},
+        clued_words=meta["clued_words"],
+        source=source or meta["source"],
+        version=version.decode("ascii"),
+        indexes={"bitset": _MappedIndexes(data, buckets)},
+        path=os.path.abspath(path),
+    )
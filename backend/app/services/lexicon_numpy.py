@@ -0,0 +1,122 @@
+"""NumPy candidate backend for the fill engine.
+
+The words of one length are stored as a ``uint8`` matrix of shape
+(n_words, length) holding their ASCII codes. Matching a slot pattern is one
+vectorized comparison per fixed letter, and domains - including the used-word
+exclusion - are boolean arrays over word ids. It exposes the same methods as
+WordIndex, so the fill engine can use either.
+
+NumPy is an optional dependency; the default "bitset" backend needs nothing
+beyond the standard library.
+"""
+
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+def numpy_available() -> bool:
+    """Whether the numpy backend can be used."""
+    return np is not None
+
+
+class NumpyWordIndex:
+    """Matrix index over all words of one length."""
+
+    __slots__ = ("length", "words", "ids", "matrix", "full", "empty")
+
+    def __init__(self, length: int, words: Iterable[str]):
+        if np is None:
+            raise RuntimeError("The numpy candidate backend requires numpy (pip install numpy)")
+
+        self.length = length
+        self.words: tuple[str, ...] = tuple(
+            sorted({w.upper() for w in words if len(w) == length and w.isascii()})
+        )
+        self.ids: dict[str, int] = {w: i for i, w in enumerate(self.words)}
+        size = len(self.words)
+        self.matrix = (
+            np.frombuffer("".join(self.words).encode("ascii"), dtype=np.uint8)
+            .reshape(size, length)
+            .copy()
+        )
+        self.full = np.ones(size, dtype=bool)
+        self.empty = np.zeros(size, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        if len(word) != self.length or not word.isascii():
+            return False
+        return bool(self.match(list(word)).any())
+
+    def letter_mask(self, pos: int, letter: str):
+        """Boolean mask of words with ``letter`` at ``pos``."""
+        return self.matrix[:, pos] == ord(letter)
+
+    def match(self, pattern: list[Optional[str]]):
+        """Boolean mask of words matching a pattern (None = any letter)."""
+        mask = self.full
+        for pos, letter in enumerate(pattern):
+            if letter is not None:
+                # Not in place: ``full`` is shared by every caller
+                mask = mask & (self.matrix[:, pos] == ord(letter))
+        return mask
+
+    def letters_in(self, mask, pos: int) -> list[str]:
+        """Letters that occur at ``pos`` in at least one word of ``mask``."""
+        counts = np.bincount(self.matrix[mask, pos], minlength=128)
+        return [chr(code) for code in np.flatnonzero(counts)]
+
+    def letters_mask(self, pos: int, letters: Iterable[str]):
+        """Boolean mask of words with any of ``letters`` at ``pos``."""
+        # A 256-entry lookup table beats np.isin for single-byte codes
+        table = np.zeros(256, dtype=bool)
+        table[[ord(letter) for letter in letters]] = True
+        return table[self.matrix[:, pos]]
+
+    def single(self, word_id: int):
+        """Domain holding only the given word."""
+        mask = self.empty.copy()
+        mask[word_id] = True
+        return mask
+
+    def count(self, mask) -> int:
+        return int(np.count_nonzero(mask))
+
+    def is_empty(self, mask) -> bool:
+        return not mask.any()
+
+    def equal(self, a, b) -> bool:
+        return bool(np.array_equal(a, b))
+
+    def has_word(self, mask, word_id: int) -> bool:
+        return bool(mask[word_id])
+
+    def word_ids(self, mask) -> list[int]:
+        return np.flatnonzero(mask).tolist()
+
+    def freeze(self, mask) -> bytes:
+        """Hashable form of a domain."""
+        return np.packbits(mask).tobytes()
+
+    def word_bit(self, word: str):
+        """Single-word mask, or an empty mask if it is not indexed."""
+        i = self.ids.get(word)
+        return self.empty if i is None else self.single(i)
+
+    def words_for(self, mask) -> list[str]:
+        """Decode a mask back into its words (in sorted order)."""
+        words = self.words
+        return [words[i] for i in np.flatnonzero(mask)]
+
+    def candidates(self, pattern: list[Optional[str]], exclude=None) -> list[str]:
+        """Words matching a pattern, minus any words in the ``exclude`` mask."""
+        mask = self.match(pattern)
+        if exclude is not None:
+            mask = mask & ~exclude
+        return self.words_for(mask)
@@ -0,0 +1,225 @@
+"""Compiled crossword pattern geometry.
+
+A pattern's geometry - its runs, word slots, clue numbering and which slot
+positions cross - depends only on where the black squares are. It is
+derived once per distinct black-square layout by compile_pattern() and
+cached, so puzzle generation, the fill engine and post-fill validation all
+read the same precomputed tuples instead of rescanning the grid.
+"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Iterable, Sequence
+
+# Black square marker
+BLACK = "#"
+
+MIN_WORD_LENGTH = 3
+
+
+class CompiledSlot:
+    """One word slot of a pattern.
+
+    ``crossings`` holds (pos_in_this_slot, other_slot, pos_in_other_slot)
+    for every crossing, ``crossing_mask`` the same slots as a bitmask and
+    ``same_length`` the other slots of equal length (which share a word
+    list). Supports ``slot["cells"]``-style access like the slot dicts of
+    extract_word_slots.
+    """
+
+    __slots__ = (
+        "index", "number", "direction", "row", "col", "length", "cells",
+        "crossings", "crossing_mask", "same_length",
+    )
+
+    def __init__(self, index: int, number: int, direction: str, row: int, col: int, cells):
+        self.index = index
+        self.number = number
+        self.direction = direction
+        self.row = row
+        self.col = col
+        self.cells: tuple[tuple[int, int], ...] = tuple(cells)
+        self.length = len(self.cells)
+        self.crossings: tuple[tuple[int, int, int], ...] = ()
+        self.crossing_mask = 0
+        self.same_length: tuple[int, ...] = ()
+
+    def __getitem__(self, key: str):
+        return getattr(self, key)
+
+    def __repr__(self) -> str:
+        return f"<CompiledSlot({self.number} {self.direction}, length={self.length})>"
+
+    def as_dict(self) -> dict:
+        return {
+            "number": self.number,
+            "direction": self.direction,
+            "row": self.row,
+            "col": self.col,
+            "length": self.length,
+            "cells": list(self.cells),
+        }
+
+
+def link_slots(slots: Iterable) -> tuple[CompiledSlot, ...]:
+    """Build CompiledSlots with their crossing maps from slot dicts or slots."""
+    compiled = tuple(
+        CompiledSlot(i, s["number"], s["direction"], s["row"], s["col"], s["cells"])
+        for i, s in enumerate(slots)
+    )
+
+    cell_owner: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for slot in compiled:
+        for pos, cell in enumerate(slot.cells):
+            cell_owner.setdefault(cell, []).append((slot.index, pos))
+
+    crossings: list[list[tuple[int, int, int]]] = [[] for _ in compiled]
+    for owners in cell_owner.values():
+        for i, p in owners:
+            for j, q in owners:
+                if i != j:
+                    crossings[i].append((p, j, q))
+
+    for slot in compiled:
+        slot.crossings = tuple(crossings[slot.index])
+        for _, j, _ in slot.crossings:
+            slot.crossing_mask |= 1 << j
+        slot.same_length = tuple(
+            other.index for other in compiled
+            if other.index != slot.index and other.length == slot.length
+        )
+    return compiled
+
+
+class CompiledPattern:
+    """Precomputed geometry of one black-square layout.
+
+    ``runs`` lists every maximal run of white cells - across runs row by
+    row, then down runs column by column - as (direction, row, col, cells);
+    ``slots`` are the runs of 3+ letters in clue-numbering order.
+    """
+
+    __slots__ = ("shape", "size", "runs", "slots", "numbering", "is_valid", "error")
+
+    def __init__(self, shape: tuple[str, ...]):
+        self.shape = shape
+        self.size = size = len(shape)
+
+        runs = []
+        for r in range(size):
+            for cells in _scan(shape, [(r, c) for c in range(size)]):
+                runs.append(("across", cells[0][0], cells[0][1], cells))
+        for c in range(size):
+            for cells in _scan(shape, [(r, c) for r in range(size)]):
+                runs.append(("down", cells[0][0], cells[0][1], cells))
+        self.runs: tuple[tuple[str, int, int, tuple[tuple[int, int], ...]], ...] = tuple(runs)
+
+        slots = []
+        numbering = []
+        clue_num = 1
+        for r in range(size):
+            for c in range(size):
+                if shape[r][c] == BLACK:
+                    continue
+                starts_across = (c == 0 or shape[r][c - 1] == BLACK) and \
+                    (c + 1 < size and shape[r][c + 1] != BLACK)
+                starts_down = (r == 0 or shape[r - 1][c] == BLACK) and \
+                    (r + 1 < size and shape[r + 1][c] != BLACK)
+                if not (starts_across or starts_down):
+                    continue
+                if starts_across:
+                    cells = _extent(shape, r, c, 0, 1)
+                    if len(cells) >= MIN_WORD_LENGTH:
+                        slots.append({"number": clue_num, "direction": "across",
+                                      "row": r, "col": c, "cells": cells})
+                if starts_down:
+                    cells = _extent(shape, r, c, 1, 0)
+                    if len(cells) >= MIN_WORD_LENGTH:
+                        slots.append({"number": clue_num, "direction": "down",
+                                      "row": r, "col": c, "cells": cells})
+                numbering.append((clue_num, r, c))
+                clue_num += 1
+
+        self.slots = link_slots(slots)
+        # (number, row, col) of every numbered cell
+        self.numbering: tuple[tuple[int, int, int], ...] = tuple(numbering)
+        self.is_valid, self.error = self._validate()
+
+    def __repr__(self) -> str:
+        return f"<CompiledPattern({'/'.join(self.shape)})>"
+
+    def _validate(self) -> tuple[bool, str]:
+        for direction, row, col, cells in self.runs:
+            if len(cells) == 1:
+                return False, f"Single isolated cell at row {row}, col {col}"
+            if len(cells) == 2:
+                kind = "horizontal" if direction == "across" else "vertical"
+                return False, f"2-letter {kind} run at row {row}, col {col}"
+
+        white_cells = {
+            (r, c) for r in range(self.size) for c in range(self.size)
+            if self.shape[r][c] != BLACK
+        }
+        if not white_cells:
+            return False, "No white cells in pattern"
+
+        # BFS to check that all white cells are connected
+        start = next(iter(white_cells))
+        visited = {start}
+        queue = deque([start])
+        while queue:
+            r, c = queue.popleft()
+            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                cell = (r + dr, c + dc)
+                if cell in white_cells and cell not in visited:
+                    visited.add(cell)
+                    queue.append(cell)
+
+        if visited != white_cells:
+            return False, "Disconnected white regions in pattern"
+        return True, "Valid"
+
+    def blank_grid(self) -> list[list[str]]:
+        """Grid for play: black squares kept, letters hidden."""
+        return [[BLACK if cell == BLACK else " " for cell in row] for row in self.shape]
+
+
+def _scan(shape: Sequence[str], line: list[tuple[int, int]]):
+    """Yield the cells of each run of white cells along a line."""
+    run: list[tuple[int, int]] = []
+    for r, c in line:
+        if shape[r][c] != BLACK:
+            run.append((r, c))
+        elif run:
+            yield tuple(run)
+            run = []
+    if run:
+        yield tuple(run)
+
+
+def _extent(shape: Sequence[str], r: int, c: int, dr: int, dc: int) -> tuple[tuple[int, int], ...]:
+    """Cells from (r, c) up to the next black square or the edge."""
+    size = len(shape)
+    cells = []
+    while r < size and c < size and shape[r][c] != BLACK:
+        cells.append((r, c))
+        r += dr
+        c += dc
+    return tuple(cells)
+
+
+@lru_cache(maxsize=256)
+def _compile(shape: tuple[str, ...]) -> CompiledPattern:
+    return CompiledPattern(shape)
+
+
+def compile_pattern(grid: Sequence[Sequence[str]]) -> CompiledPattern:
+    """Compiled geometry for a pattern or (partially) filled grid.
+
+    Only the black squares matter, so every fill of a pattern maps to the
+    same cached CompiledPattern.
+    """
+    if isinstance(grid, CompiledPattern):
+        return grid
+    shape = tuple("".join(BLACK if cell == BLACK else "." for cell in row) for row in grid)
+    return _compile(shape)
@@ -2,24 +2,40 @@
 
 import json
 import logging
-import urllib.request
-from datetime import date, datetime
+import threading
+import time
+from datetime import date, datetime, timedelta
 from typing import Optional
 
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
 
 from app.models.puzzle import Puzzle
+from app.models.solve import Solve
+from app.config import get_settings
 from app.models.cache_meta import PuzzleCacheMeta, DictionaryWord
+from app.services.dictionary_loader import download_dictionary, load_dictionary_file
+from app.services.generation_lock import GenerationLock, get_generation_lock
 
 logger = logging.getLogger(__name__)
 
 # Constants
 PUZZLE_COUNT = 7  # One per day of the week
-GENERATION_TIMEOUT_MINUTES = 10
-MIN_WORD_LENGTH = 3
-MAX_WORD_LENGTH = 7
-MAX_WORDS_PER_LENGTH = 3000  # Limit word list size for speed
+
+# week_key suffix for puzzles replaced by a refresh that users already solved;
+# they are kept (unscheduled) so solve history survives. Fits String(10).
+ARCHIVED_WEEK_SUFFIX = "~a"
+
+# In-process readiness cache: week_key -> time.monotonic() when the week was
+# last confirmed fully generated. Lets ensure_weekly_cache skip the database
+# until the week rolls over or the entry is older than the TTL.
+_ready_weeks: dict[str, float] = {}
+# Set once this process has seen a non-empty dictionary table
+_dictionary_ready = False
+
+# Background generation jobs by week_key (see start_weekly_generation)
+_generation_jobs: dict[str, threading.Thread] = {}
+_generation_jobs_lock = threading.Lock()
 
 # Public word list URL (MIT licensed)
 WORD_LIST_URL = "https://raw.githubusercontent.com/dwyl/english-words/master/words_alpha.txt"
@@ -33,174 +49,457 @@ def get_current_week_key() -> str:
 
 def ensure_dictionary(db: Session) -> None:
     """
-    Ensure dictionary is loaded in DB. Downloads if missing.
+    Ensure dictionary is loaded in DB.
+
+    Loads DICTIONARY_PATH when the table is empty. Downloading the public
+    word list is opt-in (DICTIONARY_AUTO_DOWNLOAD) so startup never depends
+    on the network; otherwise the generator keeps its built-in word lists
+    until `manage.py load-dictionary` is run.
     """
-    count = db.query(DictionaryWord).count()
-    if count > 0:
-        logger.debug(f"Dictionary already loaded: {count} words")
+    global _dictionary_ready
+    if _dictionary_ready:
         return
 
-    logger.info("Dictionary not found, downloading...")
-    _download_and_store_dictionary(db)
+    if db.query(DictionaryWord.id).limit(1).first() is not None:
+        logger.debug("Dictionary already loaded")
+        _dictionary_ready = True
+        return
+
+    settings = get_settings()
+    if settings.dictionary_path:
+        logger.info(f"Dictionary not found, loading {settings.dictionary_path}")
+        load_dictionary_file(db, settings.dictionary_path)
+        _dictionary_ready = True
+    elif settings.dictionary_auto_download:
+        logger.info("Dictionary not found, downloading...")
+        _download_and_store_dictionary(db)
+    else:
+        logger.info(
+            "Dictionary table is empty; load a word list with "
+            "`python manage.py load-dictionary PATH`"
+        )
 
 
 def _download_and_store_dictionary(db: Session) -> int:
     """Download word list and store in database."""
     try:
-        # Download word list
-        logger.info(f"Downloading word list from {WORD_LIST_URL}")
-        with urllib.request.urlopen(WORD_LIST_URL, timeout=30) as response:
-            content = response.read().decode("utf-8")
-
-        # Parse and filter words
-        words = []
-        for line in content.splitlines():
-            word = line.strip().upper()
-            if (
-                word
-                and word.isalpha()
-                and MIN_WORD_LENGTH <= len(word) <= MAX_WORD_LENGTH
-            ):
-                words.append(word)
-
-        # Remove duplicates and sort
-        words = sorted(set(words))
-        logger.info(f"Filtered to {len(words)} words ({MIN_WORD_LENGTH}-{MAX_WORD_LENGTH} letters)")
-
-        # Batch insert
-        batch_size = 1000
-        for i in range(0, len(words), batch_size):
-            batch = words[i : i + batch_size]
-            for word in batch:
-                db.add(DictionaryWord(word=word, length=len(word)))
-            db.flush()
-
-        db.commit()
-        logger.info(f"Successfully stored {len(words)} words in dictionary")
-        return len(words)
-
+        result = download_dictionary(db, WORD_LIST_URL)
     except Exception as e:
-        db.rollback()
         logger.error(f"Failed to download dictionary: {e}")
         raise
+    return result["inserted"]
 
 
 def get_words_by_length(db: Session, length: int) -> list[str]:
     """Get all words of a specific length from dictionary."""
-    words = db.query(DictionaryWord.word).filter(
-        DictionaryWord.length == length
-    ).all()
-    return [w[0] for w in words]
+    from app.services.puzzle_templates import load_dictionary_words_from_db
 
+    return load_dictionary_words_from_db(db, lengths=[length])[length]
 
-def ensure_weekly_cache(db: Session) -> None:
+
+def ensure_weekly_cache(
+    db: Session,
+    week_key: Optional[str] = None,
+    wait: float = 0,
+    in_subprocess: bool = False,
+) -> None:
+    """
+    Ensure puzzle cache exists for current week (or ``week_key``).
+
+    Concurrency-safe: the generation lock (see generation_lock) makes sure
+    only one worker generates a week. If another worker holds it, waits up
+    to ``wait`` seconds for that generation to finish instead of returning
+    straight away. Generates synchronously, so request handlers use
+    check_weekly_cache instead; once a week is known to be ready it is not
+    re-checked in the database until the readiness cache expires (see
+    is_week_ready). Callers in a web process pass ``in_subprocess`` so the
+    search runs in the generation pool instead of competing with request
+    threads for the GIL (see generate_puzzle_batches).
     """
-    Ensure puzzle cache exists for current week.
+    week_key = week_key or get_current_week_key()
+    if is_week_ready(week_key) or not _week_pending(db, week_key):
+        return
+
+    # Make sure the dictionary is available before generating
+    ensure_dictionary(db)
 
-    Concurrency-safe: uses PuzzleCacheMeta to prevent duplicate generation.
-    Called automatically on puzzle requests.
+    lock = get_generation_lock(db.get_bind())
+    if not lock.acquire(week_key, timeout=wait):
+        logger.info(f"Could not acquire lock for {week_key}, another worker is generating")
+        return
+
+    try:
+        # The previous holder may have finished the week while we waited
+        db.expire_all()
+        if not _week_pending(db, week_key):
+            return
+        _generate_week(db, week_key, lock, in_subprocess=in_subprocess)
+    finally:
+        lock.release(week_key)
+
+
+def regenerate_week(
+    db: Session,
+    week_key: str,
+    wait: float = 0,
+    in_subprocess: bool = False,
+) -> int:
     """
-    week_key = get_current_week_key()
+    Rebuild a week's puzzles even if it is already generated.
 
-    # First, ensure dictionary is available
+    The current puzzles stay live while the new ones are generated and are
+    replaced atomically (see _refresh_weekly_cache). Waits up to ``wait``
+    seconds for a generation of the week by another worker. Returns the
+    number of puzzles created, or 0 if the lock could not be acquired.
+    ``in_subprocess`` is as for ensure_weekly_cache.
+    """
+    clear_week_readiness(week_key)
     ensure_dictionary(db)
 
-    # Check if cache meta exists for this week
-    meta = db.query(PuzzleCacheMeta).filter(
+    lock = get_generation_lock(db.get_bind())
+    if not lock.acquire(week_key, timeout=wait):
+        logger.info(f"Could not acquire lock for {week_key}, another worker is generating")
+        return 0
+
+    try:
+        return _generate_week(db, week_key, lock, replace=True, in_subprocess=in_subprocess)
+    finally:
+        lock.release(week_key)
+
+
+def week_complete(meta: Optional[PuzzleCacheMeta]) -> bool:
+    """Whether a PuzzleCacheMeta row records its week as fully generated."""
+    return bool(meta and meta.status == "done" and (meta.puzzle_count or 0) >= PUZZLE_COUNT)
+
+
+def generation_due(meta: Optional[PuzzleCacheMeta], now: Optional[datetime] = None) -> bool:
+    """
+    Whether the week of a PuzzleCacheMeta row should be generated now.
+
+    Weeks never generated (or still running: the generation lock sorts
+    those out) are due, complete weeks never are. A week that failed or
+    came out short is only retried PUZZLE_GENERATION_RETRY_SECONDS after
+    that attempt, so checks and scheduler passes don't redo it every time.
+    """
+    if meta is None or meta.status not in ("done", "failed"):
+        return True
+    if week_complete(meta):
+        return False
+    if meta.completed_at is None:
+        return True
+    retry = timedelta(seconds=get_settings().puzzle_generation_retry_seconds)
+    return (now or datetime.utcnow()) - meta.completed_at >= retry
+
+
+def _week_meta(db: Session, week_key: str) -> Optional[PuzzleCacheMeta]:
+    return db.query(PuzzleCacheMeta).filter(
         PuzzleCacheMeta.week_key == week_key
     ).first()
 
-    if meta:
-        if meta.status == "done" and meta.puzzle_count >= PUZZLE_COUNT:
-            # Cache is ready
-            return
 
-        if meta.status == "running":
-            # Check for stale lock (generation taking too long)
-            if meta.started_at:
-                elapsed = (datetime.utcnow() - meta.started_at).total_seconds()
-                if elapsed < GENERATION_TIMEOUT_MINUTES * 60:
-                    logger.info(f"Generation already in progress for {week_key}")
-                    return
-                else:
-                    logger.warning(f"Stale generation lock detected for {week_key}, resetting")
-                    meta.status = "idle"
-                    db.commit()
-
-    # Try to acquire generation lock
-    if not _acquire_generation_lock(db, week_key):
-        logger.info(f"Could not acquire lock for {week_key}, another process is generating")
-        return
+def _week_pending(db: Session, week_key: str) -> bool:
+    """Whether the week is due for generation (marking it ready if complete)."""
+    meta = _week_meta(db, week_key)
+    if week_complete(meta):
+        mark_week_ready(week_key)
+        return False
+    return generation_due(meta)
 
+
+def _generate_week(
+    db: Session,
+    week_key: str,
+    lock: GenerationLock,
+    replace: bool = False,
+    in_subprocess: bool = False,
+) -> int:
+    """
+    Generate the week while holding its lock (heartbeating as needed).
+
+    A week that is done but short only gets its missing days (see
+    _top_up_week) unless ``replace``; otherwise the whole week is swapped.
+    """
+    meta = _week_meta(db, week_key)
+    if not replace and meta is not None and meta.status == "done":
+        with lock.heartbeats(week_key):
+            count = _top_up_week(db, week_key, in_subprocess)
+        if count >= PUZZLE_COUNT:
+            mark_week_ready(week_key)
+        return count
+
+    _mark_generation_running(db, week_key)
     try:
-        _refresh_weekly_cache(db, week_key)
+        with lock.heartbeats(week_key):
+            count = _refresh_weekly_cache(db, week_key, in_subprocess)
     except Exception as e:
         logger.error(f"Generation failed for {week_key}: {e}")
         _mark_generation_failed(db, week_key, str(e))
         raise
+    if count >= PUZZLE_COUNT:
+        mark_week_ready(week_key)
+    return count
 
 
-def _acquire_generation_lock(db: Session, week_key: str) -> bool:
-    """Try to acquire generation lock. Returns True if acquired."""
-    try:
-        # Try to insert new meta row (atomic)
-        meta = PuzzleCacheMeta(
-            week_key=week_key,
-            status="running",
-            started_at=datetime.utcnow(),
-        )
-        db.add(meta)
-        db.commit()
-        logger.info(f"Acquired generation lock for {week_key}")
+def check_weekly_cache(db: Session) -> bool:
+    """
+    Non-blocking variant of ensure_weekly_cache for the request path.
+
+    Returns True if the current week's puzzles are stored, even if it came
+    out short. Starts (or joins) a background generation job when the week
+    is due for one (see generation_due), but never waits for it.
+    """
+    week_key = get_current_week_key()
+    if is_week_ready(week_key):
+        return True
+
+    meta = _week_meta(db, week_key)
+    if week_complete(meta):
+        mark_week_ready(week_key)
         return True
-    except IntegrityError:
-        db.rollback()
-        # Row exists, try to update if idle/failed
-        meta = db.query(PuzzleCacheMeta).filter(
-            PuzzleCacheMeta.week_key == week_key,
-            PuzzleCacheMeta.status.in_(["idle", "failed"])
-        ).first()
-
-        if meta:
-            meta.status = "running"
-            meta.started_at = datetime.utcnow()
-            meta.error_message = None
-            db.commit()
-            logger.info(f"Re-acquired generation lock for {week_key}")
-            return True
 
+    if generation_due(meta):
+        start_weekly_generation(week_key, db.get_bind())
+    # A short week is served while it waits to be topped up
+    return bool(meta and meta.status == "done")
+
+
+def start_weekly_generation(week_key: str, bind: Engine, force: bool = False) -> threading.Thread:
+    """
+    Generate a week's puzzles in a background thread, once per process.
+
+    The job opens its own session on ``bind`` and goes through
+    ensure_weekly_cache (or regenerate_week with ``force``), so the
+    generation lock still keeps other workers from generating the same
+    week; if one is, the job waits for it (GENERATION_LOCK_WAIT_SECONDS).
+    The thread only waits: the search itself runs in the generation pool.
+    Returns the running job.
+    """
+    with _generation_jobs_lock:
+        job = _generation_jobs.get(week_key)
+        if job is not None and job.is_alive():
+            return job
+
+        job = threading.Thread(
+            target=_run_generation_job,
+            args=(week_key, bind, force),
+            name=f"puzzle-generation-{week_key}",
+            daemon=True,
+        )
+        _generation_jobs[week_key] = job
+        job.start()
+    logger.info(f"Started background generation for {week_key}")
+    return job
+
+
+def _run_generation_job(week_key: str, bind: Engine, force: bool = False) -> None:
+    db = Session(bind=bind)
+    wait = get_settings().generation_lock_wait_seconds
+    try:
+        if force:
+            regenerate_week(db, week_key, wait=wait, in_subprocess=True)
+        else:
+            ensure_weekly_cache(db, week_key, wait=wait, in_subprocess=True)
+    except Exception as e:
+        logger.error(f"Background generation failed for {week_key}: {e}")
+    finally:
+        db.close()
+
+
+def wait_for_generation_jobs(timeout: Optional[float] = None) -> bool:
+    """Wait for running background generation jobs; False if any still runs."""
+    with _generation_jobs_lock:
+        jobs = list(_generation_jobs.values())
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for job in jobs:
+        job.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+    return not any(job.is_alive() for job in jobs)
+
+
+def is_week_ready(week_key: str) -> bool:
+    """Whether this process recently confirmed the week is fully generated."""
+    checked_at = _ready_weeks.get(week_key)
+    if checked_at is None:
         return False
+    return time.monotonic() - checked_at < get_settings().puzzle_cache_ready_ttl_seconds
+
+
+def mark_week_ready(week_key: str) -> None:
+    """Record that the week is fully generated (forgetting past weeks)."""
+    current = get_current_week_key()
+    for past in [key for key in _ready_weeks if key < current]:
+        _ready_weeks.pop(past, None)
+    _ready_weeks[week_key] = time.monotonic()
+
+
+def clear_week_readiness(week_key: Optional[str] = None) -> None:
+    """Forget a week's readiness (or every week's), e.g. before regenerating it."""
+    if week_key is None:
+        _ready_weeks.clear()
+    else:
+        _ready_weeks.pop(week_key, None)
+
+
+def _mark_generation_running(db: Session, week_key: str) -> None:
+    """Record that generation started (the caller holds the week's lock)."""
+    meta = _week_meta(db, week_key)
+    if meta is None:
+        meta = PuzzleCacheMeta(week_key=week_key)
+        db.add(meta)
+    meta.status = "running"
+    meta.started_at = datetime.utcnow()
+    meta.error_message = None
+    db.commit()
+    logger.info(f"Acquired generation lock for {week_key}")
 
 
 def _mark_generation_failed(db: Session, week_key: str, error: str) -> None:
-    """Mark generation as failed."""
-    meta = db.query(PuzzleCacheMeta).filter(
-        PuzzleCacheMeta.week_key == week_key
-    ).first()
+    """Mark generation as failed (completed_at is when it is retried from)."""
+    meta = _week_meta(db, week_key)
     if meta:
         meta.status = "failed"
         meta.error_message = error[:500]
+        meta.completed_at = datetime.utcnow()
         db.commit()
 
 
-def _refresh_weekly_cache(db: Session, week_key: str) -> int:
+def _refresh_weekly_cache(db: Session, week_key: str, in_subprocess: bool = False) -> int:
     """
     Generate and store puzzles for the week.
 
-    Returns number of puzzles created.
+    The new puzzles are generated before anything is written and then
+    swapped in for the week's existing ones in a single transaction (see
+    _swap_week), so readers never see the week half-built or empty.
+    Days that fail to generate (or the whole week, if generation raises)
+    are filled from the reserve pool when it has puzzles; days still
+    missing keep their old puzzles.
+
+    Returns the week's puzzle count.
     """
     logger.info(f"Generating {PUZZLE_COUNT} puzzles for {week_key}...")
 
-    # Delete any existing puzzles for this week (idempotent)
-    deleted = db.query(Puzzle).filter(Puzzle.week_key == week_key).delete()
-    if deleted:
-        logger.info(f"Deleted {deleted} existing puzzles for {week_key}")
-
     # Generate new puzzles (one per day)
-    puzzles = generate_puzzle_set(db, n=PUZZLE_COUNT, week_key=week_key)
+    error = None
+    try:
+        puzzles = generate_puzzle_set(
+            db, n=PUZZLE_COUNT, week_key=week_key, in_subprocess=in_subprocess
+        )
+    except Exception as e:
+        logger.error(f"Generation failed for {week_key}: {e}")
+        error, puzzles = e, []
+
+    if len(puzzles) < PUZZLE_COUNT:
+        puzzles += _reserve_fallback(db, week_key, {p.get("scheduled_date") for p in puzzles})
+    if error is not None and not puzzles:
+        raise error
+
+    count = _swap_week(db, week_key, puzzles)
+    logger.info(f"Successfully created {len(puzzles)} puzzles for {week_key}")
+    return count
+
+
+def _top_up_week(db: Session, week_key: str, in_subprocess: bool = False) -> int:
+    """
+    Add puzzles for the days missing from a short week, in one commit.
 
-    # Insert into database
-    for i, puzzle_data in enumerate(puzzles):
+    The week's existing puzzles are left alone. Returns the week's puzzle
+    count; if it is still short, the week is retried again later.
+    """
+    taken = {
+        day for (day,) in db.query(Puzzle.scheduled_date).filter(Puzzle.week_key == week_key)
+    }
+    week_dates = get_week_dates(week_key)
+    missing = [d for d in week_dates if d not in taken]
+    logger.info(f"Generating {len(missing)} missing puzzles for {week_key}...")
+
+    puzzles = []
+    if missing:
+        try:
+            # Seeded by day index, so they don't repeat the week's other days
+            puzzles = generate_puzzle_set(
+                db, n=len(missing), week_key=week_key, in_subprocess=in_subprocess,
+                days=[week_dates.index(d) for d in missing],
+            )
+        except Exception as e:
+            logger.error(f"Generation failed for {week_key}: {e}")
+    for puzzle_data, day in zip(puzzles, missing):
+        puzzle_data["scheduled_date"] = day
+    if len(puzzles) < len(missing):
+        puzzles += _reserve_fallback(db, week_key, taken | {p["scheduled_date"] for p in puzzles})
+
+    _add_week_puzzles(db, week_key, puzzles)
+    meta = _week_meta(db, week_key)
+    meta.puzzle_count = len(taken) + len(puzzles)
+    meta.completed_at = datetime.utcnow()
+    db.commit()
+    logger.info(f"Added {len(puzzles)} puzzles to {week_key} ({meta.puzzle_count} in total)")
+    return meta.puzzle_count
+
+
+def _reserve_fallback(db: Session, week_key: str, taken: set) -> list[dict]:
+    """Reserve puzzles for the days of the week not in ``taken``."""
+    from app.services.reserve_pool import claim_reserve_puzzles
+
+    missing = [d for d in get_week_dates(week_key) if d not in taken]
+    fallback = claim_reserve_puzzles(db, len(missing))
+    for puzzle_data, day in zip(fallback, missing):
+        puzzle_data["scheduled_date"] = day
+    if fallback:
+        logger.warning(f"Filled {len(fallback)} days of {week_key} from the reserve pool")
+    return fallback
+
+
+def _swap_week(db: Session, week_key: str, puzzles: list[dict]) -> int:
+    """
+    Replace the week's puzzles with ``puzzles`` and mark it done, in one commit.
+
+    Only the days ``puzzles`` cover are replaced: if the new set comes out
+    short, the old puzzles of the other days stay. scheduled_date is unique,
+    so the replaced puzzles must give up their dates in the same
+    transaction: unsolved ones are deleted, solved ones are unscheduled and
+    moved to the archived week key so their Solve rows stay. Concurrent
+    readers see either the old week or the new one. Returns the week's
+    puzzle count.
+    """
+    covered = {p.get("scheduled_date") for p in puzzles}
+    old = db.query(Puzzle.id, Puzzle.scheduled_date).filter(Puzzle.week_key == week_key).all()
+    old_ids = [pid for pid, day in old if day is None or day in covered]
+    kept = len(old) - len(old_ids)
+    if old_ids:
+        solved = [
+            pid for (pid,) in db.query(Solve.puzzle_id)
+            .filter(Solve.puzzle_id.in_(old_ids)).distinct()
+        ]
+        if solved:
+            db.query(Puzzle).filter(Puzzle.id.in_(solved)).update(
+                {"scheduled_date": None, "week_key": week_key[:8] + ARCHIVED_WEEK_SUFFIX},
+                synchronize_session=False,
+            )
+        unsolved = [pid for pid in old_ids if pid not in set(solved)]
+        if unsolved:
+            db.query(Puzzle).filter(Puzzle.id.in_(unsolved)).delete(synchronize_session=False)
+        logger.info(
+            f"Replacing {len(old_ids)} puzzles of {week_key} ({len(solved)} archived, "
+            f"{kept} kept)"
+        )
+
+    _add_week_puzzles(db, week_key, puzzles)
+
+    # Update meta
+    meta = _week_meta(db, week_key)
+    if meta is None:
+        meta = PuzzleCacheMeta(week_key=week_key, started_at=datetime.utcnow())
+        db.add(meta)
+    meta.status = "done"
+    meta.puzzle_count = kept + len(puzzles)
+    meta.completed_at = datetime.utcnow()
+
+    db.commit()
+    return meta.puzzle_count
+
+
+def _add_week_puzzles(db: Session, week_key: str, puzzles: list[dict]) -> None:
+    """Add Puzzle rows for the week (not committed)."""
+    for puzzle_data in puzzles:
         puzzle = Puzzle(
             title=puzzle_data["title"],
             size=puzzle_data["size"],
@@ -214,17 +513,36 @@ def _refresh_weekly_cache(db: Session, week_key: str) -> int:
         )
         db.add(puzzle)
 
-    # Update meta
-    meta = db.query(PuzzleCacheMeta).filter(
-        PuzzleCacheMeta.week_key == week_key
-    ).first()
-    if meta:
-        meta.status = "done"
-        meta.puzzle_count = len(puzzles)
-        meta.completed_at = datetime.utcnow()
 
-    db.commit()
-    logger.info(f"Successfully created {len(puzzles)} puzzles for {week_key}")
+def fill_week_from_reserve(db: Session, week_key: str) -> int:
+    """
+    Swap a whole week in straight from the reserve pool, without generating.
+
+    Used for instant refreshes. Takes the week's generation lock without
+    waiting, so it never interleaves with a generation of the week. Returns
+    the number of puzzles stored, or 0 (changing nothing) if the lock is
+    held elsewhere or the pool can't cover every day.
+    """
+    from app.services.reserve_pool import claim_reserve_puzzles
+
+    lock = get_generation_lock(db.get_bind())
+    if not lock.try_acquire(week_key):
+        logger.info(f"Could not acquire lock for {week_key}, another worker is generating")
+        return 0
+
+    try:
+        puzzles = claim_reserve_puzzles(db, PUZZLE_COUNT)
+        if len(puzzles) < PUZZLE_COUNT:
+            db.rollback()
+            return 0
+
+        for puzzle_data, day in zip(puzzles, get_week_dates(week_key)):
+            puzzle_data["scheduled_date"] = day
+        _swap_week(db, week_key, puzzles)
+    finally:
+        lock.release(week_key)
+    mark_week_ready(week_key)
+    logger.info(f"Filled {week_key} from the reserve pool")
     return len(puzzles)
 
 
@@ -251,13 +569,22 @@ def get_week_dates(week_key: str) -> list[date]:
     return [week_monday + timedelta(days=i) for i in range(7)]
 
 
-def generate_puzzle_set(db: Session, n: int = 7, week_key: str = None) -> list[dict]:
+def generate_puzzle_set(
+    db: Session,
+    n: int = 7,
+    week_key: str = None,
+    in_subprocess: bool = False,
+    days: Optional[list[int]] = None,
+) -> list[dict]:
     """
     Generate n valid crossword puzzles with dictionary-validated words.
     Each puzzle gets a scheduled_date for one day of the week.
     All words are verified against the dictionary database.
+    With ``in_subprocess`` the search runs in the generation pool.
+    ``days`` (day indices, Monday = 0) generates just those days, each with
+    the seed and pattern it gets in a full week.
     """
-    from app.services.puzzle_templates import generate_weekly_puzzles, BLACK
+    from app.services.puzzle_templates import derive_seed, generate_weekly_puzzles
 
     if week_key is None:
         week_key = get_current_week_key()
@@ -266,35 +593,54 @@ def generate_puzzle_set(db: Session, n: int = 7, week_key: str = None) -> list[d
     week_dates = get_week_dates(week_key)
 
     # Use week_key as seed for consistent but different puzzles each week
-    seed = hash(week_key) % 2**32
+    seed = derive_seed("week", week_key)
 
     # Generate validated puzzles
     logger.info(f"Generating {n} validated puzzles for {week_key}...")
-    generated = generate_weekly_puzzles(db, count=n, week_seed=seed)
+    settings = get_settings()
+    generated = generate_weekly_puzzles(
+        db,
+        count=n,
+        week_seed=seed,
+        workers=settings.puzzle_generation_workers,
+        time_budget=settings.puzzle_generation_budget_seconds,
+        portfolio=settings.puzzle_generation_portfolio,
+        in_subprocess=in_subprocess,
+        days=days,
+    )
+    if days is not None:
+        week_dates = [week_dates[d] for d in days]
 
     puzzles = []
     for i, puzzle in enumerate(generated):
-        # Create empty grid for play (hide letters, show black squares)
-        size = puzzle["size"]
-        solution = puzzle["solution"]
-        grid = [[" " if cell != BLACK else BLACK for cell in row] for row in solution]
-
-        puzzle_data = {
-            "title": f"Daily Puzzle",
-            "size": size,
-            "difficulty": "medium",
-            "grid": grid,
-            "solution": solution,
-            "clues_across": puzzle["clues_across"],
-            "clues_down": puzzle["clues_down"],
-            "scheduled_date": week_dates[i] if i < len(week_dates) else None,
-        }
+        puzzle_data = build_puzzle_data(puzzle)
+        puzzle_data["scheduled_date"] = week_dates[i] if i < len(week_dates) else None
         puzzles.append(puzzle_data)
         logger.info(f"Created validated puzzle {i+1}/{n} for {week_dates[i] if i < len(week_dates) else 'N/A'}")
 
     return puzzles
 
 
+def build_puzzle_data(puzzle: dict, title: str = "Daily Puzzle") -> dict:
+    """Puzzle fields for storage from a generated puzzle (unscheduled)."""
+    from app.services.puzzle_templates import BLACK
+
+    # Create empty grid for play (hide letters, show black squares)
+    solution = puzzle["solution"]
+    grid = [[" " if cell != BLACK else BLACK for cell in row] for row in solution]
+
+    return {
+        "title": title,
+        "size": puzzle["size"],
+        "difficulty": "medium",
+        "grid": grid,
+        "solution": solution,
+        "clues_across": puzzle["clues_across"],
+        "clues_down": puzzle["clues_down"],
+        "scheduled_date": None,
+    }
+
+
 def _estimate_difficulty(puzzle: dict) -> str:
     """Estimate puzzle difficulty based on size and word count."""
     size = puzzle["size"]
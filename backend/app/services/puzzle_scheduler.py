@@ -0,0 +1,138 @@
+"""Look-ahead generation of upcoming weeks.
+
+Keeps the current week and the next PUZZLE_LOOKAHEAD_WEEKS weeks generated
+ahead of time, so the Monday rollover is just a date change: the new week's
+puzzles and its "done" PuzzleCacheMeta row already exist. Each pass also
+backfills weeks in the window that are missing, failed or came out short
+(once their retry interval has passed, see generation_due).
+
+Runs inside the app (LookaheadScheduler, started on boot) or from cron via
+``python manage.py schedule``. Generation goes through ensure_weekly_cache,
+so PuzzleCacheMeta keeps concurrent schedulers from doing the same week twice.
+"""
+
+import logging
+import threading
+from datetime import date, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.cache_meta import PuzzleCacheMeta
+from app.services.puzzle_cache import (
+    clear_week_readiness,
+    ensure_weekly_cache,
+    generation_due,
+    week_complete,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def upcoming_week_keys(weeks_ahead: int, today: Optional[date] = None) -> list[str]:
+    """Week keys of the current week and the ``weeks_ahead`` weeks after it."""
+    today = today or date.today()
+    return [
+        (today + timedelta(weeks=i)).strftime("%G-W%V")
+        for i in range(weeks_ahead + 1)
+    ]
+
+
+def pending_weeks(db: Session, week_keys: list[str]) -> list[str]:
+    """The weeks of ``week_keys`` that are due for generation (one query)."""
+    metas = {
+        meta.week_key: meta for meta in db.query(PuzzleCacheMeta).filter(
+            PuzzleCacheMeta.week_key.in_(week_keys)
+        )
+    }
+    return [week_key for week_key in week_keys if generation_due(metas.get(week_key))]
+
+
+def fill_upcoming_weeks(
+    db: Session,
+    weeks_ahead: Optional[int] = None,
+    today: Optional[date] = None,
+    in_subprocess: bool = False,
+) -> list[str]:
+    """
+    Generate every missing week from the current one to ``weeks_ahead`` ahead.
+
+    ``in_subprocess`` is as for ensure_weekly_cache. Returns the weeks
+    that were generated by this call.
+    """
+    if weeks_ahead is None:
+        weeks_ahead = get_settings().puzzle_lookahead_weeks
+
+    generated = []
+    for week_key in pending_weeks(db, upcoming_week_keys(weeks_ahead, today)):
+        logger.info(f"Look-ahead: generating {week_key}")
+        # The database says the week is missing; drop any stale in-process record
+        clear_week_readiness(week_key)
+        try:
+            ensure_weekly_cache(db, week_key, in_subprocess=in_subprocess)
+        except Exception as e:
+            # Leave the week for the next pass; later weeks can still fill
+            logger.error(f"Look-ahead: generating {week_key} failed: {e}")
+            continue
+        meta = db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == week_key).first()
+        if week_complete(meta):
+            generated.append(week_key)
+    return generated
+
+
+class LookaheadScheduler:
+    """
+    Runs fill_upcoming_weeks every ``interval`` seconds until stopped.
+
+    Inside the web process pass ``in_subprocess`` so the search runs in
+    the generation pool rather than in this thread.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        weeks_ahead: Optional[int] = None,
+        interval: Optional[float] = None,
+        in_subprocess: bool = False,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.weeks_ahead = settings.puzzle_lookahead_weeks if weeks_ahead is None else weeks_ahead
+        self.interval = settings.puzzle_scheduler_interval_seconds if interval is None else interval
+        self.in_subprocess = in_subprocess
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> list[str]:
+        """One pass over the look-ahead window."""
+        db = self.session_factory()
+        try:
+            return fill_upcoming_weeks(db, self.weeks_ahead, in_subprocess=self.in_subprocess)
+        finally:
+            db.close()
+
+    def run(self) -> None:
+        """Run passes until stop() is called (or once, if interval is 0)."""
+        while not self._stop.is_set():
+            try:
+                generated = self.run_once()
+                if generated:
+                    logger.info(f"Look-ahead: generated {', '.join(generated)}")
+            except Exception as e:
+                logger.error(f"Look-ahead pass failed: {e}")
+            if self.interval <= 0:
+                break
+            self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Run in a background thread."""
+        self._thread = threading.Thread(target=self.run, name="puzzle-lookahead")
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the current pass (waiting up to ``timeout`` seconds)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
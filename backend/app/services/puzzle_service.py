@@ -13,6 +13,9 @@ from sqlalchemy import func
 from app.models.puzzle import Puzzle
 from app.schemas.puzzle import PuzzleCreate, ClueItem
 
+# week_key of puzzles stocked for practice mode from the reserve pool
+PRACTICE_WEEK_KEY = "practice"
+
 
 class PuzzleService:
     """Service class for puzzle operations."""
@@ -38,10 +41,13 @@ class PuzzleService:
             return puzzle
 
         # If no puzzle is scheduled for today, select one deterministically
-        # based on the date (rotation through unscheduled puzzles)
+        # based on the date (rotation through unscheduled puzzles). Practice
+        # puzzles and puzzles archived by a week refresh carry a week_key
+        # and are left out.
         unscheduled_puzzles = (
             self.db.query(Puzzle)
             .filter(Puzzle.scheduled_date == None)
+            .filter(Puzzle.week_key == None)
             .order_by(Puzzle.id)
             .all()
         )
@@ -149,6 +155,35 @@ class PuzzleService:
 
         return puzzle
 
+    def stock_practice_puzzles(self, limit: int) -> int:
+        """Turn reserve pool puzzles into practice puzzles, up to ``limit`` in all.
+
+        Keeps a week's worth in the pool for fallbacks and refreshes.
+        Returns the number of practice puzzles added.
+        """
+        from app.services.puzzle_cache import PUZZLE_COUNT
+        from app.services.reserve_pool import claim_reserve_puzzles
+
+        stocked = self.db.query(func.count(Puzzle.id)).filter(
+            Puzzle.week_key == PRACTICE_WEEK_KEY
+        ).scalar()
+        claimed = claim_reserve_puzzles(
+            self.db, limit - stocked, keep=PUZZLE_COUNT, title="Practice Puzzle"
+        )
+        for data in claimed:
+            self.db.add(Puzzle(
+                title=data["title"],
+                size=data["size"],
+                difficulty=data["difficulty"],
+                grid=json.dumps(data["grid"]),
+                solution=json.dumps(data["solution"]),
+                clues_across=json.dumps(data["clues_across"]),
+                clues_down=json.dumps(data["clues_down"]),
+                week_key=PRACTICE_WEEK_KEY,
+            ))
+        self.db.commit()
+        return len(claimed)
+
     def get_random_practice_puzzle(self, exclude_puzzle_id: Optional[int] = None) -> Optional[Puzzle]:
         """Get a random puzzle for practice mode (excludes today's puzzle)."""
         query = self.db.query(Puzzle)
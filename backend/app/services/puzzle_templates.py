@@ -4,18 +4,29 @@ Generates valid 5x5 mini crosswords with 1-5 black squares.
 All words are validated against the dictionary database.
 """
 
+import hashlib
 import logging
+import multiprocessing
+import os
 import random
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Sequence, Union
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.models.cache_meta import DictionaryWord
+from app.services.deadline import Deadline
+from app.services.fill_cache import fill_cache_key, get_fill_cache
+from app.services.fill_engine import ENGINE_VERSION, FillSolver, FillStats
+from app.services.lexicon import Lexicon, WordIndex, build_word_indexes
+from app.services.lexicon_file import load_lexicon_file
+from app.services.patterns import BLACK, CompiledPattern, CompiledSlot, compile_pattern
 
 logger = logging.getLogger(__name__)
 
-# Black square marker
-BLACK = "#"
-
 # Pre-defined grid patterns with black squares at CORNERS ONLY
 # This ensures all word slots are 3+ letters (no 2-letter fragments)
 PATTERNS = [
@@ -93,6 +104,9 @@ PATTERNS = [
     ],
 ]
 
+# Geometry of each pattern (slots, runs, crossings), derived once
+COMPILED_PATTERNS = tuple(compile_pattern(pattern) for pattern in PATTERNS)
+
 # Simple clue templates based on common word patterns
 CLUE_TEMPLATES = {
     # Common 3-letter words
@@ -1670,14 +1684,14 @@ CLUE_TEMPLATES = {
 }
 
 
-def get_clue_for_word(word: str) -> str:
+def get_clue_for_word(word: str, rng: Optional[random.Random] = None) -> str:
     """Get a clue for a word, using the clue database or falling back to templates."""
     from app.services.clue_database import get_clue_for_word as get_real_clue
 
     word_upper = word.upper()
 
     # First, try the real clue database (public domain clues)
-    real_clue = get_real_clue(word_upper)
+    real_clue = get_real_clue(word_upper, rng)
     if real_clue:
         return real_clue
 
@@ -1973,13 +1987,71 @@ EXTRA_COMMON_WORDS = {
 }
 
 
+# Word lengths that fit a 5x5 grid
+PUZZLE_WORD_LENGTHS = (3, 4, 5)
+
+# Rows fetched per round trip when streaming the dictionary table
+DICTIONARY_FETCH_SIZE = 10000
+
+
+def load_dictionary_words_from_db(
+    db: Session,
+    lengths: Sequence[int] = PUZZLE_WORD_LENGTHS,
+    min_frequency: int = 0,
+    limit_per_length: Optional[int] = None,
+) -> dict[int, list[str]]:
+    """
+    Load words from the dictionary_words table.
+
+    Runs one streamed query per length that selects only the word column,
+    so no ORM objects are built even for hundreds of thousands of rows.
+    Words below ``min_frequency`` are skipped; ``limit_per_length`` keeps
+    the most frequent words of each length.
+    """
+    frequency = func.coalesce(DictionaryWord.frequency, 0)
+    words_by_length: dict[int, list[str]] = {}
+
+    for length in lengths:
+        query = select(DictionaryWord.word).where(DictionaryWord.length == length)
+        if min_frequency:
+            query = query.where(frequency >= min_frequency)
+        if limit_per_length:
+            query = query.order_by(frequency.desc(), DictionaryWord.word).limit(limit_per_length)
+
+        result = db.execute(query.execution_options(yield_per=DICTIONARY_FETCH_SIZE))
+        words_by_length[length] = [
+            word.upper() for word in result.scalars() if word.isalpha()
+        ]
+
+    total = sum(len(w) for w in words_by_length.values())
+    logger.info(f"Loaded {total} dictionary words from the database")
+    return words_by_length
+
+
 def load_dictionary_words(db: Session) -> dict[int, set[str]]:
     """
     Load only verified common words for puzzle generation.
 
     Uses CLUE_TEMPLATES (primary) plus EXTRA_COMMON_WORDS for variety.
     All words are verified as real, recognizable English words.
+
+    With ``LEXICON_SOURCE=database`` the words come from the dictionary
+    table instead (see load_dictionary_words_from_db), falling back to the
+    built-in lists while the table is empty.
     """
+    from app.config import get_settings
+
+    settings = get_settings()
+    if settings.lexicon_source == "database" and db is not None:
+        words = load_dictionary_words_from_db(
+            db,
+            min_frequency=settings.lexicon_min_frequency,
+            limit_per_length=settings.lexicon_max_words_per_length or None,
+        )
+        if any(words.values()):
+            return {length: set(group) for length, group in words.items() if group}
+        logger.warning("Dictionary table is empty, using the built-in word lists")
+
     words_by_length: dict[int, set[str]] = {}
 
     # Add all words from CLUE_TEMPLATES
@@ -2002,6 +2074,79 @@ def load_dictionary_words(db: Session) -> dict[int, set[str]]:
     return words_by_length
 
 
+# Process-wide lexicon shared by every generator (see get_lexicon)
+_lexicon: Optional[Lexicon] = None
+_lexicon_lock = threading.Lock()
+
+
+def get_dictionary_source(db: Session) -> str:
+    """
+    Fingerprint of the word sources load_dictionary_words reads.
+
+    The lexicon is rebuilt only when this changes. The built-in word lists
+    only change with a deploy, so their sizes are enough to identify them.
+    Words are only ever added to the dictionary table in bulk, so its row
+    count and highest id (one cheap aggregate query) identify its contents.
+    A compiled lexicon file is identified by its path, size and mtime.
+    """
+    from app.config import get_settings
+
+    settings = get_settings()
+    if settings.lexicon_file:
+        try:
+            stat = os.stat(settings.lexicon_file)
+        except OSError as e:
+            logger.warning(f"Lexicon file unavailable, ignoring it: {e}")
+        else:
+            return f"file:{settings.lexicon_file}:{stat.st_size}:{stat.st_mtime_ns}"
+    if settings.lexicon_source == "database" and db is not None:
+        count, max_id = db.execute(
+            select(func.count(DictionaryWord.id), func.max(DictionaryWord.id))
+        ).one()
+        if count:
+            return (
+                f"db:{count}:{max_id}:{settings.lexicon_min_frequency}:"
+                f"{settings.lexicon_max_words_per_length}"
+            )
+    return f"builtin:{len(CLUE_TEMPLATES)}:{len(EXTRA_COMMON_WORDS)}"
+
+
+def get_lexicon(db: Session = None) -> Lexicon:
+    """
+    Get the process-wide Lexicon, building it on first use.
+
+    Every puzzle in a batch (and every retry) shares the same word tuples
+    and positional indexes instead of rebuilding them per puzzle. With
+    LEXICON_FILE set the lexicon is memory-mapped from that compiled file,
+    so every worker process shares the same pages.
+    """
+    global _lexicon
+    from app.config import get_settings
+
+    settings = get_settings()
+    if db is None and settings.lexicon_source == "database" and not settings.lexicon_file:
+        from app.database import SessionLocal
+
+        with SessionLocal() as session:
+            return get_lexicon(session)
+
+    source = get_dictionary_source(db)
+    lexicon = _lexicon
+    if lexicon is not None and lexicon.source == source:
+        return lexicon
+
+    with _lexicon_lock:
+        if _lexicon is None or _lexicon.source != source:
+            if source.startswith("file:"):
+                _lexicon = load_lexicon_file(settings.lexicon_file, source=source)
+                logger.info(f"Mapped lexicon {_lexicon.version} ({len(_lexicon)} words)")
+            else:
+                words_by_length = load_dictionary_words(db)
+                _lexicon = Lexicon(words_by_length, clued_words=CLUE_TEMPLATES.keys(), source=source)
+                logger.info(f"Built lexicon {_lexicon.version} ({len(_lexicon)} words)")
+        return _lexicon
+
+
 def validate_pattern(pattern: list[list[str]]) -> tuple[bool, str]:
     """
     Validate a crossword pattern.
@@ -2012,133 +2157,48 @@ def validate_pattern(pattern: list[list[str]]) -> tuple[bool, str]:
     - Disconnected white regions
     - Isolated cells not part of any word
     """
-    size = len(pattern)
-    MIN_WORD_LENGTH = 3
-
-    # Check all horizontal runs
-    for r in range(size):
-        c = 0
-        while c < size:
-            if pattern[r][c] == BLACK:
-                c += 1
-                continue
-            # Start of a horizontal run
-            run_length = 0
-            start_c = c
-            while c < size and pattern[r][c] != BLACK:
-                run_length += 1
-                c += 1
-            # Single letters are invalid (not part of a word)
-            if run_length == 1:
-                return False, f"Single isolated cell at row {r}, col {start_c}"
-            if run_length == 2:
-                return False, f"2-letter horizontal run at row {r}, col {start_c}"
-
-    # Check all vertical runs
-    for c in range(size):
-        r = 0
-        while r < size:
-            if pattern[r][c] == BLACK:
-                r += 1
-                continue
-            # Start of a vertical run
-            run_length = 0
-            start_r = r
-            while r < size and pattern[r][c] != BLACK:
-                run_length += 1
-                r += 1
-            if run_length == 1:
-                return False, f"Single isolated cell at row {start_r}, col {c}"
-            if run_length == 2:
-                return False, f"2-letter vertical run at row {start_r}, col {c}"
-
-    # Check connectivity (all white cells should be connected)
-    white_cells = set()
-    for r in range(size):
-        for c in range(size):
-            if pattern[r][c] != BLACK:
-                white_cells.add((r, c))
-
-    if not white_cells:
-        return False, "No white cells in pattern"
-
-    # BFS to check connectivity
-    start = next(iter(white_cells))
-    visited = set()
-    queue = [start]
-    while queue:
-        r, c = queue.pop(0)
-        if (r, c) in visited:
-            continue
-        visited.add((r, c))
-        # Check all 4 neighbors
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nr, nc = r + dr, c + dc
-            if (nr, nc) in white_cells and (nr, nc) not in visited:
-                queue.append((nr, nc))
-
-    if visited != white_cells:
-        return False, "Disconnected white regions in pattern"
+    compiled = compile_pattern(pattern)
+    return compiled.is_valid, compiled.error
 
-    return True, "Valid"
 
-
-def extract_all_runs(grid: list[list[str]]) -> list[tuple[str, str, int, int, int]]:
+def extract_all_runs(
+    grid: list[list[str]],
+    compiled: Optional[CompiledPattern] = None,
+) -> list[tuple[str, str, int, int, int]]:
     """
     Extract ALL contiguous letter runs from a filled grid.
 
     Returns list of (word, direction, row, col, length) tuples.
-    Used for post-fill validation.
+    Used for post-fill validation. Pass the grid's ``compiled`` pattern to
+    skip looking it up.
     """
-    size = len(grid)
+    if compiled is None:
+        compiled = compile_pattern(grid)
     runs = []
-
-    # Extract horizontal runs
-    for r in range(size):
-        c = 0
-        while c < size:
-            if grid[r][c] == BLACK:
-                c += 1
-                continue
-            # Start of a run
-            start_c = c
-            letters = []
-            while c < size and grid[r][c] != BLACK:
-                letters.append(grid[r][c])
-                c += 1
-            if len(letters) >= 2:  # Include 2+ for validation (should catch errors)
-                runs.append(("".join(letters), "across", r, start_c, len(letters)))
-
-    # Extract vertical runs
-    for c in range(size):
-        r = 0
-        while r < size:
-            if grid[r][c] == BLACK:
-                r += 1
-                continue
-            # Start of a run
-            start_r = r
-            letters = []
-            while r < size and grid[r][c] != BLACK:
-                letters.append(grid[r][c])
-                r += 1
-            if len(letters) >= 2:
-                runs.append(("".join(letters), "down", start_r, c, len(letters)))
-
+    for direction, row, col, cells in compiled.runs:
+        if len(cells) >= 2:  # Include 2+ for validation (should catch errors)
+            word = "".join(grid[r][c] for r, c in cells)
+            runs.append((word, direction, row, col, len(cells)))
     return runs
 
 
 def validate_filled_grid(
     grid: list[list[str]],
-    words_by_length: dict[int, set[str]]
+    words_by_length: dict[int, set[str]],
+    indexes: Optional[dict[int, WordIndex]] = None,
+    compiled: Optional[CompiledPattern] = None,
 ) -> tuple[bool, list[str]]:
     """
     Validate that every horizontal and vertical run in the grid is a valid dictionary word.
 
+    If ``indexes`` is given, dictionary membership is checked through the
+    candidate backend that produced the fill instead of the word sets.
+
     Returns (is_valid, list_of_errors).
     """
+    lookup = indexes if indexes is not None else words_by_length
     errors = []
-    runs = extract_all_runs(grid)
+    runs = extract_all_runs(grid, compiled)
 
     for word, direction, row, col, length in runs:
         # Check for unfilled cells
@@ -2152,70 +2212,15 @@ def validate_filled_grid(
             continue
 
         # Must be in dictionary
-        if length not in words_by_length or word not in words_by_length[length]:
+        if length not in lookup or word not in lookup[length]:
             errors.append(f"Invalid word '{word}' ({direction} at row {row}, col {col})")
 
     return len(errors) == 0, errors
 
 
 def extract_word_slots(pattern: list[list[str]]) -> list[dict]:
-    """Extract word slots from a pattern grid."""
-    size = len(pattern)
-    slots = []
-    clue_num = 1
-
-    for r in range(size):
-        for c in range(size):
-            if pattern[r][c] == BLACK:
-                continue
-
-            # Check if this cell starts an across word
-            starts_across = (c == 0 or pattern[r][c-1] == BLACK) and \
-                           (c + 1 < size and pattern[r][c+1] != BLACK)
-
-            # Check if this cell starts a down word
-            starts_down = (r == 0 or pattern[r-1][c] == BLACK) and \
-                         (r + 1 < size and pattern[r+1][c] != BLACK)
-
-            if starts_across or starts_down:
-                if starts_across:
-                    # Calculate length
-                    length = 0
-                    cc = c
-                    while cc < size and pattern[r][cc] != BLACK:
-                        length += 1
-                        cc += 1
-                    if length >= 3:  # Only include 3+ letter words
-                        slots.append({
-                            "number": clue_num,
-                            "direction": "across",
-                            "row": r,
-                            "col": c,
-                            "length": length,
-                            "cells": [(r, c + i) for i in range(length)],
-                        })
-
-                if starts_down:
-                    # Calculate length
-                    length = 0
-                    rr = r
-                    while rr < size and pattern[rr][c] != BLACK:
-                        length += 1
-                        rr += 1
-                    if length >= 3:  # Only include 3+ letter words
-                        slots.append({
-                            "number": clue_num,
-                            "direction": "down",
-                            "row": r,
-                            "col": c,
-                            "length": length,
-                            "cells": [(r + i, c) for i in range(length)],
-                        })
-
-                if starts_across or starts_down:
-                    clue_num += 1
-
-    return slots
+    """Extract word slots (3+ letters, in clue-number order) from a pattern grid."""
+    return [slot.as_dict() for slot in compile_pattern(pattern).slots]
 
 
 def get_pattern_for_slot(solution: list[list[str]], slot: dict) -> list[Optional[str]]:
@@ -2244,107 +2249,57 @@ def fill_puzzle_with_backtracking(
     pattern: list[list[str]],
     slots: list[dict],
     words_by_length: dict[int, set[str]],
-    max_attempts: int = 50000
+    max_attempts: int = 50000,
+    indexes: Optional[dict[int, WordIndex]] = None,
+    propagation: str = "ac3",
+    backjumping: bool = True,
+    backend: str = "bitset",
+    stats: Optional[FillStats] = None,
+    rng: Optional[random.Random] = None,
+    deadline: Union[Deadline, float, None] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
 ) -> Optional[list[list[str]]]:
-    """Fill a puzzle pattern with valid words using backtracking."""
-    size = len(pattern)
-    solution = [row[:] for row in pattern]  # Copy pattern
-
-    used_words: set[str] = set()
-    backtrack_count = [0]  # Use list to allow modification in nested function
-    filled_slots: list[int] = []  # Track which slots have been filled
-
-    def count_constraints(slot: dict) -> int:
-        """Count how many cells already have letters."""
-        count = 0
-        for r, c in slot["cells"]:
-            if solution[r][c] not in (".", BLACK):
-                count += 1
-        return count
-
-    def get_candidates_for_slot(slot: dict) -> list[str]:
-        """Get candidate words that match current constraints."""
-        length = slot["length"]
-        if length not in words_by_length:
-            return []
-
-        current_pattern = get_pattern_for_slot(solution, slot)
-        candidates = [w for w in words_by_length[length]
-                     if matches_pattern(w, current_pattern) and w not in used_words]
-        return candidates
-
-    def get_next_slot(remaining_slots: list[int]) -> Optional[int]:
-        """Choose the most constrained slot (fewest valid candidates)."""
-        if not remaining_slots:
-            return None
-
-        best_slot = None
-        best_count = float('inf')
-
-        for idx in remaining_slots:
-            slot = slots[idx]
-            candidates = get_candidates_for_slot(slot)
-            count = len(candidates)
-
-            if count == 0:
-                return None  # Dead end - no valid words for this slot
-
-            if count < best_count:
-                best_count = count
-                best_slot = idx
-
-        return best_slot
-
-    def try_fill(remaining_slots: list[int]) -> bool:
-        if not remaining_slots:
-            return True  # All slots filled!
-
-        if backtrack_count[0] >= max_attempts:
-            return False
-
-        # Choose most constrained slot
-        slot_idx = get_next_slot(remaining_slots)
-        if slot_idx is None:
-            return False  # Dead end
-
-        slot = slots[slot_idx]
-        candidates = get_candidates_for_slot(slot)
-
-        # Shuffle for variety
-        random.shuffle(candidates)
-
-        for word in candidates[:500]:  # Try many candidates
-            # Place the word
-            old_values = []
-            for i, (r, c) in enumerate(slot["cells"]):
-                old_values.append(solution[r][c])
-                solution[r][c] = word[i]
-            used_words.add(word)
-
-            # Try to fill remaining slots
-            new_remaining = [i for i in remaining_slots if i != slot_idx]
-            if try_fill(new_remaining):
-                return True
-
-            # Backtrack
-            backtrack_count[0] += 1
-            used_words.discard(word)
-            for i, (r, c) in enumerate(slot["cells"]):
-                solution[r][c] = old_values[i]
-
-        return False
-
-    # Start with all slots
-    all_slot_indices = list(range(len(slots)))
-    if try_fill(all_slot_indices):
-        return solution
-    return None
+    """Fill a puzzle pattern with valid words using backtracking.
+
+    Candidates are resolved through a positional letter index (see
+    app.services.lexicon) and per-slot domains are pruned by constraint
+    propagation after every placement, with conflict-directed backjumping
+    and nogood caching on failure (see app.services.fill_engine).
+    Pass prebuilt ``indexes`` to avoid rebuilding them per puzzle (otherwise
+    they are built with the named candidate ``backend``), a FillStats to
+    collect search counters, and an ``rng`` to make the fill reproducible.
+    A ``deadline`` (a Deadline or seconds from now) stops the search cleanly
+    with None once it passes, however many attempts are left, and
+    ``should_stop`` is polled alongside it to cancel the fill from outside.
+    """
+    if indexes is None:
+        indexes = build_word_indexes(words_by_length, backend=backend)
+
+    solver = FillSolver(
+        pattern,
+        slots,
+        indexes,
+        propagation=propagation,
+        max_attempts=max_attempts,
+        backjumping=backjumping,
+        stats=stats,
+        rng=rng,
+        deadline=deadline,
+        should_stop=should_stop,
+    )
+    return solver.solve()
 
 
 def generate_validated_puzzle(
     db: Session,
     pattern_idx: int = None,
-    seed: int = None
+    seed: int = None,
+    backend: str = "bitset",
+    lexicon: Lexicon = None,
+    rng: Optional[random.Random] = None,
+    use_cache: bool = True,
+    deadline: Union[Deadline, float, None] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
 ) -> Optional[dict]:
     """
     Generate a single validated crossword puzzle.
@@ -2354,31 +2309,53 @@ def generate_validated_puzzle(
     1. Pattern validation (rejects invalid patterns before fill)
     2. CSP backtracking with MRV heuristic
     3. Comprehensive post-fill validation of ALL runs
+
+    Pass ``lexicon`` to reuse an already loaded word list; by default the
+    process-wide one from get_lexicon() is used. All randomness comes from
+    ``rng`` (by default a private random.Random(seed)), never the global RNG,
+    so the same pattern, lexicon and seed always give the same puzzle.
+
+    With a seed (and no caller-supplied rng) the fill only depends on the
+    pattern, lexicon version and seed, so solved grids are reused from the
+    disk fill cache (see app.services.fill_cache) unless ``use_cache`` is off.
+
+    ``deadline`` (a Deadline or seconds from now) bounds the whole call: the
+    fill stops cleanly when it passes and None is returned. Time spent per
+    step is recorded on the Deadline (see Deadline.report()). ``should_stop``
+    cancels the fill early, e.g. when another attempt has already won.
     """
-    if seed is not None:
-        random.seed(seed)
+    deadline = Deadline.coerce(deadline)
+    if deadline.expired():
+        logger.warning("No time left to generate a puzzle")
+        return None
+
+    # Only a seed-driven fill can be keyed; a caller's rng may be in any state
+    cacheable = rng is None and seed is not None
+    if rng is None:
+        rng = random.Random(seed)
 
     # Load dictionary
-    words_by_length = load_dictionary_words(db)
+    if lexicon is None:
+        lexicon = get_lexicon(db)
+    words_by_length = lexicon.words_by_length
 
     if not words_by_length:
         logger.error("No dictionary words found!")
         return None
 
     # Select pattern
-    if pattern_idx is not None:
-        pattern = PATTERNS[pattern_idx % len(PATTERNS)]
-    else:
-        pattern = random.choice(PATTERNS)
-
-    # Step 1: Validate pattern BEFORE attempting fill
-    is_valid, error_msg = validate_pattern(pattern)
-    if not is_valid:
-        logger.error(f"Invalid pattern: {error_msg}")
+    if pattern_idx is None:
+        pattern_idx = rng.randrange(len(PATTERNS))
+    pattern = PATTERNS[pattern_idx % len(PATTERNS)]
+    compiled = COMPILED_PATTERNS[pattern_idx % len(PATTERNS)]
+
+    # Step 1: Validate pattern BEFORE attempting fill (checked at compile time)
+    if not compiled.is_valid:
+        logger.error(f"Invalid pattern: {compiled.error}")
         return None
 
-    # Extract word slots
-    slots = extract_word_slots(pattern)
+    # Word slots, with their crossing maps
+    slots = compiled.slots
 
     if not slots:
         logger.error("No word slots found in pattern!")
@@ -2387,7 +2364,34 @@ def generate_validated_puzzle(
     logger.info(f"Pattern has {len(slots)} word slots")
 
     # Step 2: Try to fill the puzzle using backtracking
-    solution = fill_puzzle_with_backtracking(pattern, slots, words_by_length)
+    with deadline.phase("fill"):
+        indexes = lexicon.indexes(backend)
+        fill_cache = get_fill_cache() if cacheable and use_cache else None
+        cache_key = fill_cache_key(pattern, lexicon.version, seed) if fill_cache else None
+        solution = fill_cache.get(cache_key) if fill_cache else None
+
+        if solution is not None:
+            logger.info(f"Fill cache hit {cache_key[:12]}")
+        else:
+            # The fill gets its own stream so its result doesn't depend on how
+            # many draws were made before it (and a cache hit skips it entirely)
+            fill_rng = random.Random(derive_seed(seed, "fill")) if cacheable else rng
+            stats = FillStats()
+            solution = fill_puzzle_with_backtracking(
+                pattern, slots, words_by_length, indexes=indexes, stats=stats,
+                rng=fill_rng, deadline=deadline, should_stop=should_stop,
+            )
+            logger.info(
+                f"Fill search: {stats.nodes} nodes, {stats.backtracks} backtracks, "
+                f"{stats.wipeouts} wipeouts in {stats.elapsed_ms:.0f}ms"
+            )
+            if stats.timeouts:
+                logger.warning(f"Fill stopped by deadline ({deadline.report()})")
+            if solution is not None and fill_cache:
+                fill_cache.put(
+                    cache_key, solution, lexicon_version=lexicon.version, seed=seed,
+                    engine_version=ENGINE_VERSION,
+                )
 
     if solution is None:
         logger.warning("Failed to fill puzzle with valid words")
@@ -2395,79 +2399,448 @@ def generate_validated_puzzle(
 
     # Step 3: Comprehensive post-fill validation
     # Verify EVERY horizontal and vertical run is a valid word
-    is_valid, errors = validate_filled_grid(solution, words_by_length)
+    with deadline.phase("validate"):
+        is_valid, errors = validate_filled_grid(
+            solution, words_by_length, indexes=indexes, compiled=compiled
+        )
     if not is_valid:
         for error in errors:
             logger.error(f"Validation error: {error}")
         return None
 
     # Build clues
+    with deadline.phase("clues"):
+        clues_across, clues_down = _build_clues(solution, slots, rng)
+
+    # Create empty grid for play (hide letters, show black squares)
+    size = compiled.size
+    grid = compiled.blank_grid()
+
+    logger.info(f"Successfully generated puzzle with {len(slots)} words")
+
+    return {
+        "size": size,
+        "solution": solution,
+        "grid": grid,
+        "clues_across": clues_across,
+        "clues_down": clues_down,
+    }
+
+
+def _build_clues(
+    solution: list[list[str]],
+    slots: Sequence[CompiledSlot],
+    rng: random.Random,
+) -> tuple[list[dict], list[dict]]:
+    """Across and down clue entries for a filled grid, sorted by number."""
     clues_across = []
     clues_down = []
 
     for slot in slots:
-        word = "".join(solution[r][c] for r, c in slot["cells"])
-        clue = get_clue_for_word(word)
+        word = "".join(solution[r][c] for r, c in slot.cells)
+        clue = get_clue_for_word(word, rng)
 
         clue_entry = {
-            "number": slot["number"],
+            "number": slot.number,
             "clue": clue,
-            "length": slot["length"],
-            "row": slot["row"],
-            "col": slot["col"],
+            "length": slot.length,
+            "row": slot.row,
+            "col": slot.col,
         }
 
-        if slot["direction"] == "across":
+        if slot.direction == "across":
             clues_across.append(clue_entry)
         else:
             clues_down.append(clue_entry)
 
-    # Create empty grid for play (hide letters, show black squares)
-    size = len(pattern)
-    grid = [[" " if cell != BLACK else BLACK for cell in row] for row in solution]
+    return (
+        sorted(clues_across, key=lambda x: x["number"]),
+        sorted(clues_down, key=lambda x: x["number"]),
+    )
 
-    logger.info(f"Successfully generated puzzle with {len(slots)} words")
 
-    return {
-        "size": size,
-        "solution": solution,
-        "grid": grid,
-        "clues_across": sorted(clues_across, key=lambda x: x["number"]),
-        "clues_down": sorted(clues_down, key=lambda x: x["number"]),
-    }
+def derive_seed(*parts) -> int:
+    """
+    Derive a 64-bit seed from the given parts.
+
+    Unlike hash(), the result is the same in every process and on every run
+    (str hashing is randomized per process), so seeds can be used as cache
+    and deduplication keys.
+    """
+    key = "\x1f".join(str(part) for part in parts)
+    return int.from_bytes(hashlib.sha256(key.encode()).digest()[:8], "big")
 
 
-def generate_weekly_puzzles(db: Session, count: int = 7, week_seed: int = None) -> list[dict]:
+def _generate_with_retries(
+    db: Session,
+    seed: Optional[int],
+    pattern_idx: int,
+    lexicon: Lexicon,
+    deadline: Optional[Deadline] = None,
+) -> tuple[Optional[dict], int]:
     """
-    Generate multiple validated puzzles for a week.
+    Generate one puzzle, falling back to up to 3 other patterns.
 
-    Uses different patterns and seeds for variety.
+    Under a deadline, retries stop once it passes. Returns the puzzle (or None) and the number of retries it took.
     """
-    puzzles = []
+    deadline = Deadline.coerce(deadline)
+    attempts = [pattern_idx] + [(pattern_idx + retry + 1) % len(PATTERNS) for retry in range(3)]
+
+    for retry, idx in enumerate(attempts):
+        if deadline.expired():
+            logger.warning(f"Out of time after {retry} of {len(attempts)} pattern attempts")
+            return None, retry
+        puzzle = generate_validated_puzzle(
+            db, pattern_idx=idx, seed=seed, lexicon=lexicon,
+            deadline=deadline,
+        )
+        if puzzle:
+            return puzzle, retry
 
-    for i in range(count):
+    return None, len(attempts) - 1
+
+
+# Per-day cancel flags shared with portfolio workers (see generate_portfolio_batches)
+_cancel_flags = None
+
+
+def _init_generation_worker(lexicon: Lexicon, cancel_flags=None) -> None:
+    """Process pool initializer: install the parent's lexicon once per worker."""
+    global _lexicon, _cancel_flags
+    _lexicon = lexicon
+    _cancel_flags = cancel_flags
+
+
+def _generate_in_worker(job: tuple[Optional[int], int, Deadline]) -> tuple[Optional[dict], int]:
+    """Process pool task: generate one day's puzzle with the installed lexicon."""
+    seed, pattern_idx, deadline = job
+    return _generate_with_retries(None, seed, pattern_idx, _lexicon, deadline)
+
+
+def _portfolio_attempt(job: tuple) -> tuple[int, int, Optional[dict], float]:
+    """Process pool task: one portfolio attempt, abandoned once its day is won."""
+    day, attempt, seed, pattern_idx, deadline = job
+    start = time.perf_counter()
+    if _cancel_flags[day]:
+        return day, attempt, None, 0.0
+
+    puzzle = generate_validated_puzzle(
+        None, pattern_idx=pattern_idx, seed=seed, lexicon=_lexicon,
+        deadline=deadline, should_stop=lambda: _cancel_flags[day] != 0,
+    )
+    return day, attempt, puzzle, (time.perf_counter() - start) * 1000
+
+
+def _portfolio_attempts(seed: Optional[int], pattern_idx: int, size: int) -> list[tuple]:
+    """(seed, pattern_idx) for each attempt at one day.
+
+    Attempt 0 is exactly what the sequential path tries first; the others
+    cycle through the remaining patterns, then reseed.
+    """
+    attempts = []
+    for k in range(size):
+        attempt_seed = seed
+        if k >= len(PATTERNS) and seed is not None:
+            attempt_seed = derive_seed(seed, "attempt", k)
+        attempts.append((attempt_seed, (pattern_idx + k) % len(PATTERNS)))
+    return attempts
+
+
+def generate_portfolio_batches(
+    db: Session,
+    week_seeds: list[Optional[int]],
+    count: int = 7,
+    portfolio: int = 4,
+    workers: int = None,
+    time_budget: Optional[float] = None,
+    days: Optional[list[int]] = None,
+) -> list[list[dict]]:
+    """
+    Generate several weeks by racing ``portfolio`` attempts per day.
+
+    Backtracking run times are heavy-tailed: most (pattern, seed) fills
+    finish in milliseconds, a few take seconds. Instead of retrying
+    alternates one after another, every day's attempts are queued at once
+    (first attempts of all days first) in a process pool. The first attempt
+    to succeed wins its day; the day's cancel flag then stops its running
+    attempts at their next deadline check, and queued ones are dropped.
+
+    Which attempt wins depends on timing, so unlike generate_puzzle_batches
+    the output is not reproducible from the seeds alone. Each puzzle
+    records its winning attempt under ``"attempt"``. ``days`` is as in
+    generate_puzzle_batches.
+    """
+    if days is not None:
+        count = len(days)
+    deadline = Deadline(time_budget)
+    lexicon = get_lexicon(db)
+    day_indices = days
+    days = [
+        job for week_seed in week_seeds for job in _weekly_jobs(count, week_seed, day_indices)
+    ]
+    workers = resolve_generation_workers(workers)
+
+    attempts_by_day = [
+        _portfolio_attempts(seed, pattern_idx, portfolio) for seed, pattern_idx in days
+    ]
+    jobs = [
+        (day, k, *attempts_by_day[day][k], deadline)
+        for k in range(portfolio)
+        for day in range(len(days))
+    ]
+
+    # Shared arrays can only reach a worker as it starts, so each race gets
+    # its own pool (with this run's cancel flags installed by the
+    # initializer) rather than the long-lived generation_pool.
+    ctx = _pool_context()
+    cancel_flags = ctx.Array("b", len(days), lock=False)
+    winners: list[Optional[dict]] = [None] * len(days)
+    logger.info(
+        f"Racing {portfolio} attempts for each of {len(days)} puzzles "
+        f"across {workers} processes"
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_generation_worker,
+        initargs=(lexicon, cancel_flags),
+    ) as executor:
+        futures_by_day: list[list] = [[] for _ in days]
+        futures = []
+        for job in jobs:
+            future = executor.submit(_portfolio_attempt, job)
+            futures_by_day[job[0]].append(future)
+            futures.append(future)
+
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            day, k, puzzle, elapsed_ms = future.result()
+            if puzzle is None or winners[day] is not None:
+                continue
+
+            cancel_flags[day] = 1
+            for other in futures_by_day[day]:
+                other.cancel()
+            seed, pattern_idx = attempts_by_day[day][k]
+            puzzle["attempt"] = {
+                "index": k,
+                "pattern": pattern_idx,
+                "seed": seed,
+                "elapsed_ms": round(elapsed_ms, 1),
+            }
+            winners[day] = puzzle
+            logger.info(
+                f"Puzzle {day % count + 1}/{count}: attempt {k + 1}/{portfolio} "
+                f"(pattern {pattern_idx + 1}) won in {elapsed_ms:.0f}ms"
+            )
+
+    batches = []
+    for w in range(len(week_seeds)):
+        puzzles = []
+        for i, puzzle in enumerate(winners[w * count:(w + 1) * count]):
+            if puzzle:
+                puzzles.append(puzzle)
+            else:
+                logger.error(f"Failed to generate puzzle {i+1}/{count}")
+        batches.append(puzzles)
+
+    logger.info(
+        f"Generated {sum(len(p) for p in batches)}/{len(days)} puzzles in "
+        f"{deadline.elapsed():.2f}s (budget: {time_budget or 'none'})"
+    )
+    return batches
+
+
+def _weekly_jobs(
+    count: int, week_seed: Optional[int], days: Optional[list[int]] = None
+) -> list[tuple[Optional[int], int]]:
+    """(seed, pattern_idx) for each day of a week (or for the given ``days``)."""
+    jobs = []
+    for i in (range(count) if days is None else days):
         # Use different seed for each puzzle
-        seed = (week_seed or 0) + i * 12345 if week_seed else None
-        pattern_idx = i % len(PATTERNS)
+        seed = derive_seed(week_seed, "day", i) if week_seed else None
+        jobs.append((seed, i % len(PATTERNS)))
+    return jobs
 
-        puzzle = generate_validated_puzzle(db, pattern_idx=pattern_idx, seed=seed)
 
-        if puzzle:
-            puzzles.append(puzzle)
-            logger.info(f"Generated puzzle {i+1}/{count}")
-        else:
-            # Retry with different pattern
-            for retry in range(3):
-                alt_pattern = (pattern_idx + retry + 1) % len(PATTERNS)
-                puzzle = generate_validated_puzzle(db, pattern_idx=alt_pattern, seed=seed)
-                if puzzle:
-                    puzzles.append(puzzle)
-                    logger.info(f"Generated puzzle {i+1}/{count} (retry {retry+1})")
-                    break
+def resolve_generation_workers(workers: Optional[int]) -> int:
+    """Number of generation processes: None/1 = in-process, 0 = one per CPU."""
+    if workers is None:
+        return 1
+    if workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+
+# Long-lived generation pool of this process (see generation_pool)
+_generation_pool: Optional[ProcessPoolExecutor] = None
+_generation_pool_key: Optional[tuple[int, str]] = None
+_generation_pool_lock = threading.Lock()
+
+
+def _pool_context():
+    """Start method for generation pools: never fork the (threaded) caller."""
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def generation_pool(lexicon: Lexicon, workers: int) -> ProcessPoolExecutor:
+    """
+    The process's generation pool, started on first use and then reused.
+
+    Its workers are started once with ``lexicon`` installed, instead of
+    a pool (and a copy of the lexicon) per batch. Callers in different
+    threads share it. It is replaced when ``workers`` or the lexicon
+    version change; the old pool finishes its queued jobs first.
+    """
+    global _generation_pool, _generation_pool_key
+    key = (workers, lexicon.version)
+    with _generation_pool_lock:
+        if _generation_pool is None or _generation_pool_key != key:
+            if _generation_pool is not None:
+                _generation_pool.shutdown(wait=False)
+            _generation_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=_pool_context(),
+                initializer=_init_generation_worker,
+                initargs=(lexicon,),
+            )
+            _generation_pool_key = key
+        return _generation_pool
+
+
+def shutdown_generation_pool(wait: bool = True) -> None:
+    """Stop the process's generation pool (e.g. on application shutdown)."""
+    global _generation_pool, _generation_pool_key
+    with _generation_pool_lock:
+        pool, _generation_pool, _generation_pool_key = _generation_pool, None, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+def _discard_generation_pool(pool: ProcessPoolExecutor) -> None:
+    """Forget a broken pool so the next batch starts a new one."""
+    global _generation_pool, _generation_pool_key
+    with _generation_pool_lock:
+        if _generation_pool is pool:
+            _generation_pool, _generation_pool_key = None, None
+    pool.shutdown(wait=False)
+
+
+def generate_puzzle_batches(
+    db: Session,
+    week_seeds: list[Optional[int]],
+    count: int = 7,
+    workers: int = None,
+    time_budget: Optional[float] = None,
+    in_subprocess: bool = False,
+    days: Optional[list[int]] = None,
+) -> list[list[dict]]:
+    """
+    Generate the puzzles for several weeks at once.
+
+    Every puzzle (with its pattern retries) is an independent job. With
+    ``workers`` > 1 the jobs of all weeks are fanned out to a process pool,
+    so wall-clock time scales with the number of cores; the pool is the
+    process's long-lived generation_pool, so its workers (and their copy of
+    the lexicon) are started once, not per batch. Results are returned per
+    week in day order, skipping days that failed, exactly as the sequential
+    path does.
+
+    ``time_budget`` (seconds) bounds the whole batch. In-process, each job
+    gets up to twice its fair share of the time left; in the pool all
+    jobs run against the batch deadline. Days not done in time are skipped.
+
+    ``in_subprocess`` uses the pool even for a single worker, keeping the
+    search off the calling process (e.g. a web worker's request threads).
+
+    ``days`` (day indices of the week) generates just those days, with the
+    seeds and patterns they get in a full week, instead of the first
+    ``count``; e.g. to fill in the days missing from a short week.
+    """
+    if days is not None:
+        count = len(days)
+    deadline = Deadline(time_budget)
+    lexicon = get_lexicon(db)
+    jobs = [job for week_seed in week_seeds for job in _weekly_jobs(count, week_seed, days)]
+    workers = min(resolve_generation_workers(workers), len(jobs) or 1)
+
+    if workers > 1 or in_subprocess:
+        logger.info(f"Generating {len(jobs)} puzzles across {workers} processes")
+        executor = generation_pool(lexicon, workers)
+        try:
+            # map() yields results in submission order, i.e. by week and day
+            results = list(executor.map(
+                _generate_in_worker,
+                [(seed, pattern_idx, deadline) for seed, pattern_idx in jobs],
+            ))
+        except BrokenProcessPool:
+            _discard_generation_pool(executor)
+            raise
+    else:
+        # Each job may use up to twice its fair share of the time left, so
+        # one hard fill doesn't fail just for being slower than average
+        results = [
+            _generate_with_retries(
+                db, seed, pattern_idx, lexicon, deadline.share((len(jobs) - j + 1) // 2)
+            )
+            for j, (seed, pattern_idx) in enumerate(jobs)
+        ]
+
+    batches = []
+    for w in range(len(week_seeds)):
+        puzzles = []
+        for i, (puzzle, retries) in enumerate(results[w * count:(w + 1) * count]):
+            if puzzle:
+                puzzles.append(puzzle)
+                suffix = f" (retry {retries})" if retries else ""
+                logger.info(f"Generated puzzle {i+1}/{count}{suffix}")
             else:
                 logger.error(f"Failed to generate puzzle {i+1}/{count}")
+        batches.append(puzzles)
+
+    report = deadline.report()
+    logger.info(
+        f"Generated {sum(len(p) for p in batches)}/{len(jobs)} puzzles in "
+        f"{report['elapsed_s']:.2f}s (budget: {time_budget or 'none'}, "
+        f"phases: {report['phases_s']})"
+    )
+    return batches
 
-    return puzzles
+
+def generate_weekly_puzzles(
+    db: Session,
+    count: int = 7,
+    week_seed: int = None,
+    workers: int = None,
+    time_budget: Optional[float] = None,
+    portfolio: int = 0,
+    in_subprocess: bool = False,
+    days: Optional[list[int]] = None,
+) -> list[dict]:
+    """
+    Generate multiple validated puzzles for a week.
+
+    Uses different patterns and seeds for variety. The lexicon is loaded
+    once and shared by every puzzle and retry. Pass ``workers`` to generate
+    the days in parallel processes and ``time_budget`` (seconds) to bound
+    the whole week (see generate_puzzle_batches). With ``portfolio`` > 1,
+    that many attempts per day race each other instead of retrying in turn
+    (see generate_portfolio_batches). ``in_subprocess`` keeps the search
+    out of the calling process even with one worker. ``days`` generates
+    only those days of the week (see generate_puzzle_batches).
+    """
+    if portfolio > 1:
+        return generate_portfolio_batches(
+            db, [week_seed], count=count, portfolio=portfolio,
+            workers=workers, time_budget=time_budget, days=days,
+        )[0]
+    return generate_puzzle_batches(
+        db, [week_seed], count=count, workers=workers, time_budget=time_budget,
+        in_subprocess=in_subprocess, days=days,
+    )[0]
 
 
 # Legacy function for compatibility
@@ -2478,9 +2851,6 @@ def get_random_templates(count: int, seed: int = None) -> list[dict]:
     The actual puzzle generation now happens in puzzle_cache.py using
     generate_weekly_puzzles() which validates against the dictionary.
     """
-    if seed is not None:
-        random.seed(seed)
-
     templates = []
     for i in range(count):
         pattern = PATTERNS[i % len(PATTERNS)]
@@ -0,0 +1,230 @@
+"""Reserve pool of pre-generated puzzles.
+
+The reserve_puzzles table holds generated, unscheduled puzzles so that
+requests never have to wait for the generator: practice puzzles are stocked
+from it, weeks whose generation failed are topped up from it and
+/puzzles/refresh can swap in a whole week at once.
+
+A ReserveReplenisher keeps the pool at RESERVE_POOL_TARGET, generating in
+the process's long-lived generation pool so the search doesn't compete with
+request threads for the web process's GIL. Every web worker runs one; the
+generation lock (key RESERVE_LOCK_KEY) lets only one of them replenish at a
+time. Depth and replenish rate are reported by reserve_metrics.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models.reserve_puzzle import ReservePuzzle
+from app.services.generation_lock import get_generation_lock
+
+logger = logging.getLogger(__name__)
+
+# Generation lock key held while stocking and replenishing the pool
+RESERVE_LOCK_KEY = "reserve-pool"
+
+# Replenishment counters of this process (see reserve_metrics)
+_metrics = {
+    "generated_total": 0,
+    "claimed_total": 0,
+    "last_replenish": None,
+}
+_metrics_lock = threading.Lock()
+
+
+def reserve_depth(db: Session) -> int:
+    """Number of puzzles in the pool."""
+    return db.query(func.count(ReservePuzzle.id)).scalar()
+
+
+def add_reserve_puzzles(db: Session, puzzles: list[dict]) -> int:
+    """Store puzzle data dicts (see puzzle_cache.build_puzzle_data) in the pool."""
+    for puzzle_data in puzzles:
+        db.add(ReservePuzzle(
+            size=puzzle_data["size"],
+            difficulty=puzzle_data["difficulty"],
+            grid=json.dumps(puzzle_data["grid"]),
+            solution=json.dumps(puzzle_data["solution"]),
+            clues_across=json.dumps(puzzle_data["clues_across"]),
+            clues_down=json.dumps(puzzle_data["clues_down"]),
+        ))
+    db.commit()
+    return len(puzzles)
+
+
+def claim_reserve_puzzles(
+    db: Session,
+    count: int,
+    keep: int = 0,
+    title: str = "Daily Puzzle",
+) -> list[dict]:
+    """
+    Take up to ``count`` of the oldest puzzles out of the pool.
+
+    Returns puzzle data dicts ready for storing as Puzzle rows. The rows
+    are deleted but not committed, so the caller's commit makes taking
+    them and using them one transaction. At least ``keep`` puzzles are
+    left in the pool. On PostgreSQL concurrent claims skip each other's
+    rows instead of waiting.
+    """
+    if keep:
+        count = min(count, reserve_depth(db) - keep)
+    if count <= 0:
+        return []
+
+    rows = (
+        db.query(ReservePuzzle)
+        .order_by(ReservePuzzle.id)
+        .limit(count)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    puzzles = []
+    for row in rows:
+        puzzles.append({
+            "title": title,
+            "size": row.size,
+            "difficulty": row.difficulty,
+            "grid": json.loads(row.grid),
+            "solution": json.loads(row.solution),
+            "clues_across": json.loads(row.clues_across),
+            "clues_down": json.loads(row.clues_down),
+            "scheduled_date": None,
+        })
+        db.delete(row)
+    db.flush()
+
+    with _metrics_lock:
+        _metrics["claimed_total"] += len(puzzles)
+    return puzzles
+
+
+def replenish_reserve(
+    db: Session,
+    target: Optional[int] = None,
+    batch: Optional[int] = None,
+    in_subprocess: bool = True,
+) -> int:
+    """
+    Generate puzzles until the pool holds ``target`` (at most ``batch`` per call).
+
+    Returns the number of puzzles added.
+    """
+    from app.services.puzzle_cache import build_puzzle_data
+    from app.services.puzzle_templates import derive_seed, generate_puzzle_batches
+
+    settings = get_settings()
+    target = settings.reserve_pool_target if target is None else target
+    batch = settings.reserve_pool_batch if batch is None else batch
+
+    needed = min(target - reserve_depth(db), batch)
+    if needed <= 0:
+        return 0
+
+    start = time.monotonic()
+    # Fresh seeds every run: the pool should not repeat earlier puzzles
+    seed = derive_seed("reserve", os.getpid(), time.time_ns())
+    [generated] = generate_puzzle_batches(
+        db,
+        [seed],
+        count=needed,
+        workers=settings.puzzle_generation_workers,
+        time_budget=settings.puzzle_generation_budget_seconds,
+        in_subprocess=in_subprocess,
+    )
+    added = add_reserve_puzzles(db, [build_puzzle_data(p) for p in generated])
+    seconds = time.monotonic() - start
+
+    with _metrics_lock:
+        _metrics["generated_total"] += added
+        _metrics["last_replenish"] = {
+            "at": datetime.utcnow().isoformat(),
+            "added": added,
+            "seconds": round(seconds, 3),
+            "puzzles_per_minute": round(added / seconds * 60, 1) if seconds else None,
+        }
+    logger.info(f"Reserve pool: added {added} puzzles in {seconds:.2f}s")
+    return added
+
+
+def reserve_metrics(db: Session) -> dict:
+    """Pool depth and this process's replenish/claim counters."""
+    settings = get_settings()
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    return {
+        "depth": reserve_depth(db),
+        "target": settings.reserve_pool_target,
+        **metrics,
+    }
+
+
+class ReserveReplenisher:
+    """Tops the pool up every ``interval`` seconds until stopped."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: Optional[float] = None,
+    ):
+        settings = get_settings()
+        self.session_factory = session_factory
+        self.interval = settings.reserve_replenish_interval_seconds if interval is None else interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """
+        Stock practice puzzles from the pool, then top the pool up.
+
+        Skipped (returning 0) while another worker holds the reserve lock,
+        so N workers don't each fill the pool towards the target.
+        """
+        from app.services.puzzle_service import PuzzleService
+
+        db = self.session_factory()
+        lock = get_generation_lock(db.get_bind())
+        if not lock.try_acquire(RESERVE_LOCK_KEY):
+            db.close()
+            logger.debug("Reserve pool is being replenished by another worker")
+            return 0
+        try:
+            with lock.heartbeats(RESERVE_LOCK_KEY):
+                PuzzleService(db).stock_practice_puzzles(get_settings().practice_puzzle_limit)
+                return replenish_reserve(db)
+        finally:
+            lock.release(RESERVE_LOCK_KEY)
+            db.close()
+
+    def run(self) -> None:
+        """Replenish until stop() is called; refill right away while short."""
+        while not self._stop.is_set():
+            try:
+                added = self.run_once()
+            except Exception as e:
+                logger.error(f"Reserve pool replenish failed: {e}")
+                added = 0
+            if self.interval <= 0:
+                break
+            if not added:
+                self._stop.wait(self.interval)
+
+    def start(self) -> threading.Thread:
+        """Run in a background (daemon) thread."""
+        self._thread = threading.Thread(target=self.run, name="reserve-replenisher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -5,8 +5,15 @@ Management script for Mini Crossword backend.
 Usage:
     python manage.py generate     # Generate puzzles for current week
     python manage.py refresh      # Force refresh puzzles for current week
+    python manage.py schedule     # Generate the current and upcoming weeks
     python manage.py list         # List all puzzles in database
     python manage.py migrate      # Run database migrations
+    python manage.py load-dictionary words.txt   # Bulk-load a word list
+    python manage.py build-lexicon lexicon.bin   # Compile a memory-mappable lexicon
+    python manage.py build-clue-index   # Compile data/clues.tsv into a clue index
+    python manage.py fill-stats   # Compare fill search counters per pattern
+    python manage.py fill-cache stats   # Inspect or prune the solved-fill cache
+    python manage.py bench-generate     # Benchmark fills across patterns and seeds
 """
 
 import argparse
@@ -24,6 +31,7 @@ logger = logging.getLogger(__name__)
 
 def cmd_generate(args):
     """Generate puzzles for the current week."""
+    from app.config import get_settings
     from app.database import SessionLocal, init_db
     from app.services.puzzle_cache import (
         ensure_dictionary,
@@ -42,8 +50,9 @@ def cmd_generate(args):
         logger.info("Step 1: Ensuring dictionary is loaded...")
         ensure_dictionary(db)
 
+        # Waits for (instead of skipping) a generation running in another worker
         logger.info("Step 2: Generating weekly puzzle cache...")
-        ensure_weekly_cache(db)
+        ensure_weekly_cache(db, wait=get_settings().generation_lock_wait_seconds)
 
         logger.info("Done! Puzzles are ready.")
     finally:
@@ -52,13 +61,12 @@ def cmd_generate(args):
 
 def cmd_refresh(args):
     """Force refresh puzzles for the current week."""
+    from app.config import get_settings
     from app.database import SessionLocal, init_db
     from app.models.puzzle import Puzzle
-    from app.models.cache_meta import PuzzleCacheMeta
     from app.services.puzzle_cache import (
         get_current_week_key,
-        ensure_weekly_cache,
-        ensure_dictionary,
+        regenerate_week,
     )
 
     logger.info("Initializing database...")
@@ -69,22 +77,11 @@ def cmd_refresh(args):
         week_key = args.week or get_current_week_key()
         logger.info(f"Refreshing puzzles for week: {week_key}")
 
-        # Ensure dictionary is loaded
-        logger.info("Ensuring dictionary is loaded...")
-        ensure_dictionary(db)
-
-        # Delete existing puzzles and cache meta for this week
-        deleted_puzzles = db.query(Puzzle).filter(Puzzle.week_key == week_key).delete()
-        deleted_meta = db.query(PuzzleCacheMeta).filter(
-            PuzzleCacheMeta.week_key == week_key
-        ).delete()
-        db.commit()
-
-        logger.info(f"Deleted {deleted_puzzles} puzzles and {deleted_meta} cache entries")
-
-        # Regenerate
+        # Regenerate; the old puzzles stay live until the new week is swapped in
         logger.info("Regenerating puzzles...")
-        ensure_weekly_cache(db)
+        count = regenerate_week(db, week_key, wait=get_settings().generation_lock_wait_seconds)
+        if not count:
+            logger.warning("Another worker kept generating this week; nothing changed")
 
         # Show results
         puzzles = db.query(Puzzle).filter(
@@ -104,6 +101,34 @@ def cmd_refresh(args):
         db.close()
 
 
+def cmd_schedule(args):
+    """Generate the current and next weeks ahead of time (backfilling gaps)."""
+    from app.database import SessionLocal, init_db
+    from app.services.puzzle_scheduler import LookaheadScheduler, pending_weeks, upcoming_week_keys
+
+    logger.info("Initializing database...")
+    init_db()
+
+    scheduler = LookaheadScheduler(
+        SessionLocal,
+        weeks_ahead=args.weeks,
+        interval=args.interval if args.loop else 0,
+    )
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.stop()
+
+    db = SessionLocal()
+    try:
+        week_keys = upcoming_week_keys(scheduler.weeks_ahead)
+        missing = set(pending_weeks(db, week_keys))
+    finally:
+        db.close()
+    for week_key in week_keys:
+        print(f"  {week_key}: {'missing' if week_key in missing else 'ready'}")
+
+
 def cmd_list(args):
     """List all puzzles in the database."""
     from app.database import SessionLocal, init_db
@@ -163,7 +188,7 @@ def cmd_test_generate(args):
         ensure_dictionary(db)
 
         logger.info("Generating test puzzle...")
-        puzzle = generate_validated_puzzle(db)
+        puzzle = generate_validated_puzzle(db, seed=args.seed)
 
         if puzzle:
             print(f"\nGenerated {puzzle['size']}x{puzzle['size']} puzzle:")
@@ -184,6 +209,211 @@ def cmd_test_generate(args):
         db.close()
 
 
+def cmd_load_dictionary(args):
+    """Bulk-load a word list file (or stdin) into the dictionary table."""
+    from app.database import SessionLocal, init_db
+    from app.services.dictionary_loader import load_dictionary_file
+
+    init_db()
+    db = SessionLocal()
+    try:
+        result = load_dictionary_file(
+            db, args.path, min_length=args.min_length, max_length=args.max_length
+        )
+    finally:
+        db.close()
+
+    rate = result["accepted"] / result["seconds"] if result["seconds"] else 0
+    print(f"Accepted: {result['accepted']} words ({rate:,.0f} words/s)")
+    print(f"Inserted: {result['inserted']} new words in {result['seconds']:.2f}s")
+
+
+def cmd_build_lexicon(args):
+    """Compile the dictionary table or a word list into a lexicon file."""
+    from app.services.dictionary_loader import parse_word_lines
+    from app.services.lexicon import Lexicon
+    from app.services.lexicon_file import write_lexicon_file
+    from app.services.puzzle_templates import (
+        CLUE_TEMPLATES,
+        PUZZLE_WORD_LENGTHS,
+        load_dictionary_words_from_db,
+    )
+
+    if args.words:
+        with open(args.words, encoding="utf-8", errors="replace") as f:
+            scored = {length: [] for length in PUZZLE_WORD_LENGTHS}
+            for word, frequency in parse_word_lines(
+                f, min(PUZZLE_WORD_LENGTHS), max(PUZZLE_WORD_LENGTHS)
+            ):
+                if frequency >= args.min_frequency:
+                    scored[len(word)].append((-frequency, word))
+        limit = args.max_words_per_length or None
+        words_by_length = {
+            length: [word for _, word in sorted(group)[:limit]]
+            for length, group in scored.items()
+        }
+        source = f"words:{args.words}"
+    else:
+        from app.database import SessionLocal, init_db
+
+        init_db()
+        db = SessionLocal()
+        try:
+            words_by_length = load_dictionary_words_from_db(
+                db,
+                min_frequency=args.min_frequency,
+                limit_per_length=args.max_words_per_length or None,
+            )
+        finally:
+            db.close()
+        source = "db"
+
+    if not any(words_by_length.values()):
+        print("No words to compile (load some with `python manage.py load-dictionary PATH`)")
+        sys.exit(1)
+
+    lexicon = Lexicon(words_by_length, clued_words=CLUE_TEMPLATES.keys(), source=source)
+    size = write_lexicon_file(lexicon, args.output)
+    print(f"Wrote {args.output}: {len(lexicon)} words, {size / 1024:.1f} KB")
+    print(f"Set LEXICON_FILE={args.output} to use it")
+
+
+def cmd_build_clue_index(args):
+    """Compile the clue TSV into a memory-mappable clue index."""
+    import time
+    from pathlib import Path
+    from app.config import get_settings
+    from app.services.clue_database import (
+        CLUE_INDEX_FILE,
+        CLUES_FILE,
+        clues_file_source,
+        load_clues_file,
+    )
+    from app.services.clue_index import write_clue_index
+
+    tsv = Path(args.tsv) if args.tsv else CLUES_FILE
+    output = args.output or str(CLUE_INDEX_FILE)
+    if not tsv.exists():
+        print(f"Clues file not found: {tsv}")
+        sys.exit(1)
+
+    workers = get_settings().clue_load_workers if args.workers is None else args.workers
+    start = time.perf_counter()
+    builder = load_clues_file(tsv, workers)
+    store = builder.build()
+    size = write_clue_index(store, output, source=clues_file_source(tsv))
+    seconds = time.perf_counter() - start
+    print(
+        f"Wrote {output}: {len(store)} words, {store.total_clues} clues "
+        f"({store.distinct_clues} distinct), {size / 1024 / 1024:.1f} MB in {seconds:.1f}s"
+    )
+
+
+def cmd_fill_stats(args):
+    """Compare fill search counters per pattern across propagation modes."""
+    import random
+    from app.services.fill_engine import FillStats, PROPAGATION_MODES
+    from app.services.puzzle_templates import (
+        COMPILED_PATTERNS,
+        PATTERNS,
+        fill_puzzle_with_backtracking,
+        get_lexicon,
+    )
+
+    lexicon = get_lexicon()
+    words_by_length = lexicon.words_by_length
+    indexes = lexicon.indexes()
+
+    print(f"\n{'Pattern':<8} {'Mode':<8} {'Filled':>7} {'Nodes':>10} {'Backtracks':>11} {'Wipeouts':>9} {'Backjumps':>10} {'Nogood hits':>12}")
+    for pattern_idx, pattern in enumerate(PATTERNS):
+        slots = COMPILED_PATTERNS[pattern_idx].slots
+        for mode in PROPAGATION_MODES:
+            stats = FillStats()
+            filled = 0
+            for seed in range(args.seeds):
+                solution = fill_puzzle_with_backtracking(
+                    pattern, slots, words_by_length,
+                    indexes=indexes, propagation=mode, stats=stats,
+                    rng=random.Random(seed),
+                )
+                filled += solution is not None
+            print(
+                f"{pattern_idx + 1:<8} {mode:<8} {filled:>3}/{args.seeds:<3} "
+                f"{stats.nodes // args.seeds:>10} {stats.backtracks // args.seeds:>11} "
+                f"{stats.wipeouts // args.seeds:>9} {stats.backjumps // args.seeds:>10} "
+                f"{stats.nogood_hits // args.seeds:>12}"
+            )
+
+
+def cmd_fill_cache(args):
+    """Inspect, prune or clear the disk cache of solved fills."""
+    from app.services.fill_cache import get_fill_cache
+
+    cache = get_fill_cache()
+    if cache is None:
+        print("Fill cache is disabled (FILL_CACHE_DIR is empty)")
+        return
+
+    if args.action == "prune":
+        max_bytes = args.max_mb * 1024 * 1024 if args.max_mb is not None else None
+        print(f"Removed {cache.prune(max_bytes)} entries")
+    elif args.action == "clear":
+        print(f"Removed {cache.clear()} entries")
+
+    stats = cache.stats()
+    print(f"\nDirectory: {stats['directory']}")
+    print(f"Entries:   {stats['entries']}")
+    print(f"Size:      {stats['bytes'] / 1024:.1f} KB of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+def cmd_bench_generate(args):
+    """Benchmark the generator across patterns, seeds and lexicon sizes."""
+    import json
+    from app.services.generator_bench import compare_reports, run_benchmark
+    from app.services.puzzle_templates import get_lexicon
+
+    sizes = [size or None for size in args.lexicon_sizes]
+    report = run_benchmark(
+        get_lexicon(),
+        seeds=args.seeds,
+        lexicon_sizes=sizes,
+        pattern_ids=args.patterns,
+        backend=args.backend,
+        propagation=args.propagation,
+    )
+
+    print(f"\n{'Words':>6} {'Pattern':>8} {'Filled':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'Nodes':>8} {'Backtracks':>11} {'Candidates':>11}")
+    for row in report["results"]:
+        print(
+            f"{row['lexicon_size']:>6} {row['pattern']:>8} {row['filled']:>3}/{row['runs']:<3} "
+            f"{row['fill_ms']['p50']:>8.1f} {row['fill_ms']['p95']:>8.1f} {row['fill_ms']['p99']:>8.1f} "
+            f"{row['nodes']['mean']:>8.0f} {row['backtracks']['mean']:>11.0f} "
+            f"{row['candidates']['mean']:>11.0f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        def ratio(value):
+            return f"{value:>8.2f}x" if value is not None else f"{'-':>9}"
+
+        print(f"\nChange vs {args.baseline} (current / baseline):")
+        print(f"{'Words':>6} {'Pattern':>8} {'Success':>8} {'p50 ms':>9} {'p95 ms':>9} {'Nodes':>9}")
+        for change in compare_reports(report, baseline):
+            print(
+                f"{change['lexicon_size']:>6} {change['pattern']:>8} {change['success_rate']:>+8.0%} "
+                f"{ratio(change['fill_ms_p50'])} {ratio(change['fill_ms_p95'])} "
+                f"{ratio(change['nodes_mean'])}"
+            )
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Mini Crossword Management",
@@ -193,9 +423,17 @@ Examples:
   python manage.py generate          Generate puzzles for current week
   python manage.py refresh           Force refresh current week's puzzles
   python manage.py refresh --week 2026-W03   Refresh specific week
+  python manage.py schedule --weeks 4   Generate this week and the next 4
   python manage.py list              List all puzzles
   python manage.py migrate           Run database migrations
   python manage.py test              Test puzzle generation
+  python manage.py load-dictionary words.txt   Bulk-load a word list
+  python manage.py build-lexicon lexicon.bin   Compile the dictionary table
+  python manage.py build-clue-index  Compile data/clues.tsv into data/clues.idx
+  python manage.py fill-stats        Compare fill search counters per pattern
+  python manage.py fill-cache prune --max-mb 16   Shrink the fill cache
+  python manage.py bench-generate --seeds 20 --json bench.json
+  python manage.py bench-generate --baseline bench.json   Compare with a stored run
         """
     )
 
@@ -213,6 +451,28 @@ Examples:
         help="Week key (e.g., 2026-W02). Defaults to current week."
     )
 
+    # schedule command
+    schedule_parser = subparsers.add_parser(
+        "schedule", help="Generate the current and upcoming weeks ahead of time"
+    )
+    schedule_parser.add_argument(
+        "--weeks",
+        type=int,
+        default=None,
+        help="Weeks after the current one to keep generated (default: PUZZLE_LOOKAHEAD_WEEKS)"
+    )
+    schedule_parser.add_argument(
+        "--loop",
+        action="store_true",
+        help="Keep running, re-checking every --interval seconds"
+    )
+    schedule_parser.add_argument(
+        "--interval",
+        type=float,
+        default=3600,
+        help="Seconds between passes with --loop (default: 3600)"
+    )
+
     # list command
     subparsers.add_parser("list", help="List all puzzles")
 
@@ -220,7 +480,157 @@ Examples:
     subparsers.add_parser("migrate", help="Run database migrations")
 
     # test command
-    subparsers.add_parser("test", help="Test puzzle generation")
+    test_parser = subparsers.add_parser("test", help="Test puzzle generation")
+    test_parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for a reproducible (and cacheable) puzzle"
+    )
+
+    # load-dictionary command
+    load_parser = subparsers.add_parser(
+        "load-dictionary", help="Bulk-load a word list into the dictionary table"
+    )
+    load_parser.add_argument(
+        "path",
+        help="Word list file, one word per line with an optional frequency; - for stdin"
+    )
+    load_parser.add_argument(
+        "--min-length",
+        type=int,
+        default=3,
+        help="Shortest word kept (default: 3)"
+    )
+    load_parser.add_argument(
+        "--max-length",
+        type=int,
+        default=7,
+        help="Longest word kept (default: 7)"
+    )
+
+    # build-lexicon command
+    build_lexicon_parser = subparsers.add_parser(
+        "build-lexicon", help="Compile a memory-mappable lexicon file"
+    )
+    build_lexicon_parser.add_argument("output", help="Lexicon file to write")
+    build_lexicon_parser.add_argument(
+        "--words",
+        type=str,
+        default=None,
+        help="Word list file to compile (default: the dictionary table)"
+    )
+    build_lexicon_parser.add_argument(
+        "--min-frequency",
+        type=int,
+        default=0,
+        help="Skip words with a lower frequency score (default: 0)"
+    )
+    build_lexicon_parser.add_argument(
+        "--max-words-per-length",
+        type=int,
+        default=0,
+        help="Keep only the most frequent N words per length; 0 = all (default: 0)"
+    )
+
+    # build-clue-index command
+    build_clue_index_parser = subparsers.add_parser(
+        "build-clue-index", help="Compile the clue TSV into a memory-mappable index"
+    )
+    build_clue_index_parser.add_argument(
+        "--tsv",
+        type=str,
+        default=None,
+        help="Clue TSV to compile (default: data/clues.tsv)"
+    )
+    build_clue_index_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Index file to write (default: data/clues.idx)"
+    )
+    build_clue_index_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes parsing the TSV; 0 = one per CPU (default: CLUE_LOAD_WORKERS)"
+    )
+
+    # fill-stats command
+    fill_stats_parser = subparsers.add_parser(
+        "fill-stats", help="Compare fill search counters per pattern"
+    )
+    fill_stats_parser.add_argument(
+        "--seeds",
+        type=int,
+        default=5,
+        help="Number of seeds to average over per pattern (default: 5)"
+    )
+
+    # fill-cache command
+    fill_cache_parser = subparsers.add_parser(
+        "fill-cache", help="Inspect or prune the solved-fill cache"
+    )
+    fill_cache_parser.add_argument(
+        "action",
+        choices=["stats", "prune", "clear"],
+        help="stats: show size; prune: evict least recently used; clear: remove all"
+    )
+    fill_cache_parser.add_argument(
+        "--max-mb",
+        type=int,
+        default=None,
+        help="Size to prune down to (default: FILL_CACHE_MAX_MB)"
+    )
+
+    # bench-generate command
+    bench_parser = subparsers.add_parser(
+        "bench-generate", help="Benchmark fills across patterns and seeds"
+    )
+    bench_parser.add_argument(
+        "--seeds",
+        type=int,
+        default=5,
+        help="Seeds per pattern (default: 5)"
+    )
+    bench_parser.add_argument(
+        "--patterns",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Pattern numbers to run, 1-based (default: all)"
+    )
+    bench_parser.add_argument(
+        "--lexicon-sizes",
+        type=int,
+        nargs="+",
+        default=[0],
+        help="Lexicon sizes to sample, in words; 0 = the full lexicon (default: 0)"
+    )
+    bench_parser.add_argument(
+        "--backend",
+        choices=["bitset", "numpy"],
+        default="bitset",
+        help="Candidate backend (default: bitset)"
+    )
+    bench_parser.add_argument(
+        "--propagation",
+        choices=["none", "forward", "ac3"],
+        default="ac3",
+        help="Propagation mode (default: ac3)"
+    )
+    bench_parser.add_argument(
+        "--json",
+        type=str,
+        default=None,
+        help="Write the full report to this JSON file"
+    )
+    bench_parser.add_argument(
+        "--baseline",
+        type=str,
+        default=None,
+        help="Baseline JSON report to compare against"
+    )
 
     args = parser.parse_args()
 
@@ -228,12 +638,26 @@ Examples:
         cmd_generate(args)
     elif args.command == "refresh":
         cmd_refresh(args)
+    elif args.command == "schedule":
+        cmd_schedule(args)
     elif args.command == "list":
         cmd_list(args)
     elif args.command == "migrate":
         sys.exit(cmd_migrate(args))
     elif args.command == "test":
         cmd_test_generate(args)
+    elif args.command == "load-dictionary":
+        cmd_load_dictionary(args)
+    elif args.command == "build-lexicon":
+        cmd_build_lexicon(args)
+    elif args.command == "build-clue-index":
+        cmd_build_clue_index(args)
+    elif args.command == "fill-stats":
+        cmd_fill_stats(args)
+    elif args.command == "fill-cache":
+        cmd_fill_cache(args)
+    elif args.command == "bench-generate":
+        cmd_bench_generate(args)
     else:
         parser.print_help()
         sys.exit(1)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fill engine's candidate backends.
+
+Compares slot-pattern lookups through the pure-Python ``matches_pattern``
+scan, the bitset WordIndex and the NumPy matrix index on synthetic lexicons
+of increasing size. Each query is a pattern with 1-3 fixed letters taken
+from a real word, with a handful of words excluded as "used".
+
+Usage:
+    python scripts/bench_candidate_backends.py
+    python scripts/bench_candidate_backends.py --sizes 5000 50000 300000 --queries 200
+    python scripts/bench_candidate_backends.py --json > bench.json
+"""
+
+import argparse
+import json
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.lexicon import build_word_indexes
+from app.services.lexicon_numpy import numpy_available
+from app.services.puzzle_templates import matches_pattern
+
+DEFAULT_SIZES = [5000, 20000, 50000, 100000, 300000]
+
+# Share of the lexicon per word length, roughly as in real word lists
+LENGTH_SHARE = {3: 0.1, 4: 0.3, 5: 0.6}
+
+# English letter frequencies (percent), so synthetic words have realistic
+# letter distributions per position
+LETTER_WEIGHTS = [
+    8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.15, 0.77, 4.0, 2.4,
+    6.7, 7.5, 1.9, 0.095, 6.0, 6.3, 9.1, 2.8, 0.98, 2.4, 0.15, 2.0, 0.074,
+]
+
+
+def synthetic_lexicon(size: int, seed: int = 0) -> dict[int, set[str]]:
+    """Generate ``size`` distinct random words split across lengths 3-5."""
+    rng = random.Random(seed)
+    words_by_length: dict[int, set[str]] = {}
+    for length, share in LENGTH_SHARE.items():
+        target = min(int(size * share), 26 ** length // 2)
+        words: set[str] = set()
+        while len(words) < target:
+            letters = rng.choices(string.ascii_uppercase, LETTER_WEIGHTS, k=length)
+            words.add("".join(letters))
+        words_by_length[length] = words
+    return words_by_length
+
+
+def make_queries(words_by_length: dict[int, set[str]], count: int, seed: int = 0) -> list:
+    """Random (length, pattern, used_words) lookups."""
+    rng = random.Random(seed)
+    pools = {length: sorted(words) for length, words in words_by_length.items()}
+    queries = []
+    for _ in range(count):
+        length = rng.choice(list(pools))
+        word = rng.choice(pools[length])
+        fixed = rng.sample(range(length), rng.randint(1, min(3, length)))
+        pattern = [word[i] if i in fixed else None for i in range(length)]
+        used = set(rng.sample(pools[length], min(5, len(pools[length]))))
+        queries.append((length, pattern, used))
+    return queries
+
+
+def bench_scan(words_by_length, queries) -> list[int]:
+    return [
+        len([w for w in words_by_length[length] if matches_pattern(w, pattern) and w not in used])
+        for length, pattern, used in queries
+    ]
+
+
+def bench_index(indexes, queries) -> list[int]:
+    counts = []
+    for length, pattern, used in queries:
+        index = indexes[length]
+        used_mask = index.empty
+        for word in used:
+            used_mask = used_mask | index.word_bit(word)
+        counts.append(index.count(index.match(pattern) & ~used_mask))
+    return counts
+
+
+def run(sizes: list[int], query_count: int) -> list[dict]:
+    backends = ["bitset"] + (["numpy"] if numpy_available() else [])
+    results = []
+
+    for size in sizes:
+        words_by_length = synthetic_lexicon(size)
+        total = sum(len(w) for w in words_by_length.values())
+        queries = make_queries(words_by_length, query_count)
+        row = {"size": total, "queries": len(queries)}
+
+        start = time.perf_counter()
+        expected = bench_scan(words_by_length, queries)
+        row["scan_us"] = (time.perf_counter() - start) / len(queries) * 1e6
+
+        for backend in backends:
+            start = time.perf_counter()
+            indexes = build_word_indexes(words_by_length, backend=backend)
+            row[f"{backend}_build_ms"] = (time.perf_counter() - start) * 1e3
+
+            start = time.perf_counter()
+            counts = bench_index(indexes, queries)
+            row[f"{backend}_us"] = (time.perf_counter() - start) / len(queries) * 1e6
+
+            if counts != expected:
+                raise AssertionError(f"{backend} backend disagrees with the linear scan")
+
+        results.append(row)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark fill candidate backends against the linear scan"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Lexicon sizes (total words) to benchmark",
+    )
+    parser.add_argument(
+        "--queries",
+        type=int,
+        default=100,
+        help="Pattern lookups per lexicon size (default: 100)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print results as JSON",
+    )
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.queries)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    if not numpy_available():
+        print("numpy is not installed; skipping the numpy backend")
+
+    print(f"\n{'Words':>8} {'Scan us/q':>11} {'Bitset us/q':>12} {'Bitset build':>13} "
+          f"{'NumPy us/q':>11} {'NumPy build':>12}")
+    for row in results:
+        numpy_us = f"{row['numpy_us']:>11.1f}" if "numpy_us" in row else f"{'-':>11}"
+        numpy_build = f"{row['numpy_build_ms']:>10.0f}ms" if "numpy_build_ms" in row else f"{'-':>12}"
+        print(
+            f"{row['size']:>8} {row['scan_us']:>11.1f} {row['bitset_us']:>12.1f} "
+            f"{row['bitset_build_ms']:>11.0f}ms {numpy_us} {numpy_build}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 """Test configuration and fixtures."""
 
 import json
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from app.config import get_settings
 from app.main import app
 from app.database import Base, get_db
 from app.models import User, Puzzle
+from app.services.puzzle_cache import clear_week_readiness, wait_for_generation_jobs
 from app.utils.security import hash_password
 
 # Create in-memory SQLite database for testing
@@ -22,6 +26,13 @@ engine = create_engine(
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# The in-memory database is one shared connection, so generation locks use
+# files rather than BEGIN IMMEDIATE leases
+get_settings().generation_lock_backend = "file"
+get_settings().generation_lock_dir = tempfile.mkdtemp(prefix="generation-locks-")
+# Keep cached fills out of the developer's real fill cache
+get_settings().fill_cache_dir = tempfile.mkdtemp(prefix="fill-cache-")
+
 
 def override_get_db():
     """Override database dependency for testing."""
@@ -38,12 +49,15 @@ app.dependency_overrides[get_db] = override_get_db
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
+    clear_week_readiness()
     Base.metadata.create_all(bind=engine)
     db = TestingSessionLocal()
     try:
         yield db
     finally:
         db.close()
+        # Background generation started by a request must not outlive the test
+        wait_for_generation_jobs()
         Base.metadata.drop_all(bind=engine)
 
 
@@ -0,0 +1,181 @@
+"""Tests for the clue database and its compact store."""
+
+import os
+import random
+
+import pytest
+
+from app.services import clue_database
+from app.services.clue_database import (
+    ClueDatabase,
+    clue_chunk_ranges,
+    clues_file_source,
+    parse_clues_file,
+    parse_clues_file_parallel,
+)
+from app.services.clue_index import load_clue_index, write_clue_index
+from app.services.clue_store import ClueStoreBuilder
+
+CLUES_TSV = """pubid\tyear\tanswer\tclue
+nyt\t2001\tpeace\tTranquility
+nyt\t2002\tHello\tGreeting
+lat\t2003\thello\tWord of welcome
+nyt\t2004\tPEACE\tTranquility
+wsj\t2005\tcafé\tNot ASCII letters only? Still alpha
+nyt\t2006\tabcdefg\tToo long for a mini
+nyt\t2007\tox\tToo short
+nyt\t2008\tyes\t
+nyt\t2009\tyes\tAffirmative
+"""
+
+
+@pytest.fixture
+def clue_db(tmp_path, monkeypatch):
+    """A ClueDatabase loaded from a small TSV."""
+    path = tmp_path / "clues.tsv"
+    path.write_text(CLUES_TSV, encoding="utf-8")
+    monkeypatch.setattr(clue_database, "CLUES_FILE", path)
+    monkeypatch.setattr(clue_database, "CLUE_INDEX_FILE", tmp_path / "clues.idx")
+    db = ClueDatabase()
+    assert db.load()
+    return db
+
+
+class TestClueStore:
+    """Tests for the packed clue representation."""
+
+    def test_dedups_texts_and_keeps_order(self):
+        """Identical texts are stored once; each answer keeps its clues in order."""
+        builder = ClueStoreBuilder()
+        builder.add("HELLO", "Greeting")
+        builder.add("PEACE", "Calm")
+        builder.add("HELLO", "Hi there")
+        builder.add("HELLO", "Greeting")
+        store = builder.build()
+
+        assert list(store) == ["HELLO", "PEACE"]
+        assert store.clues("HELLO") == ["Greeting", "Hi there", "Greeting"]
+        assert store.total_clues == 4
+        assert store.distinct_clues == 3
+        assert store.clues("NOPE") == []
+        assert store.choice("NOPE") is None
+
+    def test_choice_matches_list_choice(self):
+        """Seeded draws pick the same clue as choosing from a plain list."""
+        builder = ClueStoreBuilder()
+        texts = [f"Clue {i} é" for i in range(20)]
+        for text in texts:
+            builder.add("WORD", text)
+        store = builder.build()
+
+        for seed in range(10):
+            assert store.choice("WORD", random.Random(seed)) == random.Random(seed).choice(texts)
+
+
+class TestClueDatabase:
+    """Tests for loading and querying clues."""
+
+    def test_load_filters_rows(self, clue_db):
+        """Only 3-5 letter alphabetic answers with a clue are kept."""
+        assert clue_db.get_all_clues("peace") == ["Tranquility", "Tranquility"]
+        assert clue_db.get_all_clues("HELLO") == ["Greeting", "Word of welcome"]
+        assert clue_db.get_all_clues("YES") == ["Affirmative"]
+        assert not clue_db.has_clue("ABCDEFG")
+        assert not clue_db.has_clue("OX")
+
+    def test_get_clue(self, clue_db):
+        """A clue is drawn from the answer's clues."""
+        assert clue_db.get_clue("hello", random.Random(1)) in {"Greeting", "Word of welcome"}
+        assert clue_db.get_clue("MISSING") is None
+
+    def test_words_and_stats(self, clue_db):
+        """Words by length and totals reflect the loaded rows."""
+        assert clue_db.get_words_with_clues(5) == ("HELLO", "PEACE")
+        assert clue_db.get_words_with_clues(7) == ()
+        assert clue_db.stats() == {
+            "total_words": 4,
+            "total_clues": 6,
+            "by_length": {4: 1, 5: 2, 3: 1},
+        }
+
+
+class TestParallelParsing:
+    """Tests for parsing a clue TSV in chunks across processes."""
+
+    @pytest.fixture
+    def tsv(self, tmp_path):
+        path = tmp_path / "clues.tsv"
+        rows = [f"src\t2000\tw{chr(97 + i % 26)}{chr(97 + i % 7)}\tClue {i % 40}" for i in range(500)]
+        path.write_text(CLUES_TSV + "\n".join(rows) + "\n", encoding="utf-8")
+        return path
+
+    def test_chunks_split_at_lines(self, tsv):
+        """Ranges are contiguous, skip the header and end on newlines."""
+        data = tsv.read_bytes()
+        ranges = clue_chunk_ranges(tsv, chunk_bytes=100)
+        assert len(ranges) > 1
+        assert ranges[0][0] == data.index(b"\n") + 1
+        assert ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start
+            assert data[end - 1:end] == b"\n"
+
+    def test_same_store_as_serial(self, tsv):
+        """Merging the chunks gives exactly the serially parsed store."""
+        serial = parse_clues_file(tsv)
+        parallel = parse_clues_file_parallel(tsv, workers=2, chunk_bytes=256)
+        assert parallel.rows == serial.rows
+        assert parallel.count == serial.count
+
+        expected, store = serial.build(), parallel.build()
+        assert list(store) == list(expected)
+        assert bytes(store.clue_blob) == bytes(expected.clue_blob)
+        assert list(store.clue_ids) == list(expected.clue_ids)
+
+
+class TestClueIndex:
+    """Tests for the compiled, memory-mapped clue index."""
+
+    @pytest.fixture
+    def tsv(self, tmp_path, monkeypatch):
+        path = tmp_path / "clues.tsv"
+        path.write_text(CLUES_TSV, encoding="utf-8")
+        monkeypatch.setattr(clue_database, "CLUES_FILE", path)
+        monkeypatch.setattr(clue_database, "CLUE_INDEX_FILE", tmp_path / "clues.idx")
+        return path
+
+    def test_round_trip(self, tsv, tmp_path):
+        """A mapped index answers exactly like the store it was built from."""
+        store = parse_clues_file(tsv).build()
+        path = str(tmp_path / "clues.idx")
+        write_clue_index(store, path, source="test")
+        mapped = load_clue_index(path)
+
+        assert list(mapped) == list(store)
+        assert mapped.total_clues == store.total_clues
+        for answer in store:
+            assert answer in mapped
+            assert mapped.clues(answer) == store.clues(answer)
+            assert mapped.choice(answer, random.Random(3)) == store.choice(answer, random.Random(3))
+        assert "ZZZ" not in mapped
+        assert mapped.clues("ZZZ") == []
+
+    def test_database_uses_fresh_index(self, tsv):
+        """ClueDatabase maps an index built from the current TSV."""
+        store = parse_clues_file(tsv).build()
+        write_clue_index(store, str(clue_database.CLUE_INDEX_FILE), source=clues_file_source(tsv))
+
+        db = ClueDatabase()
+        assert db.load()
+        assert not isinstance(db.clues.clue_blob, bytes)
+        assert db.get_all_clues("HELLO") == ["Greeting", "Word of welcome"]
+
+    def test_database_ignores_stale_index(self, tsv):
+        """An index built from an older TSV is not used."""
+        store = parse_clues_file(tsv).build()
+        write_clue_index(store, str(clue_database.CLUE_INDEX_FILE), source="tsv:0:0")
+        os.utime(tsv)
+
+        db = ClueDatabase()
+        assert db.load()
+        assert isinstance(db.clues.clue_blob, bytes)
@@ -0,0 +1,190 @@
+"""Tests for the cross-worker generation lock."""
+
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.config import get_settings
+from app.database import Base
+from app.models import GenerationLease, PuzzleCacheMeta
+from app.services import puzzle_cache
+from app.services.generation_lock import (
+    AdvisoryLock,
+    FileLock,
+    GenerationLock,
+    LeaseLock,
+    get_generation_lock,
+)
+from app.services.puzzle_cache import PUZZLE_COUNT, ensure_weekly_cache, get_week_dates
+
+WEEK = "2026-W30"
+
+
+@pytest.fixture
+def file_lock(tmp_path):
+    """A file lock in a private directory."""
+    return FileLock(engine=None, directory=str(tmp_path))
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """A file-backed SQLite database, so connections are really separate."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'locks.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+class TestFileLock:
+    """Tests for the flock backend and waiting."""
+
+    def test_exclusive_until_released(self, file_lock):
+        """A held key can't be taken again; other keys can."""
+        assert file_lock.try_acquire(WEEK)
+        assert not file_lock.try_acquire(WEEK)
+        assert file_lock.try_acquire("2026-W31")
+
+        file_lock.release(WEEK)
+        assert file_lock.try_acquire(WEEK)
+
+    def test_acquire_times_out(self, file_lock):
+        """A waiter gives up after its timeout."""
+        file_lock.try_acquire(WEEK)
+        start = time.monotonic()
+        assert not file_lock.acquire(WEEK, timeout=0.2)
+        assert time.monotonic() - start >= 0.2
+
+    def test_waiter_wakes_on_release(self, file_lock):
+        """A waiter gets the lock as soon as the holder releases it."""
+        file_lock.try_acquire(WEEK)
+        threading.Timer(0.1, file_lock.release, args=(WEEK,)).start()
+
+        start = time.monotonic()
+        assert file_lock.acquire(WEEK, timeout=5)
+        assert time.monotonic() - start < 1
+
+
+class TestLeaseLock:
+    """Tests for the SQLite lease backend."""
+
+    def test_exclusive_until_released(self, sqlite_engine):
+        """Workers with their own lock objects exclude each other."""
+        first, second = LeaseLock(sqlite_engine), LeaseLock(sqlite_engine)
+        assert first.try_acquire(WEEK)
+        assert not second.try_acquire(WEEK)
+
+        first.release(WEEK)
+        assert second.try_acquire(WEEK)
+
+    def test_stale_lease_taken_over(self, sqlite_engine):
+        """A lease without heartbeats is recovered after the stale timeout."""
+        crashed, waiter = LeaseLock(sqlite_engine), LeaseLock(sqlite_engine, stale_seconds=0.2)
+        assert crashed.try_acquire(WEEK)
+        assert not waiter.try_acquire(WEEK)
+        assert waiter.acquire(WEEK, timeout=2)
+
+        # The old holder's release doesn't free the new holder's lease
+        crashed.release(WEEK)
+        assert not LeaseLock(sqlite_engine).try_acquire(WEEK)
+
+    def test_heartbeats_keep_lease(self, sqlite_engine):
+        """A holder that sends heartbeats is never considered stale."""
+        holder, waiter = LeaseLock(sqlite_engine), LeaseLock(sqlite_engine, stale_seconds=0.3)
+        assert holder.try_acquire(WEEK)
+        with holder.heartbeats(WEEK, interval=0.05):
+            assert not waiter.acquire(WEEK, timeout=0.6)
+        holder.release(WEEK)
+
+        with sqlite_engine.connect() as conn:
+            assert conn.execute(GenerationLease.__table__.select()).first() is None
+
+
+class TestLockSelection:
+    """Tests for choosing the backend."""
+
+    def test_auto_backend(self, monkeypatch, sqlite_engine):
+        """auto uses leases on SQLite; the lock is shared per engine."""
+        monkeypatch.setattr(get_settings(), "generation_lock_backend", "auto")
+        lock = get_generation_lock(sqlite_engine)
+        assert isinstance(lock, LeaseLock)
+        assert get_generation_lock(sqlite_engine) is lock
+
+    def test_advisory_lock_id(self):
+        """Advisory lock ids are stable signed 64-bit integers."""
+        lock_id = AdvisoryLock.lock_id(WEEK)
+        assert lock_id == AdvisoryLock.lock_id(WEEK)
+        assert -2**63 <= lock_id < 2**63
+        assert lock_id != AdvisoryLock.lock_id("2026-W31")
+
+    def test_incomplete_backend_rejected(self):
+        """A backend missing try_acquire or _release can't be instantiated."""
+
+        class Incomplete(GenerationLock):
+            def try_acquire(self, key):
+                return True
+
+        with pytest.raises(TypeError):
+            Incomplete(engine=None)
+
+
+class TestWeeklyCacheLocking:
+    """Tests for generating a week under the lock."""
+
+    @pytest.fixture
+    def generator(self, monkeypatch):
+        """Fake generator counting its calls."""
+        calls = []
+
+        def generate(db, n=PUZZLE_COUNT, week_key=None, in_subprocess=False, days=None):
+            calls.append(week_key)
+            return [
+                {
+                    "title": "Daily Puzzle",
+                    "size": 5,
+                    "difficulty": "medium",
+                    "grid": [[" "] * 5 for _ in range(5)],
+                    "solution": [["A"] * 5 for _ in range(5)],
+                    "clues_across": [],
+                    "clues_down": [],
+                    "scheduled_date": day,
+                }
+                for day in get_week_dates(week_key)[:n]
+            ]
+
+        monkeypatch.setattr(puzzle_cache, "generate_puzzle_set", generate)
+        return calls
+
+    def test_locked_week_is_skipped(self, db, generator):
+        """Without waiting, a week locked by another worker is left alone."""
+        lock = get_generation_lock(db.get_bind())
+        assert lock.try_acquire(WEEK)
+        try:
+            ensure_weekly_cache(db, WEEK)
+        finally:
+            lock.release(WEEK)
+        assert generator == []
+
+        ensure_weekly_cache(db, WEEK)
+        assert generator == [WEEK]
+
+    def test_waiter_sees_finished_week(self, db, generator, monkeypatch):
+        """A waiter whose lock holder finished the week doesn't generate it again."""
+        lock = get_generation_lock(db.get_bind())
+        assert lock.try_acquire(WEEK)
+        db.add(PuzzleCacheMeta(week_key=WEEK, status="done", puzzle_count=PUZZLE_COUNT))
+        db.commit()
+        threading.Timer(0.1, lock.release, args=(WEEK,)).start()
+
+        # The first check answers as if it ran before the holder finished
+        week_pending = puzzle_cache._week_pending
+        answers = [True]
+        monkeypatch.setattr(
+            puzzle_cache, "_week_pending",
+            lambda db_, week_key: answers.pop() if answers else week_pending(db_, week_key),
+        )
+        ensure_weekly_cache(db, WEEK, wait=5)
+
+        assert generator == []
+        assert puzzle_cache.is_week_ready(WEEK)
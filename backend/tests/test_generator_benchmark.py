@@ -0,0 +1,92 @@
+"""Generator benchmark.
+
+Runs a small benchmark of every pattern. Set GENERATOR_BENCH_OUTPUT to save
+the JSON report, and GENERATOR_BENCH_BASELINE to a saved report to fail on
+regressions in success rate or search effort.
+"""
+
+import json
+import os
+
+import pytest
+
+from app.services.generator_bench import (
+    compare_reports,
+    percentile,
+    run_benchmark,
+    sample_lexicon,
+)
+from app.services.puzzle_templates import PATTERNS, get_lexicon
+
+# How much more search than the baseline is tolerated before failing
+MAX_NODES_RATIO = 1.5
+
+
+@pytest.fixture(scope="module")
+def report():
+    """A 3-seed benchmark of every pattern on the full lexicon."""
+    return run_benchmark(get_lexicon(), seeds=3)
+
+
+class TestBenchmarkHelpers:
+    """Tests for the benchmark's statistics."""
+
+    def test_percentile(self):
+        """Nearest-rank percentiles."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+        assert percentile([7], 99) == 7
+        assert percentile([], 50) == 0
+
+    def test_sample_lexicon(self):
+        """Sampling keeps roughly the requested size and each length's share."""
+        lexicon = get_lexicon()
+        sample = sample_lexicon(lexicon, 1000)
+        assert abs(len(sample) - 1000) <= len(lexicon.lengths)
+        assert set(sample.lengths) >= {3, 4, 5}
+        assert sample_lexicon(lexicon, None) is lexicon
+
+    def test_compare_reports(self):
+        """Ratios are current over baseline per (lexicon size, pattern)."""
+        row = {
+            "lexicon_size": 100, "pattern": 1, "success_rate": 1.0,
+            "fill_ms": {"p50": 2.0, "p95": 4.0}, "nodes": {"mean": 30},
+        }
+        base = {**row, "success_rate": 0.5, "fill_ms": {"p50": 1.0, "p95": 4.0}, "nodes": {"mean": 0}}
+        [change] = compare_reports({"results": [row]}, {"results": [base]})
+        assert change["success_rate"] == 0.5
+        assert change["fill_ms_p50"] == 2.0
+        assert change["fill_ms_p95"] == 1.0
+        assert change["nodes_mean"] is None
+
+
+class TestGeneratorBenchmark:
+    """Benchmark every pattern and check against an optional baseline."""
+
+    def test_every_pattern_fills(self, report):
+        """All patterns fill for all seeds on the full lexicon."""
+        assert len(report["results"]) == len(PATTERNS)
+        for row in report["results"]:
+            assert row["success_rate"] == 1.0, row
+            assert row["fill_ms"]["p50"] <= row["fill_ms"]["p95"] <= row["fill_ms"]["p99"]
+            assert row["candidates"]["mean"] >= row["nodes"]["mean"]
+
+        output = os.environ.get("GENERATOR_BENCH_OUTPUT")
+        if output:
+            with open(output, "w") as f:
+                json.dump(report, f, indent=2)
+
+    def test_no_regression_against_baseline(self, report):
+        """Success rate and search effort don't regress from the baseline."""
+        path = os.environ.get("GENERATOR_BENCH_BASELINE")
+        if not path:
+            pytest.skip("GENERATOR_BENCH_BASELINE not set")
+
+        with open(path) as f:
+            baseline = json.load(f)
+        for change in compare_reports(report, baseline):
+            assert change["success_rate"] >= 0, change
+            if change["nodes_mean"] is not None:
+                assert change["nodes_mean"] <= MAX_NODES_RATIO, change
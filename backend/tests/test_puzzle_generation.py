@@ -0,0 +1,624 @@
+"""Tests for the puzzle generator and its fill engine."""
+
+import os
+import pickle
+import random
+import time
+
+import pytest
+
+from app.config import get_settings
+from app.models import DictionaryWord
+from app.services.deadline import Deadline
+from app.services.dictionary_loader import load_dictionary, load_dictionary_file, parse_word_lines
+from app.services.fill_cache import FillCache, fill_cache_key
+from app.services.fill_engine import FillSolver, FillStats
+from app.services.lexicon import Lexicon, WordIndex, build_word_indexes
+from app.services.lexicon_file import load_lexicon_file, write_lexicon_file
+from app.services.patterns import compile_pattern
+from app.services.puzzle_templates import (
+    COMPILED_PATTERNS,
+    PATTERNS,
+    derive_seed,
+    extract_all_runs,
+    extract_word_slots,
+    fill_puzzle_with_backtracking,
+    generate_puzzle_batches,
+    generate_validated_puzzle,
+    generate_weekly_puzzles,
+    get_dictionary_source,
+    get_lexicon,
+    load_dictionary_words,
+    load_dictionary_words_from_db,
+    matches_pattern,
+    validate_filled_grid,
+    validate_pattern,
+)
+
+
+@pytest.fixture(scope="module")
+def words_by_length():
+    """The generator's built-in word list."""
+    return load_dictionary_words(None)
+
+
+class TestWordIndex:
+    """Tests for the positional letter index."""
+
+    def test_match_agrees_with_linear_scan(self, words_by_length):
+        """Index lookups return exactly what matches_pattern would."""
+        index = WordIndex(5, words_by_length[5])
+        for pattern in (
+            [None] * 5,
+            ["S", None, None, None, None],
+            [None, "A", None, None, "E"],
+            ["Q", "Z", None, None, None],
+        ):
+            expected = sorted(w for w in words_by_length[5] if matches_pattern(w, pattern))
+            assert index.words_for(index.match(pattern)) == expected
+
+    def test_exclude_mask(self):
+        """Excluded words are removed from the candidate list."""
+        index = WordIndex(3, ["CAT", "COT", "CUT", "DOG"])
+        used = index.word_bit("COT")
+        assert index.candidates(["C", None, "T"], exclude=used) == ["CAT", "CUT"]
+        assert "DOG" in index
+        assert index.word_bit("XYZ") == 0
+
+    def test_build_word_indexes(self, words_by_length):
+        """One index is built per word length."""
+        indexes = build_word_indexes(words_by_length)
+        assert set(indexes) == set(words_by_length)
+        assert len(indexes[4]) == len(words_by_length[4])
+
+
+class TestLexicon:
+    """Tests for the shared, immutable lexicon."""
+
+    def test_lexicon_is_shared(self):
+        """get_lexicon returns the same instance and indexes every time."""
+        lexicon = get_lexicon()
+        assert get_lexicon() is lexicon
+        assert lexicon.indexes() is lexicon.indexes()
+
+    def test_lexicon_is_read_only(self, words_by_length):
+        """The word lists cannot be modified once built."""
+        lexicon = Lexicon(words_by_length)
+        with pytest.raises(TypeError):
+            lexicon.words_by_length[3] = frozenset()
+        with pytest.raises(AttributeError):
+            lexicon.words_by_length[3].add("ZZZ")
+        assert lexicon.words(3) == tuple(sorted(words_by_length[3]))
+
+    def test_version_depends_only_on_words(self, words_by_length):
+        """The version is stable across builds and changes with the words."""
+        assert Lexicon(words_by_length).version == Lexicon(words_by_length, source="db").version
+        changed = {**words_by_length, 3: words_by_length[3] | {"ZZZ"}}
+        assert Lexicon(changed).version != Lexicon(words_by_length).version
+
+    def test_generate_with_lexicon(self, words_by_length):
+        """The generator accepts an explicit lexicon."""
+        lexicon = Lexicon(words_by_length)
+        puzzle = generate_validated_puzzle(None, pattern_idx=8, seed=1, lexicon=lexicon)
+        assert puzzle is not None
+        for row in puzzle["solution"]:
+            assert len(row) == 5
+
+
+class TestLexiconFile:
+    """Tests for compiled, memory-mapped lexicon files."""
+
+    @pytest.fixture
+    def letters_lexicon(self, words_by_length):
+        """The built-in lexicon without words that aren't plain A-Z."""
+        words = {
+            length: {w for w in group if w.isalpha()}
+            for length, group in words_by_length.items()
+        }
+        return Lexicon(words, clued_words=["CAT"], source="test")
+
+    def test_round_trip(self, letters_lexicon, tmp_path):
+        """A mapped lexicon has the same words, version and indexes."""
+        path = tmp_path / "lexicon.bin"
+        write_lexicon_file(letters_lexicon, str(path))
+        mapped = load_lexicon_file(str(path))
+
+        assert mapped.version == letters_lexicon.version
+        assert mapped.path == str(path)
+        assert mapped.clued_words == frozenset({"CAT"})
+        for length in letters_lexicon.lengths:
+            assert list(mapped.words(length)) == list(letters_lexicon.words(length))
+        assert "CAT" in mapped and "QQQ" not in mapped
+
+        index, mapped_index = letters_lexicon.indexes()[5], mapped.indexes()[5]
+        pattern = ["S", None, None, None, "E"]
+        assert mapped_index.candidates(pattern) == index.candidates(pattern)
+        assert mapped_index.word_bit("HOUSE") == index.word_bit("HOUSE")
+
+    def test_non_letter_words_are_dropped(self, words_by_length, tmp_path):
+        """Words with punctuation are left out and the version follows."""
+        lexicon = Lexicon({**words_by_length, 6: {"HASN'T", "PLANET"}})
+        path = tmp_path / "lexicon.bin"
+        write_lexicon_file(lexicon, str(path))
+        mapped = load_lexicon_file(str(path))
+        assert list(mapped.words(6)) == ["PLANET"]
+        assert mapped.version != lexicon.version
+
+    def test_generation_matches(self, letters_lexicon, tmp_path):
+        """A seeded fill is the same from the file as from memory."""
+        path = tmp_path / "lexicon.bin"
+        write_lexicon_file(letters_lexicon, str(path))
+        mapped = load_lexicon_file(str(path))
+
+        expected = generate_validated_puzzle(None, pattern_idx=3, seed=5, lexicon=letters_lexicon, use_cache=False)
+        puzzle = generate_validated_puzzle(None, pattern_idx=3, seed=5, lexicon=mapped, use_cache=False)
+        assert puzzle["solution"] == expected["solution"]
+
+    def test_pickle_reopens_file(self, letters_lexicon, tmp_path):
+        """Pickling a mapped lexicon sends its path, not its words."""
+        path = tmp_path / "lexicon.bin"
+        write_lexicon_file(letters_lexicon, str(path))
+        mapped = load_lexicon_file(str(path))
+        data = pickle.dumps(mapped)
+        assert len(data) < 1000
+        assert pickle.loads(data).version == mapped.version
+
+    def test_get_lexicon_uses_file(self, letters_lexicon, tmp_path, monkeypatch):
+        """LEXICON_FILE makes get_lexicon map the file."""
+        path = tmp_path / "lexicon.bin"
+        write_lexicon_file(letters_lexicon, str(path))
+        monkeypatch.setattr(get_settings(), "lexicon_file", str(path))
+
+        lexicon = get_lexicon()
+        assert lexicon.path == str(path)
+        assert lexicon.version == letters_lexicon.version
+        assert get_lexicon() is lexicon
+
+    def test_rejects_other_files(self, tmp_path):
+        """Files without the lexicon header are refused."""
+        path = tmp_path / "words.txt"
+        path.write_bytes(b"not a lexicon file at all, just some words")
+        with pytest.raises(ValueError):
+            load_lexicon_file(str(path))
+
+
+class TestDatabaseLexicon:
+    """Tests for sourcing the lexicon from the dictionary table."""
+
+    @pytest.fixture
+    def dictionary(self, db):
+        """A small dictionary table with frequency scores."""
+        rows = [
+            ("cat", 10), ("dog", 5), ("emu", 0), ("x-y", 9),
+            ("bear", 7), ("lion", 1), ("horse", 3), ("ox", 50),
+        ]
+        db.add_all(DictionaryWord(word=w, length=len(w), frequency=f) for w, f in rows)
+        db.commit()
+        return db
+
+    @pytest.fixture
+    def database_source(self, monkeypatch):
+        """Switch the generator to the database lexicon for one test."""
+        monkeypatch.setattr(get_settings(), "lexicon_source", "database")
+        return get_settings()
+
+    def test_load_by_length(self, dictionary):
+        """Words are loaded per puzzle length, uppercased, letters only."""
+        words = load_dictionary_words_from_db(dictionary)
+        assert sorted(words) == [3, 4, 5]
+        assert sorted(words[3]) == ["CAT", "DOG", "EMU"]
+        assert sorted(words[4]) == ["BEAR", "LION"]
+        assert words[5] == ["HORSE"]
+
+    def test_frequency_filters(self, dictionary):
+        """Low-frequency words are dropped and the limit keeps the most frequent."""
+        words = load_dictionary_words_from_db(dictionary, min_frequency=5)
+        assert sorted(words[3]) == ["CAT", "DOG"]
+        assert words[5] == []
+
+        words = load_dictionary_words_from_db(dictionary, lengths=[3, 4], limit_per_length=1)
+        assert words == {3: ["CAT"], 4: ["BEAR"]}
+
+    def test_lexicon_from_database(self, dictionary, database_source):
+        """get_lexicon builds from the table and rebuilds when it changes."""
+        lexicon = get_lexicon(dictionary)
+        assert lexicon.source.startswith("db:")
+        assert lexicon.words(3) == ("CAT", "DOG", "EMU")
+        assert get_lexicon(dictionary) is lexicon
+
+        dictionary.add(DictionaryWord(word="gnu", length=3, frequency=2))
+        dictionary.commit()
+        rebuilt = get_lexicon(dictionary)
+        assert rebuilt is not lexicon
+        assert "GNU" in rebuilt
+
+    def test_empty_table_falls_back_to_builtin(self, db, database_source):
+        """An empty dictionary table leaves the built-in word lists in use."""
+        assert get_dictionary_source(db).startswith("builtin:")
+        assert len(load_dictionary_words(db)[3]) > 100
+
+
+class TestDictionaryLoader:
+    """Tests for bulk loading word lists into the dictionary table."""
+
+    def test_parse_word_lines(self):
+        """Lines are uppercased and filtered; a second column is the frequency."""
+        lines = ["cat\n", "  \n", "Dog 12\n", "x-ray\n", "ox\n", "elephants\n", "émeu\n", "bear\tnope\n"]
+        assert list(parse_word_lines(lines)) == [("CAT", 0), ("DOG", 12), ("BEAR", 0)]
+
+    def test_load_dictionary(self, db):
+        """Words are inserted once, in batches, and reloading adds nothing."""
+        lines = ["cat 3", "dog", "cat 9", "bear", "lion", "horse 4"]
+        result = load_dictionary(db, lines, batch_size=2)
+        assert result["accepted"] == 6
+        assert result["inserted"] == 5
+
+        rows = {w.word: (w.length, w.frequency) for w in db.query(DictionaryWord)}
+        assert rows["CAT"] == (3, 3)
+        assert rows["HORSE"] == (5, 4)
+
+        again = load_dictionary(db, lines + ["gnu"])
+        assert again["inserted"] == 1
+        assert db.query(DictionaryWord).count() == 6
+
+    def test_load_dictionary_file(self, db, tmp_path):
+        """A word list file loads through the same pipeline."""
+        path = tmp_path / "words.txt"
+        path.write_text("apple\nmango\nkiwi\n")
+        assert load_dictionary_file(db, str(path))["inserted"] == 3
+
+
+class TestReproducibility:
+    """Tests for seeded, isolated generation."""
+
+    def test_same_seed_same_puzzle(self):
+        """A seed fully determines the puzzle, whatever the global RNG does."""
+        random.seed(1)
+        first = generate_validated_puzzle(None, seed=99)
+        random.seed(2)
+        second = generate_validated_puzzle(None, seed=99)
+        assert first == second
+
+    def test_global_rng_untouched(self):
+        """Generation neither seeds nor consumes the global RNG."""
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        generate_validated_puzzle(None, pattern_idx=3, seed=7)
+        assert random.random() == expected
+
+    def test_days_match_full_week(self):
+        """Generating some days of a week gives those days of the full week."""
+        week = generate_weekly_puzzles(None, count=7, week_seed=42)
+        days = generate_weekly_puzzles(None, count=2, week_seed=42, days=[3, 6])
+        assert [p["solution"] for p in days] == [week[3]["solution"], week[6]["solution"]]
+
+    def test_derive_seed_is_stable(self):
+        """Derived seeds are fixed values, not per-process hashes."""
+        assert derive_seed("week", "2026-W03") == 3730864397323985955
+        assert derive_seed("week", "2026-W03") != derive_seed("week", "2026-W04")
+
+
+class TestCompiledPatterns:
+    """Tests for precompiled pattern geometry."""
+
+    def test_matches_slot_extraction(self):
+        """Compiled slots are exactly what extract_word_slots returns."""
+        for pattern, compiled in zip(PATTERNS, COMPILED_PATTERNS):
+            assert [slot.as_dict() for slot in compiled.slots] == extract_word_slots(pattern)
+            assert compiled.is_valid
+
+    def test_crossing_map(self):
+        """Every crossing is recorded in both slots at the shared cell."""
+        compiled = COMPILED_PATTERNS[0]
+        for slot in compiled.slots:
+            for p, j, q in slot.crossings:
+                other = compiled.slots[j]
+                assert slot.cells[p] == other.cells[q]
+                assert (q, slot.index, p) in other.crossings
+        # Open 5x5: each across word crosses all five down words
+        assert all(len(slot.crossings) == 5 for slot in compiled.slots)
+
+    def test_filled_grid_shares_compiled_pattern(self):
+        """Geometry depends only on black squares, so fills reuse it."""
+        pattern = [list(row) for row in ["#...#", ".....", ".....", ".....", "#...#"]]
+        filled = [list(row) for row in ["#CAT#", "ABCDE", "FGHIJ", "KLMNO", "#DOG#"]]
+        assert compile_pattern(pattern) is compile_pattern(filled)
+        assert extract_all_runs(filled)[0] == ("CAT", "across", 0, 1, 3)
+
+    def test_invalid_patterns(self):
+        """Short runs and disconnected regions are rejected."""
+        two_letter = [list(row) for row in ["..#..", ".....", ".....", ".....", "....."]]
+        assert validate_pattern(two_letter) == (False, "2-letter horizontal run at row 0, col 0")
+        split = [list(row) for row in ["...#...", "...#...", "...#...", "#######",
+                                       "...#...", "...#...", "...#..."]]
+        assert validate_pattern(split) == (False, "Disconnected white regions in pattern")
+
+
+class TestDeadlines:
+    """Tests for wall-clock budgets."""
+
+    def test_expired_deadline_fails_cleanly(self, words_by_length):
+        """A fill with no time left returns None without searching."""
+        indexes = build_word_indexes(words_by_length)
+        pattern = PATTERNS[1]
+        solver = FillSolver(pattern, extract_word_slots(pattern), indexes, deadline=0)
+        assert solver.solve() is None
+        assert solver.timed_out
+        assert solver.stats.timeouts == 1 and solver.stats.nodes == 0
+
+    def test_deadline_stops_long_search(self, words_by_length):
+        """A search that would run for seconds stops near its deadline."""
+        indexes = build_word_indexes(words_by_length)
+        pattern = PATTERNS[0]
+        solver = FillSolver(
+            pattern, extract_word_slots(pattern), indexes,
+            propagation="none", max_attempts=None, rng=random.Random(0), deadline=0.05,
+        )
+        start = time.monotonic()
+        assert solver.solve() is None
+        assert time.monotonic() - start < 0.5
+        assert solver.timed_out
+        assert 0 < solver.best_depth < len(solver.slots)
+        assert sum(cell.isalpha() for row in solver.best_solution for cell in row) > 0
+
+    def test_weekly_budget(self):
+        """A batch with no budget left returns no puzzles instead of hanging."""
+        assert generate_weekly_puzzles(None, count=3, week_seed=5, time_budget=0) == []
+
+    def test_share_splits_remaining_time(self):
+        """Shares get a fraction of what is left and report into the parent."""
+        deadline = Deadline(10)
+        share = deadline.share(4)
+        assert 2 < share.budget <= 2.5
+        with share.phase("fill"):
+            pass
+        assert "fill" in deadline.report()["phases_s"]
+        assert Deadline(None).share(3).unlimited
+
+
+class TestFillCache:
+    """Tests for the content-addressed fill cache."""
+
+    def test_round_trip(self, tmp_path):
+        """A stored solution is returned for the same key only."""
+        cache = FillCache(str(tmp_path), max_bytes=1024 * 1024)
+        key = fill_cache_key(PATTERNS[0], "v1", 42)
+        assert cache.get(key) is None
+        cache.put(key, [["A", "B"], ["C", "D"]])
+        assert cache.get(key) == [["A", "B"], ["C", "D"]]
+        assert cache.stats()["entries"] == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_key_covers_every_input(self):
+        """Changing pattern, lexicon, seed or engine version changes the key."""
+        base = fill_cache_key(PATTERNS[0], "v1", 42, engine_version=1)
+        assert fill_cache_key(PATTERNS[1], "v1", 42, engine_version=1) != base
+        assert fill_cache_key(PATTERNS[0], "v2", 42, engine_version=1) != base
+        assert fill_cache_key(PATTERNS[0], "v1", 43, engine_version=1) != base
+        assert fill_cache_key(PATTERNS[0], "v1", 42, engine_version=2) != base
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Going over the size limit evicts the oldest entries first."""
+        cache = FillCache(str(tmp_path), max_bytes=10 * 1024 * 1024)
+        keys = [fill_cache_key(PATTERNS[0], "v1", seed) for seed in range(5)]
+        for i, key in enumerate(keys):
+            cache.put(key, [["X"] * 5] * 5)
+            path = tmp_path / key[:2] / f"{key}.json"
+            os.utime(path, (1000 + i, 1000 + i))
+
+        entry_size = cache.stats()["bytes"] // 5
+        assert cache.prune(entry_size * 2) == 3
+        assert [cache.get(key) is not None for key in keys] == [False, False, False, True, True]
+        assert cache.clear() == 2
+
+    def test_overwrite_counts_size_once(self, tmp_path):
+        """Storing a key again replaces its size instead of adding to it."""
+        cache = FillCache(str(tmp_path), max_bytes=1024 * 1024)
+        key = fill_cache_key(PATTERNS[0], "v1", 42)
+        cache.put(fill_cache_key(PATTERNS[0], "v1", 41), [["A"]])
+        for _ in range(3):
+            cache.put(key, [["X"] * 5] * 5)
+        assert cache._size == cache.stats()["bytes"]
+
+    def test_failed_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        """A write that fails is logged and its temp file removed."""
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        cache = FillCache(str(tmp_path), max_bytes=1024 * 1024)
+        monkeypatch.setattr(os, "replace", fail)
+        cache.put(fill_cache_key(PATTERNS[0], "v1", 42), [["A"]])
+        assert list(tmp_path.rglob("*.tmp")) == []
+        assert cache.stats()["entries"] == 0
+
+    def test_generation_uses_cache(self, tmp_path, monkeypatch):
+        """A seeded puzzle is filled once and then served from the cache."""
+        import app.services.puzzle_templates as templates
+
+        cache = FillCache(str(tmp_path), max_bytes=1024 * 1024)
+        monkeypatch.setattr(templates, "get_fill_cache", lambda: cache)
+        first = generate_validated_puzzle(None, pattern_idx=2, seed=11)
+        second = generate_validated_puzzle(None, pattern_idx=2, seed=11)
+        assert first == second
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestParallelGeneration:
+    """Tests for generating puzzles in a process pool."""
+
+    def test_lexicon_pickles_words_only(self, words_by_length):
+        """A pickled lexicon keeps its words and version but not its indexes."""
+        lexicon = Lexicon(words_by_length, clued_words=["CAT"], source="test")
+        lexicon.indexes()
+        copy = pickle.loads(pickle.dumps(lexicon))
+        assert copy.version == lexicon.version
+        assert copy.source == "test" and copy.clued_words == lexicon.clued_words
+        assert copy.words(5) == lexicon.words(5)
+
+    def test_parallel_matches_sequential(self):
+        """Workers return the same puzzles, in day order, as the in-process path."""
+        sequential = generate_weekly_puzzles(None, count=3, week_seed=42)
+        parallel = generate_weekly_puzzles(None, count=3, week_seed=42, workers=2)
+        assert [p["solution"] for p in parallel] == [p["solution"] for p in sequential]
+
+    def test_portfolio_reports_winner(self):
+        """Each day is won by one attempt, recorded on the puzzle."""
+        puzzles = generate_weekly_puzzles(None, count=3, week_seed=42, workers=2, portfolio=3)
+        assert len(puzzles) == 3
+        for puzzle in puzzles:
+            attempt = puzzle["attempt"]
+            assert 0 <= attempt["index"] < 3
+            assert validate_filled_grid(puzzle["solution"], get_lexicon().words_by_length)[0]
+
+    def test_should_stop_cancels_fill(self, words_by_length):
+        """A fill whose should_stop returns True gives up without a solution."""
+        indexes = build_word_indexes(words_by_length)
+        pattern = PATTERNS[0]
+        solver = FillSolver(
+            pattern, extract_word_slots(pattern), indexes,
+            propagation="none", max_attempts=None, should_stop=lambda: True,
+        )
+        assert solver.solve() is None
+        assert solver.cancelled and not solver.timed_out
+
+    def test_batches_per_week(self):
+        """A multi-week batch returns one list per week seed."""
+        batches = generate_puzzle_batches(None, [7, 8], count=2, workers=2)
+        assert [len(puzzles) for puzzles in batches] == [2, 2]
+        first = generate_weekly_puzzles(None, count=1, week_seed=7)[0]
+        assert batches[0][0]["solution"] == first["solution"]
+
+
+class TestNumpyBackend:
+    """Tests for the NumPy candidate backend."""
+
+    def test_matches_bitset_backend(self, words_by_length):
+        """Both backends resolve patterns to the same words."""
+        pytest.importorskip("numpy")
+        bitset = build_word_indexes(words_by_length)
+        matrix = build_word_indexes(words_by_length, backend="numpy")
+        used = matrix[5].word_bit("SPACE") | matrix[5].word_bit("STONE")
+        for pattern in ([None] * 5, ["S", None, None, None, "E"], ["Q", "Z", None, None, None]):
+            assert matrix[5].words_for(matrix[5].match(pattern)) == \
+                bitset[5].words_for(bitset[5].match(pattern))
+            assert "SPACE" not in matrix[5].candidates(pattern, exclude=used)
+
+    def test_fill_with_numpy_backend(self, words_by_length):
+        """The fill engine and validation work on the NumPy backend."""
+        pytest.importorskip("numpy")
+        pattern = PATTERNS[8]
+        indexes = build_word_indexes(words_by_length, backend="numpy")
+        solution = fill_puzzle_with_backtracking(
+            pattern, extract_word_slots(pattern), words_by_length,
+            indexes=indexes, rng=random.Random(0),
+        )
+        assert solution is not None
+        assert validate_filled_grid(solution, words_by_length, indexes=indexes)[0]
+
+    def test_unknown_backend(self, words_by_length):
+        """An unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            build_word_indexes(words_by_length, backend="gpu")
+
+
+class TestFill:
+    """Tests for filling patterns with words."""
+
+    @pytest.mark.parametrize("pattern_idx", range(len(PATTERNS)))
+    def test_fill_pattern(self, words_by_length, pattern_idx):
+        """Every built-in pattern fills with valid words."""
+        pattern = PATTERNS[pattern_idx]
+        solution = fill_puzzle_with_backtracking(
+            pattern, extract_word_slots(pattern), words_by_length, rng=random.Random(0)
+        )
+        assert solution is not None
+        is_valid, errors = validate_filled_grid(solution, words_by_length)
+        assert is_valid, errors
+
+    def test_propagation_reduces_search(self, words_by_length):
+        """Arc consistency visits fewer nodes than recomputing candidates."""
+        indexes = build_word_indexes(words_by_length)
+        totals = {}
+        for mode in ("none", "ac3"):
+            stats = FillStats()
+            for pattern in PATTERNS[1:]:
+                fill_puzzle_with_backtracking(
+                    pattern, extract_word_slots(pattern), words_by_length,
+                    indexes=indexes, propagation=mode, stats=stats,
+                    rng=random.Random(0),
+                )
+            totals[mode] = stats
+        assert totals["ac3"].nodes < totals["none"].nodes
+        assert totals["ac3"].backtracks < totals["none"].backtracks
+
+    def test_unknown_propagation_mode(self, words_by_length):
+        """An unknown propagation mode is rejected."""
+        pattern = PATTERNS[0]
+        with pytest.raises(ValueError):
+            fill_puzzle_with_backtracking(
+                pattern, extract_word_slots(pattern), words_by_length,
+                propagation="magic",
+            )
+
+
+class TestBackjumping:
+    """Tests for conflict-directed backjumping and nogood caching."""
+
+    def test_unsatisfiable_grid_records_nogoods(self):
+        """An impossible fill fails cleanly and remembers dead subproblems."""
+        pattern = [["."] * 3 for _ in range(3)]
+        indexes = build_word_indexes({3: ["ABC", "DEF", "GHI", "ADG", "BEX"]})
+        solver = FillSolver(pattern, extract_word_slots(pattern), indexes, propagation="none")
+        assert solver.solve() is None
+        assert not solver.exhausted
+        assert solver.stats.nogoods > 0
+
+    def test_backjumps_over_unrelated_slot(self):
+        """A dead block jumps straight past a slot it doesn't cross."""
+        # The 4-letter slot is filled first but has no part in the 3x3 block
+        pattern = [list(row) for row in ["...##", "...##", "...##", "#####", "....#"]]
+        indexes = build_word_indexes({3: ["ABC", "DEF", "GHI", "ADG", "BEX"], 4: ["WXYZ", "WXYY"]})
+        stats = {}
+        for backjumping in (False, True):
+            solver = FillSolver(
+                pattern, extract_word_slots(pattern), indexes, propagation="forward",
+                backjumping=backjumping, rng=random.Random(0),
+            )
+            assert solver.solve() is None
+            stats[backjumping] = solver.stats
+        assert stats[True].backjumps == 1
+        assert stats[True].nogoods > 0
+        assert stats[True].nodes < stats[False].nodes
+
+    def test_truncated_subtree_records_no_nogood(self):
+        """A failure below a cut candidate list is not remembered as dead."""
+        pattern = [["."] * 3 for _ in range(3)]
+        indexes = build_word_indexes({3: ["ABC", "DEF", "GHI", "ADG", "BEX"]})
+        solvers = {}
+        for max_candidates in (500, 1):
+            solver = FillSolver(
+                pattern, extract_word_slots(pattern), indexes, propagation="none",
+                max_candidates=max_candidates, rng=random.Random(0),
+            )
+            assert solver.solve() is None
+            solvers[max_candidates] = solver
+
+        # The root's candidates were cut, so the empty grid isn't marked dead
+        assert any(key[0] == 0 for key in solvers[500].nogoods)
+        assert not any(key[0] == 0 for key in solvers[1].nogoods)
+        assert solvers[1].stats.nogoods < solvers[500].stats.nogoods
+
+    def test_backjumping_finds_same_solutions(self):
+        """Backjumping only skips dead subtrees, so fills stay valid."""
+        pattern = [["."] * 3 for _ in range(3)]
+        words = {3: ["ABC", "DEF", "GHI", "ADG", "BEH", "CFI"]}
+        indexes = build_word_indexes(words)
+        for backjumping in (False, True):
+            solver = FillSolver(
+                pattern, extract_word_slots(pattern), indexes,
+                propagation="none", backjumping=backjumping, rng=random.Random(0),
+            )
+            solution = solver.solve()
+            assert solution is not None
+            assert validate_filled_grid(solution, words)[0]
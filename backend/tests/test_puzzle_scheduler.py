@@ -0,0 +1,54 @@
+"""Tests for look-ahead puzzle generation."""
+
+from datetime import date
+
+from app.models import Puzzle, PuzzleCacheMeta
+from app.services.puzzle_cache import PUZZLE_COUNT
+from app.services.puzzle_scheduler import (
+    LookaheadScheduler,
+    fill_upcoming_weeks,
+    pending_weeks,
+    upcoming_week_keys,
+)
+
+# A Wednesday, so the window spans a year boundary
+TODAY = date(2026, 12, 23)
+
+
+class TestLookahead:
+    """Tests for keeping upcoming weeks generated."""
+
+    def test_upcoming_week_keys(self):
+        """The current week and the following ones, across the ISO year."""
+        assert upcoming_week_keys(2, TODAY) == ["2026-W52", "2026-W53", "2027-W01"]
+        assert upcoming_week_keys(0, TODAY) == ["2026-W52"]
+
+    def test_pending_weeks(self, db):
+        """Only weeks with a complete, done meta row count as generated."""
+        db.add_all([
+            PuzzleCacheMeta(week_key="2026-W52", status="done", puzzle_count=PUZZLE_COUNT),
+            PuzzleCacheMeta(week_key="2026-W53", status="failed", puzzle_count=0),
+        ])
+        db.commit()
+        assert pending_weeks(db, ["2026-W52", "2026-W53", "2027-W01"]) == ["2026-W53", "2027-W01"]
+
+    def test_fill_and_backfill(self, db):
+        """Missing weeks are generated once, and gaps are backfilled."""
+        assert fill_upcoming_weeks(db, weeks_ahead=1, today=TODAY) == ["2026-W52", "2026-W53"]
+        assert db.query(Puzzle).count() == 2 * PUZZLE_COUNT
+        dates = [p.scheduled_date for p in db.query(Puzzle).filter(Puzzle.week_key == "2026-W53")]
+        assert min(dates) == date(2026, 12, 28)
+
+        assert fill_upcoming_weeks(db, weeks_ahead=1, today=TODAY) == []
+
+        db.query(Puzzle).filter(Puzzle.week_key == "2026-W52").delete()
+        db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == "2026-W52").delete()
+        db.commit()
+        assert fill_upcoming_weeks(db, weeks_ahead=1, today=TODAY) == ["2026-W52"]
+        assert db.query(Puzzle).count() == 2 * PUZZLE_COUNT
+
+    def test_scheduler_runs_once_without_interval(self, db):
+        """With interval 0 the scheduler makes a single pass and returns."""
+        scheduler = LookaheadScheduler(lambda: db, weeks_ahead=0, interval=0)
+        scheduler.run()
+        assert pending_weeks(db, upcoming_week_keys(0)) == []
@@ -1,6 +1,25 @@
 """Tests for puzzle endpoints."""
 
 import pytest
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.models import Puzzle, PuzzleCacheMeta, Solve
+from app.services import puzzle_cache
+from app.services.puzzle_cache import (
+    ARCHIVED_WEEK_SUFFIX,
+    PUZZLE_COUNT,
+    clear_week_readiness,
+    ensure_weekly_cache,
+    generation_due,
+    get_current_week_key,
+    get_week_dates,
+    is_week_ready,
+    regenerate_week,
+    start_weekly_generation,
+    wait_for_generation_jobs,
+)
+from app.services.puzzle_service import PuzzleService
 
 
 class TestGetPuzzle:
@@ -32,8 +51,31 @@ class TestGetPuzzle:
         response = client.get("/api/puzzles/99999")
         assert response.status_code == 404
 
-    def test_get_today_no_puzzle(self, client, db):
-        """Test getting today's puzzle when none exists."""
+    def test_get_today_no_puzzle(self, client, db, monkeypatch):
+        """Without puzzles, /today answers 503 at once and generates in the background."""
+        # The test database is one shared connection, so the job is run
+        # here after the response instead of racing the request thread
+        started = []
+        monkeypatch.setattr(
+            puzzle_cache, "start_weekly_generation",
+            lambda week_key, bind, force=False: started.append((week_key, bind)),
+        )
+        response = client.get("/api/puzzles/today")
+        assert response.status_code == 503
+        assert int(response.headers["Retry-After"]) > 0
+
+        assert [week_key for week_key, _ in started] == [get_current_week_key()]
+        puzzle_cache._run_generation_job(*started[0])
+        response = client.get("/api/puzzles/today")
+        assert response.status_code == 200
+        assert "solution" not in response.json()
+
+    def test_get_today_no_puzzle_when_week_ready(self, client, db):
+        """A generated week without a puzzle for today is a plain 404."""
+        db.add(PuzzleCacheMeta(
+            week_key=get_current_week_key(), status="done", puzzle_count=PUZZLE_COUNT
+        ))
+        db.commit()
         response = client.get("/api/puzzles/today")
         assert response.status_code == 404
 
@@ -186,3 +228,242 @@ class TestSolvePuzzle:
         data = response.json()
         assert data["solved"] is True
         assert data["time_ms"] == 60000
+
+
+class TestWeeklyCacheReadiness:
+    """Tests for the in-process record of generated weeks."""
+
+    @pytest.fixture
+    def ready_week(self, db):
+        """A fully generated current week."""
+        week_key = get_current_week_key()
+        db.add(PuzzleCacheMeta(week_key=week_key, status="done", puzzle_count=PUZZLE_COUNT))
+        db.commit()
+        return week_key
+
+    @pytest.fixture
+    def statements(self, db):
+        """SQL statements executed during the test."""
+        executed = []
+
+        def record(conn, cursor, statement, *args):
+            executed.append(statement)
+
+        engine = db.get_bind()
+        event.listen(engine, "before_cursor_execute", record)
+        yield executed
+        event.remove(engine, "before_cursor_execute", record)
+
+    def test_ready_week_skips_database(self, db, ready_week, statements):
+        """Once a week is confirmed ready, later checks run no queries."""
+        ensure_weekly_cache(db)
+        assert is_week_ready(ready_week)
+        assert statements
+
+        statements.clear()
+        ensure_weekly_cache(db)
+        assert statements == []
+
+    def test_readiness_expires(self, db, ready_week, statements, monkeypatch):
+        """After the TTL the week is checked in the database again."""
+        monkeypatch.setattr(get_settings(), "puzzle_cache_ready_ttl_seconds", 0)
+        ensure_weekly_cache(db)
+        assert not is_week_ready(ready_week)
+
+        statements.clear()
+        ensure_weekly_cache(db)
+        assert statements
+
+
+class TestWeekSwap:
+    """Tests for refreshing a week without taking it offline."""
+
+    WEEK = "2026-W30"
+
+    @pytest.fixture
+    def generator(self, db, monkeypatch):
+        """Fake generator that records how many puzzles the week had meanwhile."""
+        seen = []
+
+        def generate(db_, n=PUZZLE_COUNT, week_key=None, in_subprocess=False, days=None):
+            seen.append(db.query(Puzzle).filter(Puzzle.week_key == week_key).count())
+            return [
+                {
+                    "title": f"Daily Puzzle {len(seen)}",
+                    "size": 5,
+                    "difficulty": "medium",
+                    "grid": [[" "] * 5 for _ in range(5)],
+                    "solution": [["A"] * 5 for _ in range(5)],
+                    "clues_across": [],
+                    "clues_down": [],
+                    "scheduled_date": day,
+                }
+                for day in get_week_dates(week_key)[:n]
+            ]
+
+        monkeypatch.setattr(puzzle_cache, "generate_puzzle_set", generate)
+        return seen
+
+    def test_old_week_served_while_regenerating(self, db, generator):
+        """The old puzzles stay until the new week replaces them at once."""
+        ensure_weekly_cache(db, self.WEEK)
+
+        assert regenerate_week(db, self.WEEK) == PUZZLE_COUNT
+        assert generator == [0, PUZZLE_COUNT]
+
+        puzzles = db.query(Puzzle).filter(Puzzle.week_key == self.WEEK).all()
+        assert len(puzzles) == PUZZLE_COUNT
+        assert all(p.title == "Daily Puzzle 2" for p in puzzles)
+        meta = db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == self.WEEK).one()
+        assert meta.status == "done"
+
+    def test_background_job_generates_in_subprocess(self, db, monkeypatch):
+        """Jobs started from the web process hand the search to the generation pool."""
+        modes = []
+
+        def generate(db_, n=PUZZLE_COUNT, week_key=None, in_subprocess=False, days=None):
+            modes.append(in_subprocess)
+            return []
+
+        monkeypatch.setattr(puzzle_cache, "generate_puzzle_set", generate)
+        start_weekly_generation(self.WEEK, db.get_bind())
+        assert wait_for_generation_jobs(timeout=60)
+        assert modes == [True]
+
+    def test_short_refresh_keeps_uncovered_days(self, db, generator, monkeypatch):
+        """Days a short refresh doesn't cover keep their old puzzles."""
+        ensure_weekly_cache(db, self.WEEK)
+        full = puzzle_cache.generate_puzzle_set
+        monkeypatch.setattr(
+            puzzle_cache, "generate_puzzle_set",
+            lambda db_, n=PUZZLE_COUNT, week_key=None, in_subprocess=False, days=None: full(
+                db_, n=4, week_key=week_key, in_subprocess=in_subprocess
+            ),
+        )
+
+        assert regenerate_week(db, self.WEEK) == PUZZLE_COUNT
+        db.expire_all()
+
+        dates = get_week_dates(self.WEEK)
+        titles = {
+            p.scheduled_date: p.title
+            for p in db.query(Puzzle).filter(Puzzle.week_key == self.WEEK)
+        }
+        assert sorted(titles) == dates
+        assert [titles[d] for d in dates] == ["Daily Puzzle 2"] * 4 + ["Daily Puzzle 1"] * 3
+        meta = db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == self.WEEK).one()
+        assert meta.puzzle_count == PUZZLE_COUNT
+        assert is_week_ready(self.WEEK)
+
+    def test_solved_puzzles_are_archived(self, db, generator, sample_user):
+        """Replaced puzzles with solves are kept unscheduled; the rest are deleted."""
+        ensure_weekly_cache(db, self.WEEK)
+        solved = db.query(Puzzle).filter(Puzzle.week_key == self.WEEK).first()
+        db.add(Solve(user_id=sample_user.id, puzzle_id=solved.id, time_ms=1000))
+        db.commit()
+        solved_id = solved.id
+
+        regenerate_week(db, self.WEEK)
+        db.expire_all()
+
+        archived = db.get(Puzzle, solved_id)
+        assert archived.week_key == self.WEEK + ARCHIVED_WEEK_SUFFIX
+        assert archived.scheduled_date is None
+        assert db.query(Solve).filter(Solve.puzzle_id == solved_id).count() == 1
+        # Only the solved one of the old puzzles is left
+        assert db.query(Puzzle).filter(Puzzle.title == "Daily Puzzle 1").count() == 1
+        # Archived puzzles are not rotated in as today's puzzle
+        today = PuzzleService(db).get_today_puzzle()
+        assert today is None or today.id != solved_id
+
+
+class TestShortWeeks:
+    """Tests for weeks that failed or came out short."""
+
+    WEEK = "2026-W31"
+
+    @pytest.fixture
+    def generator(self, monkeypatch):
+        """Fake generator making at most ``limit[0]`` puzzles; records each n."""
+        calls, limit = [], [PUZZLE_COUNT - 1]
+
+        def generate(db_, n=PUZZLE_COUNT, week_key=None, in_subprocess=False, days=None):
+            calls.append(n)
+            if limit[0] is None:
+                raise RuntimeError("generation failed")
+            return [
+                {
+                    "title": f"Daily Puzzle {len(calls)}",
+                    "size": 5,
+                    "difficulty": "medium",
+                    "grid": [[" "] * 5 for _ in range(5)],
+                    "solution": [["A"] * 5 for _ in range(5)],
+                    "clues_across": [],
+                    "clues_down": [],
+                    "scheduled_date": day,
+                }
+                for day in get_week_dates(week_key)[:min(n, limit[0])]
+            ]
+
+        monkeypatch.setattr(puzzle_cache, "generate_puzzle_set", generate)
+        return calls, limit
+
+    def meta(self, db):
+        return db.query(PuzzleCacheMeta).filter(PuzzleCacheMeta.week_key == self.WEEK).one()
+
+    def test_short_week_not_regenerated_on_every_check(self, db, generator):
+        """A short week is kept, and left alone until its retry interval passes."""
+        calls, _ = generator
+        ensure_weekly_cache(db, self.WEEK)
+        for _ in range(3):
+            clear_week_readiness(self.WEEK)
+            ensure_weekly_cache(db, self.WEEK)
+
+        assert calls == [PUZZLE_COUNT]
+        meta = self.meta(db)
+        assert (meta.status, meta.puzzle_count) == ("done", PUZZLE_COUNT - 1)
+        assert not generation_due(meta)
+
+    def test_retry_only_adds_missing_days(self, db, generator, monkeypatch):
+        """Once due, a short week gets just its missing days; the rest stay."""
+        calls, limit = generator
+        ensure_weekly_cache(db, self.WEEK)
+        first_ids = {p.id for p in db.query(Puzzle).filter(Puzzle.week_key == self.WEEK)}
+
+        monkeypatch.setattr(get_settings(), "puzzle_generation_retry_seconds", 0)
+        limit[0] = PUZZLE_COUNT
+        ensure_weekly_cache(db, self.WEEK)
+
+        assert calls == [PUZZLE_COUNT, 1]
+        puzzles = db.query(Puzzle).filter(Puzzle.week_key == self.WEEK).all()
+        assert sorted(p.scheduled_date for p in puzzles) == get_week_dates(self.WEEK)
+        assert first_ids <= {p.id for p in puzzles}
+        assert self.meta(db).puzzle_count == PUZZLE_COUNT
+        assert is_week_ready(self.WEEK)
+
+    def test_top_up_adds_new_puzzles(self, db):
+        """Missing days are generated as themselves, not as copies of other days."""
+        ensure_weekly_cache(db, self.WEEK)
+        dates = get_week_dates(self.WEEK)
+        db.query(Puzzle).filter(
+            Puzzle.week_key == self.WEEK, Puzzle.scheduled_date.in_([dates[3], dates[6]])
+        ).delete(synchronize_session=False)
+        self.meta(db).puzzle_count = PUZZLE_COUNT - 2
+        db.commit()
+
+        assert puzzle_cache._top_up_week(db, self.WEEK) == PUZZLE_COUNT
+        solutions = [
+            p.solution for p in db.query(Puzzle).filter(Puzzle.week_key == self.WEEK)
+        ]
+        assert len(set(solutions)) == PUZZLE_COUNT
+
+    def test_failed_week_backs_off(self, db, generator):
+        """A failed generation isn't retried until the retry interval passes."""
+        calls, limit = generator
+        limit[0] = None
+        with pytest.raises(RuntimeError):
+            ensure_weekly_cache(db, self.WEEK)
+        ensure_weekly_cache(db, self.WEEK)
+
+        assert calls == [PUZZLE_COUNT]
+        assert self.meta(db).status == "failed"
@@ -0,0 +1,179 @@
+"""Tests for the reserve pool of pre-generated puzzles."""
+
+import pytest
+
+from app.config import get_settings
+from app.models import Puzzle, ReservePuzzle
+from app.services import puzzle_cache, puzzle_templates
+from app.services.generation_lock import get_generation_lock
+from app.services.puzzle_cache import PUZZLE_COUNT, fill_week_from_reserve, get_current_week_key
+from app.services.reserve_pool import (
+    RESERVE_LOCK_KEY,
+    ReserveReplenisher,
+    add_reserve_puzzles,
+    claim_reserve_puzzles,
+    replenish_reserve,
+    reserve_depth,
+    reserve_metrics,
+)
+from app.services.puzzle_service import PRACTICE_WEEK_KEY, PuzzleService
+
+
+def puzzle_data(n: int = 0) -> dict:
+    """Stored puzzle fields for a small filled grid."""
+    solution = [
+        ["H", "E", "L", "L", "O"],
+        ["A", "#", "I", "#", "N"],
+        ["P", "E", "A", "C", "E"],
+        ["P", "#", "R", "#", "S"],
+        ["Y", "E", "S", "E", "S"],
+    ]
+    return {
+        "title": "Daily Puzzle",
+        "size": 5,
+        "difficulty": "medium",
+        "grid": [[" " if c != "#" else "#" for c in row] for row in solution],
+        "solution": solution,
+        "clues_across": [{"number": 1, "clue": f"Greeting {n}", "length": 5, "row": 0, "col": 0}],
+        "clues_down": [{"number": 1, "clue": "Joyful", "length": 5, "row": 0, "col": 0}],
+        "scheduled_date": None,
+    }
+
+
+@pytest.fixture
+def stocked(db):
+    """A pool holding a week and a day's worth of puzzles."""
+    add_reserve_puzzles(db, [puzzle_data(i) for i in range(PUZZLE_COUNT + 1)])
+    return db
+
+
+class TestReservePool:
+    """Tests for filling and drawing from the pool."""
+
+    def test_replenish_up_to_target(self, db):
+        """Replenishing generates at most a batch and stops at the target."""
+        before = reserve_metrics(db)["generated_total"]
+        assert replenish_reserve(db, target=3, batch=2, in_subprocess=False) == 2
+        assert replenish_reserve(db, target=3, batch=2, in_subprocess=False) == 1
+        assert replenish_reserve(db, target=3, batch=2, in_subprocess=False) == 0
+
+        metrics = reserve_metrics(db)
+        assert metrics["depth"] == 3
+        assert metrics["generated_total"] - before == 3
+        assert metrics["last_replenish"]["added"] == 1
+
+        row = db.query(ReservePuzzle).first()
+        assert row.size == 5 and row.grid and row.clues_across
+
+    def test_replenish_in_worker_process(self, db):
+        """Generation can run in a separate worker process."""
+        assert replenish_reserve(db, target=1, batch=1, in_subprocess=True) == 1
+
+    def test_worker_process_pool_is_reused(self, db):
+        """Replenish runs share the process's generation pool."""
+        replenish_reserve(db, target=1, batch=1, in_subprocess=True)
+        pool = puzzle_templates._generation_pool
+        assert pool is not None
+        replenish_reserve(db, target=2, batch=1, in_subprocess=True)
+        assert puzzle_templates._generation_pool is pool
+
+    def test_replenisher_skips_while_locked(self, db, monkeypatch):
+        """Only the worker holding the reserve lock replenishes."""
+        monkeypatch.setattr(get_settings(), "reserve_pool_target", 1)
+        monkeypatch.setattr(get_settings(), "puzzle_generation_workers", 1)
+        replenisher = ReserveReplenisher(lambda: db, interval=0)
+        lock = get_generation_lock(db.get_bind())
+        assert lock.try_acquire(RESERVE_LOCK_KEY)
+        try:
+            assert replenisher.run_once() == 0
+        finally:
+            lock.release(RESERVE_LOCK_KEY)
+        assert reserve_depth(db) == 0
+
+    def test_claim_oldest_and_keep(self, stocked):
+        """Claims take the oldest puzzles and never dip below ``keep``."""
+        claimed = claim_reserve_puzzles(stocked, 3, keep=PUZZLE_COUNT)
+        assert [p["clues_across"][0]["clue"] for p in claimed] == ["Greeting 0"]
+        stocked.commit()
+        assert reserve_depth(stocked) == PUZZLE_COUNT
+        assert claim_reserve_puzzles(stocked, 1, keep=PUZZLE_COUNT) == []
+
+    def test_claim_is_undone_by_rollback(self, stocked):
+        """Claimed puzzles stay in the pool unless the caller commits."""
+        claim_reserve_puzzles(stocked, 2)
+        stocked.rollback()
+        assert reserve_depth(stocked) == PUZZLE_COUNT + 1
+
+
+class TestReserveConsumers:
+    """Tests for practice mode, fallbacks and refreshes using the pool."""
+
+    def test_practice_stocked_from_pool(self, stocked):
+        """Practice puzzles are stocked up to the limit, keeping a week in the pool."""
+        service = PuzzleService(stocked)
+        assert service.stock_practice_puzzles(limit=5) == 1
+        assert reserve_depth(stocked) == PUZZLE_COUNT
+
+        add_reserve_puzzles(stocked, [puzzle_data(i) for i in range(10)])
+        assert service.stock_practice_puzzles(limit=5) == 4
+        assert service.stock_practice_puzzles(limit=5) == 0
+        assert stocked.query(Puzzle).filter(Puzzle.week_key == PRACTICE_WEEK_KEY).count() == 5
+
+    def test_practice_request_writes_nothing(self, client, stocked):
+        """Serving a practice puzzle neither claims from the pool nor adds rows."""
+        PuzzleService(stocked).stock_practice_puzzles(limit=1)
+        response = client.get("/api/puzzles/practice/random")
+        assert response.status_code == 200
+        assert response.json()["title"] == "Practice Puzzle"
+        assert reserve_depth(stocked) == PUZZLE_COUNT
+        assert stocked.query(Puzzle).count() == 1
+
+    def test_practice_puzzles_are_not_daily(self, stocked):
+        """Practice puzzles never become today's puzzle."""
+        PuzzleService(stocked).stock_practice_puzzles(limit=1)
+        assert PuzzleService(stocked).get_today_puzzle() is None
+
+    def test_refresh_swaps_in_reserve_week(self, client, stocked):
+        """With a week in the pool, refresh is done immediately."""
+        response = client.post("/api/puzzles/refresh")
+        assert response.status_code == 202
+        assert response.json()["status"] == "done"
+
+        week_key = get_current_week_key()
+        puzzles = stocked.query(Puzzle).filter(Puzzle.week_key == week_key).all()
+        assert len(puzzles) == PUZZLE_COUNT
+        assert all(p.scheduled_date for p in puzzles)
+        assert reserve_depth(stocked) == 1
+
+    def test_reserve_fill_skips_locked_week(self, stocked):
+        """A week being generated elsewhere isn't filled from the pool meanwhile."""
+        week_key = get_current_week_key()
+        lock = get_generation_lock(stocked.get_bind())
+        assert lock.try_acquire(week_key)
+        try:
+            assert fill_week_from_reserve(stocked, week_key) == 0
+        finally:
+            lock.release(week_key)
+        assert reserve_depth(stocked) == PUZZLE_COUNT + 1
+
+        assert fill_week_from_reserve(stocked, week_key) == PUZZLE_COUNT
+
+    def test_failed_week_falls_back_to_pool(self, stocked, monkeypatch):
+        """A week whose generation fails is filled from the pool."""
+        def fail(*args, **kwargs):
+            raise RuntimeError("generator down")
+
+        monkeypatch.setattr(puzzle_cache, "generate_puzzle_set", fail)
+        puzzle_cache.ensure_weekly_cache(stocked, "2026-W30")
+
+        puzzles = stocked.query(Puzzle).filter(Puzzle.week_key == "2026-W30").all()
+        assert len(puzzles) == PUZZLE_COUNT
+        assert reserve_depth(stocked) == 1
+
+    def test_metrics_endpoint(self, client, stocked):
+        """Pool depth and counters are exposed for monitoring."""
+        response = client.get("/api/puzzles/reserve/metrics")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["depth"] == PUZZLE_COUNT + 1
+        assert {"target", "generated_total", "claimed_total", "last_replenish"} <= set(data)
@@ -33,6 +33,7 @@ const API = {
             const error = new Error(data?.detail || 'An error occurred');
             error.status = response.status;
             error.data = data;
+            error.retryAfter = Number(response.headers.get('Retry-After')) || null;
             throw error;
         }
 
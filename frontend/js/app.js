@@ -124,6 +124,15 @@ const App = {
 
             Crossword.init(puzzle, false);
         } catch (e) {
+            if (e.status === 503 && e.retryAfter) {
+                // Today's puzzle is still being generated
+                document.getElementById('puzzle-title').textContent = 'Preparing today\'s puzzle';
+                document.getElementById('puzzle-meta').textContent = 'This will only take a moment';
+                setTimeout(() => {
+                    if (this.currentPage === 'play') this.loadPuzzle();
+                }, e.retryAfter * 1000);
+                return;
+            }
             console.error('Error loading puzzle:', e);
             document.getElementById('puzzle-title').textContent = 'No puzzle available';
             document.getElementById('puzzle-meta').textContent = 'Check back later';